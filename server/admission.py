@@ -0,0 +1,136 @@
+"""
+Admission control in front of model inference
+At most ADMISSION_MAX_CONCURRENT requests score at once. Others wait in a
+bounded priority queue (cheap single-model calls before full ensembles
+before batches) for at most ADMISSION_QUEUE_TIMEOUT_MS. When the queue is
+full the request is refused immediately, so overload turns into fast 503s
+with Retry-After instead of ever-growing latency for everyone.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+from metrics import ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "64"))
+# Waiting requests allowed at or above a given priority
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "500"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# Lower value = served first
+PRIORITY_INDIVIDUAL = 0
+PRIORITY_ENSEMBLE = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_INDIVIDUAL: "individual", PRIORITY_ENSEMBLE: "ensemble", PRIORITY_BATCH: "batch"}
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason}), retry later")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, prioritized wait queue"""
+
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout_ms: float = ADMISSION_QUEUE_TIMEOUT_MS,
+        retry_after: int = ADMISSION_RETRY_AFTER,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout_ms / 1000.0
+        self.retry_after = retry_after
+        self.active = 0
+        # (priority, arrival order, future resolved when a slot is handed over)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+        # Statistics
+        self.admitted: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.rejected: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def queued(self, priority: int = PRIORITY_BATCH) -> int:
+        """Requests waiting at or above ``priority``"""
+        return sum(1 for p, _, f in self._waiters if p <= priority and not f.done())
+
+    def _reject(self, priority: int, reason: str) -> AdmissionRejected:
+        name = PRIORITY_NAMES[priority]
+        self.rejected[name] += 1
+        ADMISSION_REJECTED.inc(name, reason)
+        return AdmissionRejected(reason, self.retry_after)
+
+    async def acquire(self, priority: int) -> None:
+        """Take a scoring slot, waiting in the queue if needed; raises AdmissionRejected"""
+        name = PRIORITY_NAMES[priority]
+        if self.active < self.max_concurrent and not self.queued():
+            self.active += 1
+            self.admitted[name] += 1
+            ADMISSION_WAIT_SECONDS.observe(0.0, name)
+            return
+
+        # Lower-priority waiters do not count against higher-priority arrivals
+        if self.queued(priority) >= self.max_queue:
+            raise self._reject(priority, "queue_full")
+
+        if len(self._waiters) > 2 * self.max_queue + 16:
+            # Drop entries left behind by timed-out or cancelled waiters
+            self._waiters = [w for w in self._waiters if not w[2].done()]
+            heapq.heapify(self._waiters)
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not future.done():
+                future.cancel()
+                raise self._reject(priority, "timeout")
+            # Handed a slot just as the timeout fired: keep it
+        except asyncio.CancelledError:
+            # Client went away; give back a slot that was already handed over
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+            raise
+        self.admitted[name] += 1
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - started, name)
+
+    def release(self) -> None:
+        """Hand the slot to the highest-priority waiter, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": self.queue_timeout * 1000,
+            "active": self.active,
+            "queued": {name: sum(1 for p, _, f in self._waiters if p == priority and not f.done())
+                       for priority, name in PRIORITY_NAMES.items()},
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+        }
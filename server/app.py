@@ -1,16 +1,33 @@
-import joblib
 import numpy as np
-import pandas as pd
 import logging
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+import io
+import asyncio
+from fastapi import Depends, FastAPI, HTTPException, UploadFile, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, field_validator
-from typing import Dict, Any, Optional, List
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
+from starlette.formparsers import MultiPartException
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator, model_validator
+from typing import Dict, Any, Literal, Optional, List, Set
 from pathlib import Path
 import json
+import orjson
 from contextlib import asynccontextmanager
 import os
+import time
 from dotenv import load_dotenv
+from features import FEATURE_COLUMNS, RAW_COLUMNS, build_features, fill_engineered
+from inference import INFERENCE_ENGINE, MODEL_STORE_DIR
+from batching import MicroBatcher
+from executor import InferenceExecutor
+from sysinfo import memory_usage
+from cache import PredictionCache
+from registry import ModelRegistry, build_store
+from metrics import REGISTRY, STAGE_SECONDS, MetricsMiddleware, sample_lines
+from documents import DocumentPipeline, DocumentQueueFull, DocumentTooLarge, sse_event
+from admission import (PRIORITY_BATCH, PRIORITY_ENSEMBLE, PRIORITY_INDIVIDUAL, AdmissionController,
+                       AdmissionRejected)
+from audit import AuditOverflow, AuditSink, create_backend
+from drift import DriftMonitor
 load_dotenv()
 
 # --------------------------------------------------
@@ -32,11 +49,136 @@ LINEAR_MODEL_PATH = MODEL_DIR / "linear_model.pkl"
 DECISION_TREE_PATH = MODEL_DIR / "decision_tree.pkl"
 RANDOM_FOREST_PATH = MODEL_DIR / "random_forest.pkl"
 
+MODEL_PATHS = {
+    "linear": LINEAR_MODEL_PATH,
+    "decision_tree": DECISION_TREE_PATH,
+    "random_forest": RANDOM_FOREST_PATH,
+}
+
+# Versioned artifacts; MODEL_PATHS is the fallback when no manifest exists
+MODEL_MANIFEST_PATH = Path(os.getenv("MODEL_MANIFEST", MODEL_DIR / "manifest.json"))
+
+# Optional shared secret for /admin routes
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+MODEL_LABELS = {
+    "linear": "Linear",
+    "decision_tree": "Decision Tree",
+    "random_forest": "Random Forest",
+}
+
+# Ensemble members in scoring order
+MODEL_NAMES = ["linear", "decision_tree", "random_forest"]
+
+# Ensemble weights; renormalized over the models that produced a prediction
+MODEL_WEIGHTS = {
+    "random_forest": 0.5,
+    "decision_tree": 0.3,
+    "linear": 0.2,
+}
+
+# "full" runs every model; "cascade" runs the cheap models first and only
+# calls the rest when their weighted score is within CASCADE_MARGIN of 0.5
+ENSEMBLE_MODE = os.getenv("ENSEMBLE_MODE", "full").lower()
+CASCADE_MARGIN = float(os.getenv("CASCADE_MARGIN", "0.3"))
+CASCADE_FIRST = ["linear", "decision_tree"]
+if ENSEMBLE_MODE not in ("full", "cascade"):
+    raise RuntimeError(f"Unknown ENSEMBLE_MODE '{ENSEMBLE_MODE}', expected 'full' or 'cascade'")
+
+# Upper bound on rows accepted by /predict/batch
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", "10000"))
+
+# Grid points per axis accepted by /predict/whatif
+MAX_SWEEP_STEPS = int(os.getenv("MAX_SWEEP_STEPS", "100"))
+
 # --------------------------------------------------
 # Load models
 # --------------------------------------------------
 models: Dict[str, Any] = {}
 
+# Active version per loaded model; part of the prediction cache key
+model_versions: Dict[str, str] = {}
+
+prediction_cache = PredictionCache()
+
+registry = ModelRegistry(models, model_versions, INFERENCE_ENGINE, MODEL_MANIFEST_PATH, MODEL_PATHS)
+
+# Start serving once any model is ready; the others finish in the background
+SERVE_ON_FIRST_MODEL = os.getenv("SERVE_ON_FIRST_MODEL", "false").lower() in ("1", "true", "yes")
+
+# Seconds between manifest checks; each worker reloads itself when the file changes (0 disables)
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+# Worker processes sharing the port (set by serve.py); POST /admin/models/reload reaches only one of them
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "1"))
+
+# Load time and memory of this worker process, reported by /health
+worker_info: Dict[str, Any] = {"pid": os.getpid()}
+
+# Lifespan-owned tasks, cancelled on shutdown
+background_tasks: Set[asyncio.Task] = set()
+
+async def refresh_executor_when_loaded() -> None:
+    """Restart process workers once staged loading finishes, so they serve the final model set"""
+    await registry.wait_loaded()
+    executor.restart(registry.artifact_paths(), INFERENCE_ENGINE, registry.artifact_versions())
+
+def apply_reload(results: Dict[str, Any]) -> None:
+    """Follow up a registry reload: drop stale cache entries and restart process workers"""
+    if any(r["status"] == "swapped" for r in results.values()):
+        prediction_cache.clear()
+        executor.restart(registry.artifact_paths(), INFERENCE_ENGINE, registry.artifact_versions())
+        refresh_drift_monitor()
+
+def refresh_drift_monitor() -> None:
+    """Switch to the reference profile written for a newly activated version
+
+    Live counts start over, since they were binned against the old profile.
+    """
+    global drift_monitor
+    if drift_monitor is not None and not drift_monitor.reference_changed():
+        return
+    monitor = DriftMonitor.load(drift_monitor.path if drift_monitor is not None else None)
+    if monitor is not None:
+        drift_monitor = monitor
+
+def manifest_stamp() -> Optional[tuple]:
+    try:
+        stat = registry.manifest_path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+async def export_activated() -> None:
+    """Export newly activated tree versions to the shared store, so this worker maps rather than unpickles them
+
+    The first worker to see a change exports under a file lock; the rest wait on it and map the result.
+    """
+    if not MODEL_STORE_DIR:
+        return
+    try:
+        await asyncio.to_thread(build_store, registry.manifest_path, registry.default_paths,
+                                Path(MODEL_STORE_DIR))
+    except Exception:
+        # The reload still works from the pickles
+        logger.exception("⚠ Store export failed")
+
+async def watch_manifest() -> None:
+    """Reload this worker whenever the manifest changes, so every worker converges on its own"""
+    seen = manifest_stamp()
+    while True:
+        await asyncio.sleep(MODEL_WATCH_SECONDS)
+        stamp = manifest_stamp()
+        if stamp == seen:
+            continue
+        seen = stamp
+        await export_activated()
+        try:
+            results = await registry.reload()
+        except Exception:
+            logger.exception("❌ Manifest reload failed")
+            continue
+        apply_reload(results)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic
@@ -45,27 +187,34 @@ async def lifespan(app: FastAPI):
             logger.error(f"❌ Model directory not found: {MODEL_DIR}")
             raise RuntimeError(f"Model directory not found: {MODEL_DIR}")
         
-        if LINEAR_MODEL_PATH.exists():
-            models["linear"] = joblib.load(LINEAR_MODEL_PATH)
-            logger.info("✓ Linear model loaded")
-        else:
-            logger.warning(f"⚠ Linear model not found: {LINEAR_MODEL_PATH}")
-
-        if DECISION_TREE_PATH.exists():
-            models["decision_tree"] = joblib.load(DECISION_TREE_PATH)
-            logger.info("✓ Decision Tree model loaded")
-        else:
-            logger.warning(f"⚠ Decision Tree model not found: {DECISION_TREE_PATH}")
-
-        if RANDOM_FOREST_PATH.exists():
-            models["random_forest"] = joblib.load(RANDOM_FOREST_PATH)
-            logger.info("✓ Random Forest model loaded")
-        else:
-            logger.warning(f"⚠ Random Forest model not found: {RANDOM_FOREST_PATH}")
+        started = time.perf_counter()
+        example = LoanApplication.model_config["json_schema_extra"]["example"]
+        registry.probe = preprocess_input(LoanApplication(**example))
+        await registry.start(wait_for_all=not SERVE_ON_FIRST_MODEL)
 
         if not models:
             raise RuntimeError("No models could be loaded")
 
+        logger.info(f"✓ Inference engine: {INFERENCE_ENGINE}")
+        # Versions are in the cache key, clearing just frees the stale entries
+        prediction_cache.clear()
+
+        executor.start(registry.artifact_paths(), INFERENCE_ENGINE, registry.artifact_versions())
+        if registry.loading:
+            background_tasks.add(asyncio.create_task(refresh_executor_when_loaded()))
+        if MODEL_WATCH_SECONDS > 0:
+            background_tasks.add(asyncio.create_task(watch_manifest()))
+            logger.info(f"✓ Watching {registry.manifest_path.name} every {MODEL_WATCH_SECONDS}s")
+        documents.start()
+        await audit.start()
+
+        worker_info["load_seconds"] = round(time.perf_counter() - started, 4)
+        worker_info.update(memory_usage())
+        logger.info(
+            f"✓ Worker {worker_info['pid']} ready in {worker_info['load_seconds']}s, "
+            f"RSS={worker_info['rss_mb']}MB"
+        )
+
     except Exception as e:
         logger.exception("❌ Model loading failed")
         # In lifespan, raising here will stop the server startup
@@ -73,13 +222,26 @@ async def lifespan(app: FastAPI):
     
     yield
     # Shutdown logic
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    await registry.close()
+    await batcher.close()
+    await documents.shutdown()
+    # After the batcher drains, so decisions from in-flight requests are recorded
+    await audit.close()
+    executor.shutdown(wait=True)
     models.clear()
+    model_versions.clear()
 
 app = FastAPI(
     title="Loan Prediction API",
     description="Loan approval prediction using Linear, Decision Tree & Random Forest models",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Prediction routes return ORJSONResponse directly, skipping jsonable_encoder as well
+    default_response_class=ORJSONResponse
 )
 
 # --------------------------------------------------
@@ -94,6 +256,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so request latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected(request: Request, exc: AdmissionRejected):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(DocumentTooLarge)
+async def document_too_large(request: Request, exc: DocumentTooLarge):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+@app.exception_handler(AuditOverflow)
+async def audit_overflow(request: Request, exc: AuditOverflow):
+    # Only with AUDIT_OVERFLOW=reject: refuse decisions that could not be recorded
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 # --------------------------------------------------
 # Input schema
 # --------------------------------------------------
@@ -132,52 +311,38 @@ class LoanApplication(BaseModel):
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
-def preprocess_input(data: LoanApplication) -> pd.DataFrame:
+def preprocess_input(data: LoanApplication) -> np.ndarray:
     """Preprocess loan application data with engineered features"""
-    income = data.income_annum if data.income_annum > 0 else 1.0
-    loan = data.loan_amount if data.loan_amount > 0 else 0.0
-    
-    dti_ratio = loan / income
-    total_assets = (
-        data.residential_assets_value
-        + data.commercial_assets_value
-        + data.luxury_assets_value
-        + data.bank_asset_value
-    )
-    asset_coverage = total_assets / loan if loan > 0 else 0.0
-    affordability_index = income / (loan / data.loan_term) if data.loan_term > 0 and loan > 0 else 0.0
-
-    return pd.DataFrame([{
-        "income_annum": data.income_annum,
-        "loan_amount": data.loan_amount,
-        "loan_term": data.loan_term,
-        "cibil_score": data.cibil_score,
-        "residential_assets_value": data.residential_assets_value,
-        "commercial_assets_value": data.commercial_assets_value,
-        "luxury_assets_value": data.luxury_assets_value,
-        "bank_asset_value": data.bank_asset_value,
-        "dti_ratio": dti_ratio,
-        "total_assets": total_assets,
-        "asset_coverage": asset_coverage,
-        "affordability_index": affordability_index,
-    }])
+    return build_features([data])
 
-def weighted_ensemble(preds: Dict[str, float]) -> tuple[int, float]:
-    """Combine predictions from multiple models with weighted voting"""
-    weights = {
-        "random_forest": 0.5,
-        "decision_tree": 0.3,
-        "linear": 0.2,
-    }
+def preprocess_batch(applications: List[LoanApplication]) -> np.ndarray:
+    """Preprocess many loan applications into a single feature matrix"""
+    return build_features(applications)
 
+def weighted_score(preds: Dict[str, Any]) -> Any:
+    """Weighted mean of the available predictions (scalars or equal-length arrays)"""
     # Only use weights for available models
-    available_weights = {k: v for k, v in weights.items() if k in preds}
+    available_weights = {k: v for k, v in MODEL_WEIGHTS.items() if k in preds}
     total_weight = sum(available_weights.values())
-    
+
     # Normalize weights
     normalized_weights = {k: v/total_weight for k, v in available_weights.items()}
 
-    score = sum(preds[k] * normalized_weights[k] for k in normalized_weights)
+    return sum(preds[k] * normalized_weights[k] for k in normalized_weights)
+
+def cascade_exits(preds: Dict[str, Any], margin: Optional[float] = None) -> Any:
+    """True where the first-stage score is at least ``margin`` (default CASCADE_MARGIN) away from 0.5
+
+    Predictions are clipped to [0, 1] first: an unbounded linear score far
+    outside that range is extrapolation, not extra certainty.
+    """
+    margin = CASCADE_MARGIN if margin is None else margin
+    clipped = {name: np.clip(p, 0.0, 1.0) for name, p in preds.items()}
+    return np.abs(weighted_score(clipped) - 0.5) >= margin
+
+def weighted_ensemble(preds: Dict[str, float]) -> tuple[int, float]:
+    """Combine predictions from multiple models with weighted voting"""
+    score = weighted_score(preds)
     variance = np.var(list(preds.values()))
 
     decision = int(score >= 0.5)
@@ -185,6 +350,157 @@ def weighted_ensemble(preds: Dict[str, float]) -> tuple[int, float]:
 
     return decision, confidence
 
+def ensemble_matrix(preds: Dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized weighted_ensemble over prediction arrays
+
+    Returns (score, decision, confidence) per row. NaN predictions (models
+    the cascade skipped for a row) are left out of that row, as in
+    weighted_ensemble.
+    """
+    names = [k for k in MODEL_WEIGHTS if k in preds]
+    available = {k: ~np.isnan(preds[k]) for k in names}
+    total_weight = sum(np.where(available[k], MODEL_WEIGHTS[k], 0.0) for k in names)
+    score = sum(np.where(available[k], preds[k] * (MODEL_WEIGHTS[k] / total_weight), 0.0) for k in names)
+    variance = np.nanvar(np.vstack([preds[k] for k in preds]), axis=0)
+    confidence = np.clip((1 - variance) * 100, 50.0, 100.0)
+    return score, (score >= 0.5).astype(int), confidence
+
+def recommend(final_pred: int, confidence: float) -> str:
+    """Map an ensemble decision and confidence to a recommendation label"""
+    return "Highly Recommended" if final_pred and confidence > 85 else \
+           "Recommended" if final_pred else \
+           "Requires Manual Review" if not final_pred and confidence > 70 else \
+           "Not Recommended"
+
+async def predict_matrix(X: np.ndarray) -> tuple[Dict[str, np.ndarray], Dict[str, str]]:
+    """Run every loaded model once over the feature matrix
+
+    Returns the successful predictions and the model versions that made them.
+    In cascade mode the later models only score the rows the first stage left
+    uncertain; their predictions are NaN on the rows that exited early.
+    """
+    rows = np.arange(X.shape[0], dtype=np.intp)
+    loaded = [name for name in MODEL_NAMES if name in models]
+    first = [name for name in CASCADE_FIRST if name in models] if ENSEMBLE_MODE == "cascade" else []
+    if not first:
+        outputs, versions = await executor.run_models(X, {name: rows for name in loaded})
+        preds = {name: p for name, p in outputs.items() if not isinstance(p, Exception)}
+        return preds, {name: versions[name] for name in preds}
+
+    outputs, versions = await executor.run_models(X, {name: rows for name in first})
+    preds = {name: p for name, p in outputs.items() if not isinstance(p, Exception)}
+    rest = [name for name in loaded if name not in first]
+    # If a first-stage model failed, nothing exits early
+    uncertain = rows[~cascade_exits(preds)] if preds and len(preds) == len(first) else rows
+    if rest and len(uncertain):
+        late, late_versions = await executor.run_models(X, {name: uncertain for name in rest})
+        versions.update(late_versions)
+        for name, p in late.items():
+            if not isinstance(p, Exception):
+                preds[name] = np.full(len(rows), np.nan)
+                preds[name][uncertain] = p
+    return preds, {name: versions[name] for name in preds}
+
+async def predict_one(X: np.ndarray) -> tuple[Dict[str, Any], Dict[str, str], bool]:
+    """Score one preprocessed row through the micro-batcher
+
+    Returns model name -> prediction or exception, the versions used, and
+    whether the cascade exited before the later models.
+    """
+    loaded = [m for m in MODEL_NAMES if m in models]
+    first = [m for m in CASCADE_FIRST if m in models] if ENSEMBLE_MODE == "cascade" else []
+    if not first:
+        outputs, versions = await batcher.submit(X[0], loaded)
+        return outputs, versions, False
+
+    outputs, versions = await batcher.submit(X[0], first)
+    preds = {name: p for name, p in outputs.items() if not isinstance(p, Exception)}
+    rest = [m for m in loaded if m not in first]
+    if not rest or (len(preds) == len(first) and cascade_exits(preds)):
+        return outputs, versions, bool(rest)
+
+    late, late_versions = await batcher.submit(X[0], rest)
+    return {**outputs, **late}, {**versions, **late_versions}, False
+
+executor = InferenceExecutor(models, model_versions)
+
+async def predict_rows(X: np.ndarray, requested: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Run each requested model once over its rows of X (micro-batch runner)"""
+    return await executor.run_models(X, requested)
+
+batcher = MicroBatcher(predict_rows)
+
+documents = DocumentPipeline()
+
+# Bounds concurrent prediction requests; health checks never pass through it
+admission = AdmissionController()
+
+# Every decision served is recorded off the request path
+audit = AuditSink(create_backend())
+
+# Live feature distribution vs training; None without a reference profile
+drift_monitor = DriftMonitor.load()
+
+def audit_record(route: str, inputs: Dict[str, Any], result: Dict[str, Any], cached: bool = False) -> Dict[str, Any]:
+    """Audit entry for one ensemble decision as returned to the client"""
+    preds = result["predictions"]
+    return {
+        "ts": time.time(),
+        "route": route,
+        "inputs": inputs,
+        "predictions": preds,
+        "score": float(weighted_score(preds)),
+        "decision": result["loan_status"],
+        "confidence": result["confidence"],
+        "recommendation": result["recommendation"],
+        "model_versions": result["model_versions"],
+        "ensemble_mode": result["ensemble_mode"],
+        "early_exit": result["early_exit"],
+        "cached": cached,
+    }
+
+def admitted(priority: int):
+    """Route dependency holding an admission slot from before the body is read until the response
+
+    Time queued for the slot is recorded as the ``admission_wait`` stage.
+    """
+    async def hold_slot(request: Request):
+        async with admission.slot(priority):
+            request.state.admitted = time.perf_counter()
+            started = getattr(request.state, "started", None)
+            if started is not None:
+                route = getattr(request.scope.get("route"), "path", "unmatched")
+                STAGE_SECONDS.observe(request.state.admitted - started, route, "admission_wait")
+            yield
+    return Depends(hold_slot)
+
+def document_job_links(job: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = job["job_id"]
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "status_url": f"/documents/{job_id}",
+        "events_url": f"/documents/{job_id}/events",
+    }
+
+def read_batch_csv(content: bytes) -> List[Dict[str, Any]]:
+    """Parse an uploaded CSV into raw application records"""
+    # pandas is only needed for CSV batches; keep it off the startup path
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(io.BytesIO(content))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {str(e)}")
+
+    missing = [c for c in LoanApplication.model_fields if c not in df.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"CSV is missing columns: {missing}")
+
+    df = df[list(LoanApplication.model_fields)]
+    # NaN cells become None so the not_null validator rejects them
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
 # --------------------------------------------------
 # Routes
 # --------------------------------------------------
@@ -195,7 +511,12 @@ def root():
         "message": "Loan Prediction API", 
         "docs": "/docs",
         "health": "/health",
-        "predict": "/predict"
+        "metrics": "/metrics",
+        "drift": "/drift",
+        "predict": "/predict",
+        "batch": "/predict/batch",
+        "whatif": "/predict/whatif",
+        "documents": "/documents/{job_id}"
     }
 
 @app.get("/health")
@@ -204,89 +525,431 @@ def health():
     return {
         "status": "healthy" if len(models) >= 1 else "unhealthy",
         "models_loaded": list(models.keys()),
-        "total_models": len(models)
+        "total_models": len(models),
+        "inference_engine": INFERENCE_ENGINE,
+        "model_store": MODEL_STORE_DIR,
+        "worker": {**worker_info, **memory_usage()}
     }
 
-@app.post("/predict")
-async def predict(
-    income_annum: float = Form(...),
-    loan_amount: float = Form(...),
-    loan_term: int = Form(...),
-    cibil_score: int = Form(...),
-    residential_assets_value: float = Form(...),
-    commercial_assets_value: float = Form(...),
-    luxury_assets_value: float = Form(...),
-    bank_asset_value: float = Form(...),
-    document: Optional[UploadFile] = File(None)
-):
-    """Predict loan approval status with multi-modal document support"""
+@app.get("/health/live")
+def health_live():
+    """Liveness probe: the process is up and the event loop is responsive"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def health_ready():
+    """Readiness probe: per-model load state and load time"""
+    readiness = registry.readiness()
+    status_code = 200 if readiness["ready"] else 503
+    return JSONResponse(status_code=status_code, content=readiness)
+
+# Request body formats accepted by the prediction routes besides multipart / urlencoded forms
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+# Little-endian float64 values in RAW_COLUMNS order, one application per 64 bytes
+BINARY_CONTENT_TYPE = "application/octet-stream"
+FORM_CONTENT_TYPES = ("multipart/form-data", "application/x-www-form-urlencoded")
+
+def unpack_applications(content: bytes) -> List[Dict[str, float]]:
+    """Decode a packed float64 body into raw application records"""
+    row_bytes = 8 * len(RAW_COLUMNS)
+    if not content or len(content) % row_bytes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Binary body must be a multiple of {row_bytes} bytes (float64 x {len(RAW_COLUMNS)})"
+        )
+    values = np.frombuffer(content, dtype="<f8").reshape(-1, len(RAW_COLUMNS))
+    return [dict(zip(RAW_COLUMNS, row)) for row in values.tolist()]
+
+def unpack_msgpack(content: bytes) -> Any:
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=415, detail="msgpack bodies need the msgpack package on the server")
+    try:
+        return msgpack.unpackb(content)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid msgpack body: {str(e)}")
+
+def application_body_docs(with_document: bool) -> Dict[str, Any]:
+    """OpenAPI request body for routes that parse the body themselves"""
+    schema = LoanApplication.model_json_schema()
+    form = schema
+    if with_document:
+        form = {**schema, "properties": {**schema["properties"],
+                                         "document": {"type": "string", "format": "binary"}}}
+    return {"requestBody": {"required": True, "content": {
+        "multipart/form-data": {"schema": form},
+        "application/x-www-form-urlencoded": {"schema": schema},
+        JSON_CONTENT_TYPE: {"schema": schema},
+        MSGPACK_CONTENT_TYPES[0]: {"schema": schema},
+        BINARY_CONTENT_TYPE: {"schema": {
+            "type": "string", "format": "binary",
+            "description": f"{len(RAW_COLUMNS)} little-endian float64 values in order: {', '.join(RAW_COLUMNS)}"
+        }},
+    }}}
+
+async def read_application(request: Request, route: str,
+                           with_document: bool = False) -> tuple[LoanApplication, Optional[UploadFile]]:
+    """Validate one application from a form, JSON, msgpack or packed float64 body
+
+    Returns the application and, with ``with_document``, the uploaded
+    document (forms only), which the caller then has to close or hand to
+    the document pipeline. Time from admission (or arrival, outside
+    admission) until the body is read is recorded as the ``body_parse`` stage.
+    """
+    content_type = request.headers.get("content-type", "")
+    document = None
+    if content_type.startswith(FORM_CONTENT_TYPES):
+        if content_type.startswith("multipart/form-data"):
+            # Uploads stream into the size-limited spool; request.form() would buffer them whole first
+            try:
+                form = await documents.read_form(request.headers, request.stream())
+            except MultiPartException as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            form = await request.form()
+        for key, value in form.multi_items():
+            if isinstance(value, str):
+                continue
+            if with_document and key == "document" and document is None:
+                document = value
+            else:
+                await value.close()
+        payload: Any = {k: v for k, v in form.items() if k != "document"}
+    else:
+        payload = await request.body()
+    # Queueing for the slot is admission_wait, not parsing
+    started = getattr(request.state, "admitted", None) or getattr(request.state, "started", None)
+    if started is not None:
+        STAGE_SECONDS.observe(time.perf_counter() - started, route, "body_parse")
+
+    try:
+        with STAGE_SECONDS.time(route, "validation"):
+            if isinstance(payload, dict):
+                return LoanApplication.model_validate(payload), document
+            if content_type.startswith(JSON_CONTENT_TYPE):
+                # Parsed and validated in one pass, without an intermediate dict
+                return LoanApplication.model_validate_json(payload), None
+            if content_type.startswith(MSGPACK_CONTENT_TYPES):
+                return LoanApplication.model_validate(unpack_msgpack(payload)), None
+            if content_type.startswith(BINARY_CONTENT_TYPE):
+                records = unpack_applications(payload)
+                if len(records) != 1:
+                    raise HTTPException(status_code=400, detail="Binary body must hold exactly one application")
+                return LoanApplication.model_validate(records[0]), None
+    except ValidationError as e:
+        if document is not None:
+            await document.close()
+        errors = e.errors(include_url=False, include_context=False)
+        if errors[0]["type"] == "json_invalid":
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {errors[0]['msg']}")
+        raise HTTPException(status_code=422, detail=errors)
+    raise HTTPException(
+        status_code=415,
+        detail=f"Unsupported content type '{content_type}'; send a form, JSON, msgpack or {BINARY_CONTENT_TYPE}"
+    )
+
+@app.post("/predict", openapi_extra=application_body_docs(with_document=True),
+          dependencies=[admitted(PRIORITY_ENSEMBLE)])
+async def predict(request: Request):
+    """Predict loan approval status with multi-modal document support
+
+    Accepts the application as form fields (with an optional ``document``
+    upload), JSON, msgpack or packed float64 values.
+    """
+    route = "/predict"
+    application, document = await read_application(request, route, with_document=True)
     if not models:
+        if document is not None:
+            await document.close()
         logger.error("❌ Prediction requested but no models are loaded")
         raise HTTPException(status_code=503, detail="No models loaded")
 
     try:
-        logger.info(f"📥 Received prediction request: Income={income_annum}, Loan={loan_amount}, CIBIL={cibil_score}")
-        
-        # Create application object from form data
-        application = LoanApplication(
-            income_annum=income_annum,
-            loan_amount=loan_amount,
-            loan_term=loan_term,
-            cibil_score=cibil_score,
-            residential_assets_value=residential_assets_value,
-            commercial_assets_value=commercial_assets_value,
-            luxury_assets_value=luxury_assets_value,
-            bank_asset_value=bank_asset_value
+        logger.info(
+            f"📥 Received prediction request: Income={application.income_annum}, "
+            f"Loan={application.loan_amount}, CIBIL={application.cibil_score}"
         )
 
-        X = preprocess_input(application)
-        logger.debug(f"Preprocessed features: {X.to_dict()}")
+        # Documents are verified in the background; the response carries the job to follow
+        job = None
+        if document is not None and document.filename:
+            # Already spooled while the form was read; the job takes ownership of the file
+            with STAGE_SECONDS.time(route, "document"):
+                job = documents.submit(document.file, document.filename, document.content_type or "",
+                                       application.model_dump())
+            logger.info(f"📄 Document {document.filename} queued as job {job['job_id']}")
+        elif document is not None:
+            await document.close()
+
+        def respond(result: Dict[str, Any]) -> ORJSONResponse:
+            if job is not None:
+                result = {**result, "verification_status": "Document verification pending",
+                          "document_job": document_job_links(job)}
+            return ORJSONResponse(result)
+
+        with STAGE_SECONDS.time(route, "cache_lookup"):
+            lookup_versions = dict(model_versions)
+            cache_key = PredictionCache.key(application.model_dump(), lookup_versions)
+            cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            logger.info("✅ Prediction served from cache")
+            audit.record(audit_record(route, application.model_dump(), cached, cached=True))
+            return respond(cached)
 
-        preds = {}
-        for model_name in ["linear", "decision_tree", "random_forest"]:
-            if model_name in models:
-                try:
-                    pred = models[model_name].predict(X)[0]
-                    preds[model_name] = float(pred)
-                except Exception as e:
-                    logger.error(f"❌ Error predicting with {model_name}: {e}")
+        with STAGE_SECONDS.time(route, "preprocess"):
+            X = preprocess_input(application)
+        if drift_monitor is not None:
+            drift_monitor.observe(X)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Preprocessed features: {dict(zip(FEATURE_COLUMNS, X[0]))}")
+
+        # Queueing + micro-batch scoring; per-model predict time is in loan_model_predict_duration_seconds
+        with STAGE_SECONDS.time(route, "inference"):
+            outputs, versions, early_exit = await predict_one(X)
+        preds = {name: p for name, p in outputs.items() if not isinstance(p, Exception)}
+        versions = {name: versions[name] for name in preds}
 
         if not preds:
             logger.error("❌ All models failed to provide a prediction")
             raise HTTPException(status_code=500, detail="All model predictions failed")
 
-        final_pred, confidence = weighted_ensemble(preds)
+        with STAGE_SECONDS.time(route, "ensemble"):
+            final_pred, confidence = weighted_ensemble(preds)
         logger.info(f"✅ Prediction complete: Approved={final_pred}, Confidence={confidence:.2f}%")
 
-        # Multi-modal verification logic
-        verification_status = "Data-only verification"
-        if document:
-            logger.info(f"Analyzing uploaded document: {document.filename}")
-            # Simulate OCR/PDF processing
-            verification_status = f"Verified via {document.filename} analysis"
-            # Boost confidence slightly if document is present (simulation)
-            confidence = min(99.0, confidence + 2.0)
-
-        # Recommendation logic
-        recommendation = "Highly Recommended" if final_pred and confidence > 85 else \
-                         "Recommended" if final_pred else \
-                         "Requires Manual Review" if not final_pred and confidence > 70 else \
-                         "Not Recommended"
-
-        return {
+        recommendation = recommend(final_pred, confidence)
+
+        result = {
             "approved": bool(final_pred),
             "loan_status": int(final_pred),
             "confidence": round(confidence, 2),
             "recommendation": recommendation,
             "predictions": preds,
             "models_used": list(preds.keys()),
-            "verification_status": verification_status
+            "model_versions": versions,
+            "ensemble_mode": ENSEMBLE_MODE,
+            "early_exit": early_exit,
+            "verification_status": "Data-only verification"
         }
-    
+        # Partial ensembles (a model failed) are not cached; key on the versions actually used.
+        # Models skipped by an early exit did not affect the result, so they keep their lookup versions.
+        if len(preds) == len(outputs):
+            prediction_cache.put(PredictionCache.key(application.model_dump(), {**lookup_versions, **versions}), result)
+        audit.record(audit_record(route, application.model_dump(), result))
+        return respond(result)
+
+    except DocumentQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Document queue is full: {e}", headers={"Retry-After": "5"})
+    except (HTTPException, AuditOverflow):
+        raise
     except Exception as e:
         logger.exception("Prediction error")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+_batch_adapter = TypeAdapter(List[LoanApplication])
+
+@app.post("/predict/batch", dependencies=[admitted(PRIORITY_BATCH)])
+async def predict_batch(request: Request):
+    """Predict loan approval for many applications in one pass
+
+    Accepts either a JSON array of applications or a multipart upload
+    (field ``file``) / ``text/csv`` body with the LoanApplication columns.
+    """
+    route = "/predict/batch"
+    if not models:
+        logger.error("❌ Batch prediction requested but no models are loaded")
+        raise HTTPException(status_code=503, detail="No models loaded")
+
+    parse_started = time.perf_counter()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Multipart batch requires a CSV 'file' field")
+        records = read_batch_csv(await upload.read())
+    elif content_type.startswith("text/csv"):
+        records = read_batch_csv(await request.body())
+    elif content_type.startswith(BINARY_CONTENT_TYPE):
+        records = unpack_applications(await request.body())
+    elif content_type.startswith(MSGPACK_CONTENT_TYPES):
+        records = unpack_msgpack(await request.body())
+        if not isinstance(records, list):
+            raise HTTPException(status_code=422, detail="msgpack batch must be an array of applications")
+    else:
+        try:
+            records = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or CSV")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=422, detail="JSON batch must be an array of applications")
+    STAGE_SECONDS.observe(time.perf_counter() - parse_started, route, "body_parse")
+
+    if not records:
+        raise HTTPException(status_code=422, detail="Batch is empty")
+    if len(records) > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_ROWS} rows")
+
+    try:
+        with STAGE_SECONDS.time(route, "validation"):
+            applications = _batch_adapter.validate_python(records)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    try:
+        logger.info(f"📥 Received batch prediction request: {len(applications)} rows")
+        with STAGE_SECONDS.time(route, "preprocess"):
+            X = preprocess_batch(applications)
+        if drift_monitor is not None:
+            drift_monitor.observe(X)
+        with STAGE_SECONDS.time(route, "inference"):
+            batch_preds, versions = await predict_matrix(X)
+
+        if not batch_preds:
+            logger.error("❌ All models failed to provide a prediction")
+            raise HTTPException(status_code=500, detail="All model predictions failed")
+
+        ensemble_started = time.perf_counter()
+        results = []
+        for i in range(len(applications)):
+            # Models the cascade skipped for this row are NaN
+            preds = {name: float(p[i]) for name, p in batch_preds.items() if not np.isnan(p[i])}
+            final_pred, confidence = weighted_ensemble(preds)
+            results.append({
+                "approved": bool(final_pred),
+                "loan_status": int(final_pred),
+                "confidence": round(confidence, 2),
+                "recommendation": recommend(final_pred, confidence),
+                "predictions": preds,
+                "models_used": list(preds.keys()),
+                "model_versions": {name: versions[name] for name in preds},
+                "ensemble_mode": ENSEMBLE_MODE,
+                "early_exit": len(preds) < len(batch_preds),
+                "verification_status": "Data-only verification"
+            })
+        STAGE_SECONDS.observe(time.perf_counter() - ensemble_started, route, "ensemble")
+        audit.record_many([audit_record(route, application.model_dump(), result)
+                           for application, result in zip(applications, results)])
+
+        logger.info(f"✅ Batch prediction complete: {len(results)} rows")
+        return ORJSONResponse({
+            "count": len(results),
+            "models_used": list(batch_preds.keys()),
+            "model_versions": versions,
+            "ensemble_mode": ENSEMBLE_MODE,
+            "results": results
+        })
+
+    except (HTTPException, AuditOverflow):
+        raise
+    except Exception as e:
+        logger.exception("Batch prediction error")
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+INTEGER_FIELDS = {name for name, field in LoanApplication.model_fields.items() if field.annotation is int}
+
+class SweepAxis(BaseModel):
+    field: Literal[RAW_COLUMNS]
+    start: float
+    stop: float
+    steps: int = Field(..., ge=2, le=MAX_SWEEP_STEPS)
+
+    @model_validator(mode="after")
+    def ordered(self):
+        if self.stop <= self.start:
+            raise ValueError("stop must be greater than start")
+        return self
+
+    def values(self) -> np.ndarray:
+        values = np.linspace(self.start, self.stop, self.steps)
+        # Integer fields are swept over distinct whole numbers only
+        return np.unique(np.round(values)) if self.field in INTEGER_FIELDS else values
+
+class WhatIfRequest(BaseModel):
+    application: LoanApplication
+    sweep: List[SweepAxis] = Field(..., min_length=1, max_length=2)
+
+    @model_validator(mode="after")
+    def distinct_fields(self):
+        if len({axis.field for axis in self.sweep}) != len(self.sweep):
+            raise ValueError("Swept fields must be distinct")
+        return self
+
+def decision_boundary(score: np.ndarray, axes: List[np.ndarray], fields: List[str]) -> List[Dict[str, float]]:
+    """Points where the ensemble score crosses 0.5 between neighbouring grid cells
+
+    Crossings are linearly interpolated along each axis; for two axes the
+    points trace the boundary curve.
+    """
+    points = []
+    for axis, (values, field) in enumerate(zip(axes, fields)):
+        lo = np.take(score, np.arange(len(values) - 1), axis=axis)
+        hi = np.take(score, np.arange(1, len(values)), axis=axis)
+        for index in np.argwhere((lo >= 0.5) != (hi >= 0.5)):
+            i = tuple(index)
+            t = (0.5 - lo[i]) / (hi[i] - lo[i])
+            step = index[axis]
+            point = {f: float(axes[a][index[a]]) for a, f in enumerate(fields)}
+            point[field] = float(values[step] + t * (values[step + 1] - values[step]))
+            points.append(point)
+    return sorted(points, key=lambda p: tuple(p[f] for f in fields))
+
+@app.post("/predict/whatif", dependencies=[admitted(PRIORITY_BATCH)])
+async def predict_whatif(request: WhatIfRequest):
+    """Score a grid of variations of one application in a single ensemble pass
+
+    Sweeps one or two fields over ``steps`` evenly spaced values each and
+    returns the approval surface (indexed [first axis][second axis]) and the
+    decision boundary. Sweeps are exploratory and are not audited.
+    """
+    route = "/predict/whatif"
+    if not models:
+        raise HTTPException(status_code=503, detail="No models loaded")
+
+    axes = [axis.values() for axis in request.sweep]
+    fields = [axis.field for axis in request.sweep]
+    base = request.application.model_dump()
+    # Bounds are monotone, so valid endpoints mean every grid value is valid
+    for field, values in zip(fields, axes):
+        for value in (values[0], values[-1]):
+            try:
+                LoanApplication.model_validate({**base, field: value})
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+
+    with STAGE_SECONDS.time(route, "preprocess"):
+        grid = np.meshgrid(*axes, indexing="ij")
+        X = np.repeat(preprocess_input(request.application), grid[0].size, axis=0)
+        for field, values in zip(fields, grid):
+            X[:, RAW_COLUMNS.index(field)] = values.ravel()
+        fill_engineered(X)
+
+    with STAGE_SECONDS.time(route, "inference"):
+        preds, versions = await predict_matrix(X)
+    if not preds:
+        raise HTTPException(status_code=500, detail="All model predictions failed")
+
+    with STAGE_SECONDS.time(route, "ensemble"):
+        score, decision, confidence = ensemble_matrix(preds)
+        shape = grid[0].shape
+        score, decision, confidence = score.reshape(shape), decision.reshape(shape), confidence.reshape(shape)
+        boundary = decision_boundary(score, axes, fields)
+
+    return ORJSONResponse({
+        "axes": [{"field": f, "values": v.tolist()} for f, v in zip(fields, axes)],
+        "points": int(score.size),
+        "score": score.tolist(),
+        "approved": decision.astype(bool).tolist(),
+        "confidence": np.round(confidence, 2).tolist(),
+        "approval_rate": float(decision.mean()),
+        "boundary": boundary,
+        "models_used": list(preds.keys()),
+        "model_versions": versions,
+        "ensemble_mode": ENSEMBLE_MODE
+    })
+
 @app.get("/models")
 def list_models():
     """List available models"""
@@ -295,41 +958,185 @@ def list_models():
         "count": len(models)
     }
 
-@app.post("/predict/individual/{model_name}")
+@app.get("/stats")
+def stats():
+    """Serving statistics"""
+    return {
+        "batching": batcher.stats(),
+        "executor": executor.stats(),
+        "cache": prediction_cache.stats(),
+        "documents": documents.stats(),
+        "admission": admission.stats(),
+        "audit": audit.stats()
+    }
+
+def serving_metrics() -> List[str]:
+    """Cache, batching and executor state, read at scrape time"""
+    cache, batching, pool = prediction_cache.stats(), batcher.stats(), executor.stats()
+    return (
+        sample_lines("loan_models_loaded", "Models currently loaded", len(models))
+        + sample_lines("loan_cache_hits_total", "Prediction cache hits", cache["hits"], "counter")
+        + sample_lines("loan_cache_misses_total", "Prediction cache misses", cache["misses"], "counter")
+        + sample_lines("loan_cache_entries", "Prediction cache entries", cache["entries"])
+        + sample_lines("loan_batches_total", "Micro-batches scored", batching["batches"], "counter")
+        + sample_lines("loan_batch_rows_total", "Rows scored through the micro-batcher", batching["rows"], "counter")
+        + sample_lines("loan_batch_pending_rows", "Rows waiting for the next micro-batch", batching["pending"])
+        + sample_lines("loan_executor_in_flight", "Inference jobs running or queued on the executor", pool["in_flight"])
+        + sample_lines("loan_admission_active", "Requests holding a scoring slot", admission.active)
+        + sample_lines("loan_admission_queued", "Requests waiting for a scoring slot", admission.queued())
+        + sample_lines("loan_document_jobs_pending", "Document jobs queued or running", documents.pending)
+        + sample_lines("loan_document_jobs_failed_total", "Document jobs that failed", documents.failed, "counter")
+        + sample_lines("loan_document_uploads_rejected_total", "Uploads refused (too large or queue full)",
+                       documents.rejected, "counter")
+        + sample_lines("loan_audit_buffered", "Audit records waiting to be written", audit.stats()["buffered"])
+        + sample_lines("loan_audit_written_total", "Audit records written", audit.written, "counter")
+        + sample_lines("loan_audit_dropped_total", "Audit records dropped on overflow or failed writes",
+                       audit.dropped, "counter")
+        + sample_lines("loan_audit_write_failures_total", "Audit batch writes that failed", audit.failed_writes, "counter")
+    )
+
+def drift_metrics() -> List[str]:
+    # Looked up per scrape: a reload can replace the monitor
+    return drift_monitor.metric_lines() if drift_monitor is not None else []
+
+REGISTRY.collectors.append(serving_metrics)
+REGISTRY.collectors.append(drift_metrics)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics for this worker process"""
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/drift")
+def drift():
+    """PSI and KS drift of live scored rows against the training feature distribution"""
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="No drift reference profile; run training/pipeline.py")
+    return drift_monitor.report()
+
+# --------------------------------------------------
+# Documents
+# --------------------------------------------------
+@app.get("/documents/{job_id}")
+async def document_status(job_id: str, wait: float = Query(0.0, ge=0, le=30)):
+    """Document verification job; ``wait`` long-polls up to that many seconds for it to finish"""
+    job = await documents.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Document job '{job_id}' not found or expired")
+    return job
+
+@app.get("/documents/{job_id}/events")
+async def document_events(job_id: str):
+    """Server-sent events: the job's current state, then its final state when it finishes"""
+    job = documents.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Document job '{job_id}' not found or expired")
+
+    async def stream():
+        current = job
+        yield sse_event("status", current)
+        while current is not None and current["finished_at"] is None:
+            current = await documents.wait(job_id, 15.0)
+            if current is not None and current["finished_at"] is None:
+                yield ": keep-alive\n\n"
+        if current is not None:
+            yield sse_event("result", current)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# --------------------------------------------------
+# Admin
+# --------------------------------------------------
+def require_admin(token: Optional[str]) -> None:
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+class ReloadRequest(BaseModel):
+    models: Optional[List[str]] = None
+    force: bool = False
+
+@app.get("/admin/models")
+def admin_models(x_admin_token: Optional[str] = Header(None)):
+    """Active and available model versions"""
+    require_admin(x_admin_token)
+    return registry.describe()
+
+@app.post("/admin/models/reload")
+async def admin_reload(request: Optional[ReloadRequest] = None, x_admin_token: Optional[str] = Header(None)):
+    """Re-read the manifest, warm changed versions and swap them in (this worker only)"""
+    require_admin(x_admin_token)
+    if SERVE_WORKERS > 1:
+        # The request lands on one worker; the others would keep serving the old versions
+        how = (f"every worker reloads it within {MODEL_WATCH_SECONDS:g}s" if MODEL_WATCH_SECONDS > 0
+               else "restart serve.py to load it")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Reload reaches only one of {SERVE_WORKERS} workers; update model/manifest.json and {how}"
+        )
+    request = request or ReloadRequest()
+    await export_activated()
+    try:
+        results = await registry.reload(request.models, force=request.force)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("Model reload failed")
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+
+    apply_reload(results)
+    return {"results": results, "active": dict(model_versions)}
+
+@app.post("/admin/drift/reset")
+def admin_drift_reset(x_admin_token: Optional[str] = Header(None)):
+    """Start a new drift window, e.g. after retraining"""
+    require_admin(x_admin_token)
+    if drift_monitor is None:
+        raise HTTPException(status_code=503, detail="No drift reference profile; run training/pipeline.py")
+    rows = drift_monitor.rows
+    drift_monitor.reset()
+    return {"reset": True, "rows_discarded": rows}
+
+@app.post("/predict/individual/{model_name}", openapi_extra=application_body_docs(with_document=False),
+          dependencies=[admitted(PRIORITY_INDIVIDUAL)])
 async def predict_individual(
+    request: Request,
     model_name: str,
-    income_annum: float = Form(...),
-    loan_amount: float = Form(...),
-    loan_term: int = Form(...),
-    cibil_score: int = Form(...),
-    residential_assets_value: float = Form(...),
-    commercial_assets_value: float = Form(...),
-    luxury_assets_value: float = Form(...),
-    bank_asset_value: float = Form(...),
 ):
-    """Predict loan approval using a specific model"""
+    """Predict loan approval using a specific model (same body formats as /predict)"""
+    route = "/predict/individual/{model_name}"
+    application, _ = await read_application(request, route)
     if model_name not in models:
         raise HTTPException(status_code=404, detail=f"Model '{model_name}' not found")
 
     try:
-        application = LoanApplication(
-            income_annum=income_annum,
-            loan_amount=loan_amount,
-            loan_term=loan_term,
-            cibil_score=cibil_score,
-            residential_assets_value=residential_assets_value,
-            commercial_assets_value=commercial_assets_value,
-            luxury_assets_value=luxury_assets_value,
-            bank_asset_value=bank_asset_value
-        )
-        X = preprocess_input(application)
-        pred = models[model_name].predict(X)[0]
-        
-        return {
+        with STAGE_SECONDS.time(route, "preprocess"):
+            X = preprocess_input(application)
+        if drift_monitor is not None:
+            drift_monitor.observe(X)
+        with STAGE_SECONDS.time(route, "inference"):
+            outputs, versions = await batcher.submit(X[0], [model_name])
+        pred = outputs[model_name]
+        if isinstance(pred, Exception):
+            raise pred
+
+        audit.record({
+            "ts": time.time(),
+            "route": route,
+            "inputs": application.model_dump(),
+            "predictions": {model_name: float(pred)},
+            "score": float(pred),
+            "decision": int(pred >= 0.5),
+            "model_versions": {model_name: versions.get(model_name)},
+            "cached": False,
+        })
+        return ORJSONResponse({
             "model": model_name,
+            "model_version": versions.get(model_name),
             "prediction": float(pred),
             "approved": bool(pred >= 0.5)
-        }
+        })
+    except AuditOverflow:
+        raise
     except Exception as e:
         logger.exception(f"Individual prediction error for {model_name}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,315 @@
+"""
+Asynchronous, batched audit log of prediction decisions
+Requests only append a record to a bounded in-memory buffer; a background
+task writes the buffer to the backend in batches, when AUDIT_BATCH_SIZE
+records are waiting or every AUDIT_FLUSH_INTERVAL_MS, and drains it on
+shutdown. Backends: rotating JSONL files, SQLite, or MongoDB (motor).
+
+Overflow policy (AUDIT_OVERFLOW) when the buffer is full:
+  drop_oldest  evict the oldest buffered record (default)
+  drop_newest  discard the new record
+  reject       refuse the request (AuditOverflow), so no decision goes unrecorded
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BACKEND = os.getenv("AUDIT_BACKEND", "jsonl").lower()
+AUDIT_DIR = Path(os.getenv("AUDIT_DIR", Path(__file__).resolve().parent / "audit"))
+AUDIT_SQLITE_PATH = Path(os.getenv("AUDIT_SQLITE_PATH", AUDIT_DIR / "audit.db"))
+AUDIT_ROTATE_BYTES = int(os.getenv("AUDIT_ROTATE_BYTES", str(64 * 1024 * 1024)))
+AUDIT_MONGO_URI = os.getenv("AUDIT_MONGO_URI", os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+AUDIT_MONGO_DB = os.getenv("AUDIT_MONGO_DB", "loan_prediction")
+AUDIT_MONGO_COLLECTION = os.getenv("AUDIT_MONGO_COLLECTION", "audit")
+
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "50000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_MS = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "1000"))
+AUDIT_OVERFLOW = os.getenv("AUDIT_OVERFLOW", "drop_oldest").lower()
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "reject")
+# Retry delay after a failed write doubles up to this
+MAX_BACKOFF_SECONDS = 30.0
+
+class AuditOverflow(Exception):
+    pass
+
+# -------- Backends --------
+class JsonlBackend:
+    """Append-only JSON lines, rotated by size; one file set per process"""
+
+    name = "jsonl"
+
+    def __init__(self, directory: Path = AUDIT_DIR, rotate_bytes: int = AUDIT_ROTATE_BYTES):
+        self.directory = directory
+        self.rotate_bytes = rotate_bytes
+        self._file = None
+        self._size = 0
+        self._sequence = 0
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        self._sequence += 1
+        path = self.directory / f"audit-{stamp}-{os.getpid()}-{self._sequence:04d}.jsonl"
+        self._file = open(path, "ab")
+        self._size = 0
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        if self._file is None or self._size >= self.rotate_bytes:
+            self._rotate()
+        payload = b"".join(orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n" for r in records)
+        self._file.write(payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._size += len(payload)
+
+    async def open(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._write, records)
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class SqliteBackend:
+    """One row per decision; WAL mode so several workers can share the file"""
+
+    name = "sqlite"
+    COLUMNS = ("ts", "route", "decision", "score", "confidence", "record")
+
+    def __init__(self, path: Path = AUDIT_SQLITE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS audit (id INTEGER PRIMARY KEY, ts REAL, route TEXT, "
+            "decision INTEGER, score REAL, confidence REAL, record TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS audit_ts ON audit (ts)")
+        self._conn.commit()
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        rows = [(r.get("ts"), r.get("route"), r.get("decision"), r.get("score"), r.get("confidence"),
+                 orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY).decode()) for r in records]
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO audit ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})", rows
+            )
+
+    async def open(self) -> None:
+        await asyncio.to_thread(self._open)
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(self._write, records)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await asyncio.to_thread(self._conn.close)
+            self._conn = None
+
+class MongoBackend:
+    """insert_many into a MongoDB collection through motor"""
+
+    name = "mongo"
+
+    def __init__(self, uri: str = AUDIT_MONGO_URI, database: str = AUDIT_MONGO_DB,
+                 collection: str = AUDIT_MONGO_COLLECTION):
+        self.uri = uri
+        self.database = database
+        self.collection_name = collection
+        self._client = None
+        self._collection = None
+
+    async def open(self) -> None:
+        try:
+            from motor.motor_asyncio import AsyncIOMotorClient
+        except ImportError:
+            raise RuntimeError("AUDIT_BACKEND=mongo needs motor (pip install motor)")
+        self._client = AsyncIOMotorClient(self.uri)
+        self._collection = self._client[self.database][self.collection_name]
+
+    async def write(self, records: List[Dict[str, Any]]) -> None:
+        # insert_many adds _id to the dicts; copy so buffered records stay plain
+        await self._collection.insert_many([dict(r) for r in records], ordered=False)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+BACKENDS = {"jsonl": JsonlBackend, "sqlite": SqliteBackend, "mongo": MongoBackend}
+
+def create_backend(name: str = AUDIT_BACKEND):
+    """Backend instance for AUDIT_BACKEND, or None when auditing is off"""
+    if name in ("", "none", "off"):
+        return None
+    if name not in BACKENDS:
+        raise RuntimeError(f"Unknown AUDIT_BACKEND '{name}', expected one of {sorted(BACKENDS)} or 'none'")
+    return BACKENDS[name]()
+
+# -------- Sink --------
+class AuditSink:
+    """Bounded buffer of audit records flushed in batches by a background task"""
+
+    def __init__(
+        self,
+        backend,
+        buffer_size: int = AUDIT_BUFFER_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: float = AUDIT_FLUSH_INTERVAL_MS,
+        overflow: str = AUDIT_OVERFLOW,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise RuntimeError(f"Unknown AUDIT_OVERFLOW '{overflow}', expected one of {OVERFLOW_POLICIES}")
+        self.backend = backend
+        self.buffer_size = max(1, buffer_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.overflow = overflow
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._failures = 0
+
+        # Statistics
+        self.written = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.failed_writes = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Buffer one record without blocking; applies the overflow policy when full"""
+        if self.backend is None:
+            return
+        if len(self._buffer) >= self.buffer_size:
+            if self.overflow == "reject":
+                self.rejected += 1
+                raise AuditOverflow(f"Audit buffer full ({self.buffer_size} records)")
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._buffer.popleft()
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def record_many(self, entries: List[Dict[str, Any]]) -> None:
+        if self.backend is None:
+            return
+        free = self.buffer_size - len(self._buffer)
+        if self.overflow == "reject" and len(entries) > free:
+            self.rejected += len(entries)
+            raise AuditOverflow(f"Audit buffer cannot take {len(entries)} records ({free} free)")
+        for entry in entries:
+            self.record(entry)
+
+    async def start(self) -> None:
+        if self.backend is None:
+            logger.info("✓ Audit log disabled")
+            return
+        await self.backend.open()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✓ Audit log: {self.backend.name}, batch {self.batch_size}, "
+                    f"buffer {self.buffer_size} ({self.overflow})")
+
+    async def _pause(self, seconds: float) -> None:
+        """Wait until ``seconds`` pass, a batch fills up or close() is called"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            # Read the flag before flushing: once set, this pass drains everything
+            stopping = self._stopping
+            self._wakeup.clear()
+            delay = self.flush_interval
+            while self._buffer:
+                if not await self.flush_batch():
+                    # Back off; records keep buffering under the overflow policy meanwhile
+                    delay = min(self.flush_interval * 2 ** self._failures, MAX_BACKOFF_SECONDS)
+                    break
+                if not stopping and len(self._buffer) < self.batch_size:
+                    break
+            if stopping:
+                return
+            await self._pause(delay)
+
+    async def flush_batch(self) -> bool:
+        """Write up to batch_size buffered records; False (records kept) on failure"""
+        batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+        if not batch:
+            return True
+        try:
+            await self.backend.write(batch)
+        except Exception as e:
+            # Put the batch back in front, within the buffer bound
+            room = self.buffer_size - len(self._buffer)
+            self._buffer.extendleft(reversed(batch[len(batch) - room:] if room < len(batch) else batch))
+            self.dropped += max(0, len(batch) - room)
+            self._failures += 1
+            self.failed_writes += 1
+            self.last_error = str(e)
+            logger.error(f"❌ Audit write of {len(batch)} records failed: {e}")
+            return False
+        self._failures = 0
+        self.written += len(batch)
+        return True
+
+    async def close(self) -> None:
+        """Let the flusher drain the buffer and exit, then close the backend
+
+        The flusher is never cancelled, so a write in progress completes
+        before the backend is closed underneath it.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._buffer:
+            logger.error(f"❌ {len(self._buffer)} audit records lost at shutdown")
+        await self.backend.close()
+        logger.info(f"✓ Audit log closed after {self.written} records")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "buffered": len(self._buffer),
+            "buffer_size": self.buffer_size,
+            "overflow": self.overflow,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "failed_writes": self.failed_writes,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,148 @@
+"""
+Async micro-batching for single-row prediction requests
+Concurrent /predict calls are queued, stacked into one matrix and scored
+with a single predict call per model
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+
+# (stacked rows, model name -> row indices)
+#   -> (model name -> predictions or exception, model name -> version used)
+BatchRunner = Callable[
+    [np.ndarray, Dict[str, np.ndarray]],
+    Awaitable[Tuple[Dict[str, Any], Dict[str, str]]]
+]
+
+class MicroBatcher:
+    """Coalesces concurrent single-row requests into batched model calls
+
+    A batch is flushed when ``max_batch_size`` rows are queued or when the
+    oldest queued row has waited ``max_wait_ms``, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        max_wait_ms: float = BATCH_MAX_WAIT_MS,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.runner = runner
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: List[Tuple[np.ndarray, Sequence[str], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+        # Statistics
+        self.batches = 0
+        self.rows = 0
+        self.max_seen = 0
+        self.size_flushes = 0
+        self.timeout_flushes = 0
+        self.size_histogram: Dict[int, int] = {}
+
+    async def submit(
+        self, row: np.ndarray, model_names: Sequence[str]
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Queue one feature row and wait for its per-model predictions
+
+        Returns (predictions, versions): predictions maps each model name to a
+        float, or to the exception the model raised for the row's batch;
+        versions maps each model that ran to the version used.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, tuple(model_names), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.size_flushes += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timeout)
+
+        return await future
+
+    def _on_timeout(self) -> None:
+        self._timer = None
+        if self._pending:
+            self.timeout_flushes += 1
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        self._record(len(batch))
+
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[np.ndarray, Sequence[str], asyncio.Future]]) -> None:
+        try:
+            X = np.vstack([row for row, _, _ in batch])
+            requested: Dict[str, List[int]] = {}
+            for i, (_, names, _) in enumerate(batch):
+                for name in names:
+                    requested.setdefault(name, []).append(i)
+            outputs, versions = await self.runner(
+                X, {k: np.asarray(v, dtype=np.intp) for k, v in requested.items()}
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        positions = {name: {row: j for j, row in enumerate(rows)} for name, rows in requested.items()}
+        for i, (_, names, future) in enumerate(batch):
+            if future.done():
+                continue
+            result = {}
+            for name in names:
+                out = outputs.get(name, KeyError(name))
+                result[name] = out if isinstance(out, Exception) else float(out[positions[name][i]])
+            future.set_result((result, {n: versions[n] for n in names if n in versions}))
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.rows += size
+        self.max_seen = max(self.max_seen, size)
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+
+    async def close(self) -> None:
+        """Flush anything still queued and wait for running batches"""
+        if self._pending:
+            self._flush()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "max_observed_batch_size": self.max_seen,
+            "size_flushes": self.size_flushes,
+            "timeout_flushes": self.timeout_flushes,
+            "pending": len(self._pending),
+            "running_batches": len(self._running),
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.size_histogram.items())},
+        }
@@ -0,0 +1,258 @@
+"""
+In-process benchmark suite for the serving hot path
+Drives the FastAPI app through httpx's ASGI transport (no network) and times
+the pieces of a prediction: feature building, each model's predict, the
+weighted ensemble and the end-to-end routes, at batch sizes from 1 to 10k.
+
+Usage:
+  python bench.py                              # print p50 / p99 / throughput
+  python bench.py --save-baseline bench_baseline.json
+  python bench.py --baseline bench_baseline.json --tolerance 0.25
+  python bench.py --sizes 1 100 --only predict route:/predict
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent
+RAW_PATH = BASE_DIR / "dataset" / "loan_approval_dataset.csv"
+DEFAULT_BASELINE = BASE_DIR / "bench_baseline.json"
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+# Each case repeats until it has run this long and at least MIN_ITERS times
+MIN_SECONDS = 1.0
+MIN_ITERS = 5
+MAX_ITERS = 2000
+
+# Regressions smaller than this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 0.05
+
+@lru_cache(maxsize=1)
+def _dataset_rows() -> List[Dict[str, Any]]:
+    import pandas as pd
+    from features import RAW_COLUMNS
+
+    raw = pd.read_csv(RAW_PATH, skipinitialspace=True)[list(RAW_COLUMNS)]
+    return raw[(raw >= 0).all(axis=1)].to_dict(orient="records")
+
+def sample_applications(n: int, salt: int = 0) -> List[Dict[str, Any]]:
+    """n realistic applications; ``salt`` shifts income so repeated runs miss the prediction cache"""
+    base = _dataset_rows()
+    rows = [dict(base[i % len(base)]) for i in range(n)]
+    for i, row in enumerate(rows):
+        row["income_annum"] += salt * n + i
+    return rows
+
+# A case returns the latencies (seconds) it observed in one iteration
+Call = Callable[[int], Union[List[float], Awaitable[List[float]]]]
+
+def summarize(samples: List[float], rows: int, iterations: int, wall: float) -> Dict[str, Any]:
+    ms = np.asarray(samples) * 1000
+    return {
+        "rows": rows,
+        "iterations": iterations,
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "rows_per_s": round(rows * iterations / wall, 1),
+    }
+
+async def repeat(call: Call, rows: int, min_seconds: float, max_iters: int) -> Dict[str, Any]:
+    """Run ``call(i)`` until the time budget is spent"""
+
+    async def once(i: int) -> List[float]:
+        out = call(i)
+        return await out if inspect.isawaitable(out) else out
+
+    await once(-1)  # warm-up, not recorded
+    samples: List[float] = []
+    iterations = 0
+    started = time.perf_counter()
+    while iterations < MIN_ITERS or (time.perf_counter() - started < min_seconds and iterations < max_iters):
+        samples.extend(await once(iterations))
+        iterations += 1
+    return summarize(samples, rows, iterations, time.perf_counter() - started)
+
+def timed(fn: Callable[[], Any]) -> List[float]:
+    started = time.perf_counter()
+    fn()
+    return [time.perf_counter() - started]
+
+async def run_suite(sizes: List[int], only: Optional[List[str]], min_seconds: float) -> Dict[str, Any]:
+    import httpx
+    from app import (LoanApplication, app, models, preprocess_batch, preprocess_input,
+                     weighted_ensemble, MAX_BATCH_ROWS)
+
+    results: Dict[str, Any] = {}
+
+    def wanted(case: str) -> bool:
+        return not only or any(case.startswith(prefix) for prefix in only)
+
+    async def bench(case: str, rows: int, call: Call) -> None:
+        if not wanted(case):
+            return
+        # Large batches are slow per iteration; cap the count instead of the clock
+        max_iters = MAX_ITERS if rows <= 100 else max(MIN_ITERS, MAX_ITERS // rows)
+        results[case] = await repeat(call, rows, min_seconds, max_iters)
+        r = results[case]
+        print(f"{case:<44} p50={r['p50_ms']:>10.3f}ms  p99={r['p99_ms']:>10.3f}ms  "
+              f"{r['rows_per_s']:>12,.0f} rows/s", flush=True)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for n in sizes:
+                records = sample_applications(n)
+                applications = [LoanApplication(**r) for r in records]
+                X = preprocess_batch(applications)
+
+                # -------- Components --------
+                if n == 1:
+                    await bench("preprocess_input@1", n,
+                                lambda i: timed(lambda: preprocess_input(applications[0])))
+                else:
+                    await bench(f"preprocess_batch@{n}", n,
+                                lambda i: timed(lambda: preprocess_batch(applications)))
+
+                for name, model in list(models.items()):
+                    await bench(f"predict:{name}@{n}", n,
+                                lambda i, m=model: timed(lambda: m.predict(X)))
+
+                preds = {name: np.asarray(m.predict(X), dtype=float) for name, m in models.items()}
+                per_row = [{name: float(p[j]) for name, p in preds.items()} for j in range(n)]
+                await bench(f"weighted_ensemble@{n}", n,
+                            lambda i: timed(lambda: [weighted_ensemble(p) for p in per_row]))
+
+                # -------- Routes: n concurrent requests per iteration --------
+                async def post(url: str, data: Dict[str, Any], body: str = "form") -> float:
+                    started = time.perf_counter()
+                    if body == "json":
+                        response = await client.post(url, json=data)
+                    else:
+                        response = await client.post(url, data=data)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} -> {response.status_code}: {response.text[:200]}")
+                    return time.perf_counter() - started
+
+                async def wave(url: str, i: int, body: str = "form") -> List[float]:
+                    rows = sample_applications(n, salt=i + 2) if i >= 0 else records
+                    return list(await asyncio.gather(*[post(url, row, body) for row in rows]))
+
+                await bench(f"route:/predict@{n}", n, lambda i: wave("/predict", i))
+                # Fresh rows, so the JSON case does not hit cache entries left by the form case
+                await bench(f"route:/predict[json]@{n}", n,
+                            lambda i: wave("/predict", i + 1_000_000 if i >= 0 else i, "json"))
+                for name in list(models):
+                    url = f"/predict/individual/{name}"
+                    await bench(f"route:{url}@{n}", n, lambda i, u=url: wave(u, i))
+
+                if n <= MAX_BATCH_ROWS:
+                    async def batch(i: int) -> List[float]:
+                        body = sample_applications(n, salt=i + 2) if i >= 0 else records
+                        started = time.perf_counter()
+                        response = await client.post("/predict/batch", json=body)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"/predict/batch -> {response.status_code}")
+                        return [time.perf_counter() - started]
+
+                    await bench(f"route:/predict/batch@{n}", n, batch)
+
+                if n == 1:
+                    # One 50x50 what-if grid should cost about one request, not 2,500
+                    sweep = {"application": records[0], "sweep": [
+                        {"field": "loan_amount", "start": 1e6, "stop": 4e7, "steps": 50},
+                        {"field": "cibil_score", "start": 300, "stop": 900, "steps": 50},
+                    ]}
+
+                    async def whatif(i: int) -> List[float]:
+                        started = time.perf_counter()
+                        response = await client.post("/predict/whatif", json=sweep)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"/predict/whatif -> {response.status_code}")
+                        return [time.perf_counter() - started]
+
+                    await bench("route:/predict/whatif@2500", 2500, whatif)
+
+    return results
+
+def environment() -> Dict[str, Any]:
+    import sklearn
+    from inference import INFERENCE_ENGINE
+    from executor import INFERENCE_EXECUTOR
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "inference_engine": INFERENCE_ENGINE,
+        "inference_executor": INFERENCE_EXECUTOR,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Cases whose p50 got slower than the baseline by more than ``tolerance``"""
+    regressions = []
+    for case, base in baseline.get("results", {}).items():
+        current = results.get(case)
+        if current is None:
+            continue
+        limit = base["p50_ms"] * (1 + tolerance)
+        if current["p50_ms"] > limit and current["p50_ms"] - base["p50_ms"] > NOISE_FLOOR_MS:
+            regressions.append(
+                f"{case}: p50 {base['p50_ms']:.3f}ms -> {current['p50_ms']:.3f}ms "
+                f"(+{(current['p50_ms'] / base['p50_ms'] - 1) * 100:.0f}%, limit +{tolerance * 100:.0f}%)"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the serving hot path in-process")
+    parser.add_argument("--sizes", nargs="+", type=int, default=BATCH_SIZES)
+    parser.add_argument("--only", nargs="+", help="Run only cases starting with these prefixes")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="Time budget per case")
+    parser.add_argument("--output", type=Path, help="Write results JSON here")
+    parser.add_argument("--baseline", type=Path, help=f"Compare against this results JSON (e.g. {DEFAULT_BASELINE.name})")
+    parser.add_argument("--save-baseline", type=Path, help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "results": asyncio.run(run_suite(args.sizes, args.only, args.min_seconds)),
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, indent=2) + "\n")
+            print(f"✅ Results written to {path}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("environment") != report["environment"]:
+            print(f"⚠ Baseline environment differs: {baseline.get('environment')}")
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    # Route timings should measure the models, not per-request log lines
+    import logging
+    logging.disable(logging.INFO)
+    sys.exit(main())
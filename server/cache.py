@@ -0,0 +1,97 @@
+"""
+In-process LRU + TTL cache for ensemble prediction results
+Keyed on the validated application fields and the loaded model versions
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# Entries are small fixed-shape response dicts (well under 1 KB), so the
+# entry cap bounds memory; 0 disables caching
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))
+
+class PredictionCache:
+    """Least-recently-used cache whose entries also expire after a TTL"""
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(fields: Mapping[str, Any], versions: Mapping[str, str]) -> str:
+        """Canonical hash of application fields plus model versions"""
+        canonical = json.dumps(
+            {
+                "fields": {k: float(v) for k, v in fields.items()},
+                "versions": dict(versions),
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _copy(value)
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, _copy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after the models change"""
+        if self._entries:
+            self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+def _copy(value: Dict[str, Any]) -> Dict[str, Any]:
+    # Responses are one level deep apart from dict/list members
+    return {k: v.copy() if isinstance(v, (dict, list)) else v for k, v in value.items()}
@@ -0,0 +1,113 @@
+"""
+Offline evaluation of the cascading (early-exit) ensemble
+Scores the dataset once with every model, then replays the cascade at each
+margin: how often linear + decision_tree exit without random_forest, how
+often the cascaded decision differs from the full ensemble, the accuracy of
+both against loan_status, and the expected model time per request.
+
+Usage:
+  python cascade_eval.py
+  python cascade_eval.py --margins 0.1 0.2 0.3 --json cascade_report.json
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from executor import _init_worker, _worker_models
+from features import RAW_COLUMNS, build_features_from_raw
+from inference import INFERENCE_ENGINE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("cascade_eval")
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_DATA = BASE_DIR / "dataset" / "prepro.csv"
+DEFAULT_MARGINS = [round(0.05 * i, 2) for i in range(11)]
+
+def single_row_ms(models: Dict[str, Any], X: np.ndarray, samples: int = 200) -> Dict[str, float]:
+    """Median single-row predict latency per model, the cost a /predict call pays"""
+    latency = {}
+    for name, model in models.items():
+        times = []
+        for i in range(samples):
+            row = X[i % len(X)][None, :]
+            started = time.perf_counter()
+            model.predict(row)
+            times.append(time.perf_counter() - started)
+        latency[name] = float(np.median(times) * 1000)
+    return latency
+
+def evaluate(preds: Dict[str, np.ndarray], labels: np.ndarray, margins: List[float],
+             latency_ms: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Replay the cascade over precomputed predictions at each margin"""
+    from app import CASCADE_FIRST, cascade_exits, weighted_score
+
+    first = {name: p for name, p in preds.items() if name in CASCADE_FIRST}
+    full_decision = weighted_score(preds) >= 0.5
+    first_decision = weighted_score(first) >= 0.5
+    first_ms = sum(latency_ms.get(name, 0.0) for name in first)
+    full_ms = sum(latency_ms.get(name, 0.0) for name in preds)
+
+    report = []
+    for margin in margins:
+        exits = cascade_exits(first, margin)
+        decision = np.where(exits, first_decision, full_decision)
+        exit_rate = float(exits.mean())
+        expected_ms = first_ms + (1 - exit_rate) * (full_ms - first_ms)
+        report.append({
+            "margin": margin,
+            "early_exit_rate": exit_rate,
+            "disagreement_rate": float((decision != full_decision).mean()),
+            "accuracy": float((decision == labels).mean()),
+            "full_accuracy": float((full_decision == labels).mean()),
+            "expected_model_ms": expected_ms,
+            "speedup": full_ms / expected_ms if expected_ms else None,
+        })
+    return report
+
+def print_report(report: List[Dict[str, Any]]) -> None:
+    print(f"{'margin':>7} {'exit':>7} {'disagree':>9} {'accuracy':>9} {'full acc':>9} {'model ms':>9} {'speedup':>8}")
+    for r in report:
+        speedup = f"{r['speedup']:.2f}x" if r["speedup"] else "-"
+        print(f"{r['margin']:>7.2f} {r['early_exit_rate']:>7.1%} {r['disagreement_rate']:>9.2%} "
+              f"{r['accuracy']:>9.2%} {r['full_accuracy']:>9.2%} {r['expected_model_ms']:>9.3f} {speedup:>8}")
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    from score import field_bounds, resolve_models, validate
+
+    parser = argparse.ArgumentParser(description="Measure cascade early-exit rate and disagreement per margin")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA, help="CSV with raw columns and loan_status")
+    parser.add_argument("--margins", type=float, nargs="+", default=DEFAULT_MARGINS)
+    parser.add_argument("--engine", default=INFERENCE_ENGINE, help="sklearn or compiled")
+    parser.add_argument("--json", type=Path, help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    active = resolve_models(None)
+    _init_worker({name: str(path) for name, (_, path) in active.items()}, args.engine)
+
+    df = pd.read_csv(args.data, usecols=list(RAW_COLUMNS) + ["loan_status"])
+    raw = df[list(RAW_COLUMNS)].to_numpy(dtype=np.float64)
+    # Score only what the API would accept
+    valid = validate(raw, field_bounds()) == ""
+    X = build_features_from_raw(raw[valid])
+    labels = df["loan_status"].to_numpy()[valid]
+    logger.info(f"📊 Scoring {len(X)} rows ({int((~valid).sum())} rejected by validation)")
+
+    preds = {name: np.asarray(model.predict(X), dtype=float) for name, model in _worker_models.items()}
+    report = evaluate(preds, labels, args.margins, single_row_ms(_worker_models, X))
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps({"data": str(args.data), "rows": int(len(X)),
+                                         "engine": args.engine, "margins": report}, indent=2) + "\n")
+        logger.info(f"✅ Report written to {args.json}")
+    return report
+
+if __name__ == "__main__":
+    main()
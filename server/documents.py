@@ -0,0 +1,304 @@
+"""
+Background document verification for /predict uploads
+Multipart bodies are streamed straight into spooled temporary files (memory
+first, disk past DOCUMENT_SPOOL_BYTES) with DOCUMENT_MAX_BYTES enforced while
+reading, and analyzed on a worker pool, so document work never sits on the
+prediction path. Each upload becomes a job that can
+be polled or followed over server-sent events until its result is ready.
+
+Jobs live in the memory of the worker process that accepted the upload and
+expire DOCUMENT_JOB_TTL_SECONDS after finishing.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, AsyncGenerator, Dict, List, Mapping, Optional, Set
+
+from starlette.datastructures import FormData, Headers
+from starlette.formparsers import MultiPartParser
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", str(10 * 1024 * 1024)))
+# Uploads larger than this spill from memory to a temporary file
+DOCUMENT_SPOOL_BYTES = int(os.getenv("DOCUMENT_SPOOL_BYTES", str(1024 * 1024)))
+DOCUMENT_WORKERS = int(os.getenv("DOCUMENT_WORKERS", "2"))
+# Queued + running jobs; further uploads are refused until some finish
+DOCUMENT_MAX_PENDING = int(os.getenv("DOCUMENT_MAX_PENDING", "64"))
+DOCUMENT_JOB_TTL_SECONDS = float(os.getenv("DOCUMENT_JOB_TTL_SECONDS", "900"))
+
+# Fields that must appear in the document for it to count as verified
+REQUIRED_FIELDS = ("income_annum", "loan_amount")
+# Confidence points added to the prediction when the document verifies it
+VERIFIED_CONFIDENCE_BOOST = 2.0
+
+# Allowance for the application fields and multipart framing in a form's Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+class DocumentTooLarge(Exception):
+    pass
+
+class DocumentQueueFull(Exception):
+    pass
+
+# -------- Analysis (runs on the worker pool) --------
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+# Literal strings shown by Tj / TJ operators in uncompressed PDF content streams
+_PDF_TEXT = re.compile(rb"\(((?:\\.|[^\\)])*)\)\s*(?:Tj|')|\[((?:[^\]\\]|\\.)*)\]\s*TJ")
+_PDF_STRING = re.compile(rb"\(((?:\\.|[^\\)])*)\)")
+
+def _pdf_text(content: bytes) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        PdfReader = None
+
+    if PdfReader is not None:
+        import io
+        reader = PdfReader(io.BytesIO(content))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+    # Without pypdf only uncompressed text operators can be read
+    parts: List[bytes] = []
+    for match in _PDF_TEXT.finditer(content):
+        if match.group(1) is not None:
+            parts.append(match.group(1))
+        else:
+            parts.extend(_PDF_STRING.findall(match.group(2)))
+    return "\n".join(p.decode("latin-1").replace("\\(", "(").replace("\\)", ")") for p in parts)
+
+def extract_text(content: bytes, filename: str, content_type: str) -> str:
+    """Best-effort text of a PDF or plain-text document ('' when unreadable)"""
+    name = filename.lower()
+    if content_type == "application/pdf" or name.endswith(".pdf") or content.startswith(b"%PDF"):
+        return _pdf_text(content)
+    if content_type.startswith("text/") or name.endswith((".txt", ".csv")):
+        return content.decode("utf-8", errors="replace")
+    return ""
+
+def cross_check(text: str, fields: Mapping[str, float]) -> Dict[str, bool]:
+    """Whether each submitted value appears among the numbers in the document
+
+    Amounts match within 0.5% (or 1 unit) so rounded statements still verify.
+    """
+    numbers = []
+    for token in _NUMBER.findall(text):
+        try:
+            numbers.append(float(token.replace(",", "")))
+        except ValueError:
+            continue
+    return {
+        name: any(abs(n - value) <= max(1.0, 0.005 * abs(value)) for n in numbers)
+        for name, value in fields.items()
+    }
+
+def analyze_document(file: IO[bytes], filename: str, content_type: str, fields: Mapping[str, float]) -> Dict[str, Any]:
+    """Extract the document's text and cross-check it against the form values"""
+    file.seek(0)
+    text = extract_text(file.read(), filename, content_type)
+    if not text.strip():
+        return {"verification": "unreadable", "fields": {}, "confidence_adjustment": 0.0,
+                "verification_status": f"Could not read {filename}"}
+
+    checks = cross_check(text, fields)
+    verified = all(checks.get(name) for name in REQUIRED_FIELDS)
+    return {
+        "verification": "verified" if verified else "mismatch",
+        "fields": checks,
+        "confidence_adjustment": VERIFIED_CONFIDENCE_BOOST if verified else 0.0,
+        "verification_status": f"Verified via {filename} analysis" if verified
+                               else f"{filename} does not match the submitted values",
+    }
+
+# -------- Spooling --------
+class DocumentFormParser(MultiPartParser):
+    """Multipart parser that stops reading once the uploaded files pass ``max_bytes``
+
+    File parts land in SpooledTemporaryFiles of DOCUMENT_SPOOL_BYTES, which
+    the document job then owns, so an upload is written exactly once.
+    """
+
+    max_file_size = DOCUMENT_SPOOL_BYTES
+
+    def __init__(self, headers: Headers, stream: AsyncGenerator[bytes, None], max_bytes: int):
+        super().__init__(headers, stream)
+        self.max_bytes = max_bytes
+        self.file_bytes = 0
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current_part.file is not None:
+            self.file_bytes += end - start
+            if self.file_bytes > self.max_bytes:
+                raise DocumentTooLarge(f"Document exceeds {self.max_bytes} bytes")
+        super().on_part_data(data, start, end)
+
+    async def parse(self) -> FormData:
+        try:
+            return await super().parse()
+        except DocumentTooLarge:
+            for file in self._files_to_close_on_error:
+                file.close()
+            raise
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class DocumentPipeline:
+    """In-memory job table plus a thread pool running analyze_document"""
+
+    def __init__(
+        self,
+        workers: int = DOCUMENT_WORKERS,
+        max_pending: int = DOCUMENT_MAX_PENDING,
+        max_bytes: int = DOCUMENT_MAX_BYTES,
+        ttl_seconds: float = DOCUMENT_JOB_TTL_SECONDS,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="documents")
+        logger.info(f"✓ Document workers: {self.workers}")
+
+    async def shutdown(self) -> None:
+        """Cancel queued jobs and wait for the running ones"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, wait=True)
+
+    async def read_form(self, headers: Headers, stream: AsyncGenerator[bytes, None]) -> FormData:
+        """Parse a multipart body, spooling its uploads and enforcing max_bytes
+
+        A declared Content-Length that cannot fit is refused before any of
+        the body is read; otherwise the limit is checked as parts arrive.
+        """
+        length = headers.get("content-length", "")
+        if length.isdigit() and int(length) > self.max_bytes + FORM_OVERHEAD_BYTES:
+            self.rejected += 1
+            raise DocumentTooLarge(f"Document exceeds {self.max_bytes} bytes")
+        try:
+            return await DocumentFormParser(headers, stream, self.max_bytes).parse()
+        except DocumentTooLarge:
+            self.rejected += 1
+            raise
+
+    def check_capacity(self) -> None:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise DocumentQueueFull(f"{self.pending} documents already pending")
+
+    def submit(self, spool: IO[bytes], filename: str, content_type: str, fields: Mapping[str, float]) -> Dict[str, Any]:
+        """Queue a spooled document for analysis; the job owns (and closes) the spool"""
+        try:
+            self.check_capacity()
+        except DocumentQueueFull:
+            spool.close()
+            raise
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        size = spool.seek(0, os.SEEK_END)
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "filename": filename,
+            "content_type": content_type,
+            "size_bytes": size,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self._done[job_id] = asyncio.Event()
+        self.pending += 1
+        self.submitted += 1
+
+        task = asyncio.create_task(self._run(job, spool, dict(fields)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _process(self, job: Dict[str, Any], spool: IO[bytes], fields: Dict[str, float]) -> Dict[str, Any]:
+        job["status"] = "processing"
+        job["started_at"] = time.time()
+        return analyze_document(spool, job["filename"], job["content_type"], fields)
+
+    async def _run(self, job: Dict[str, Any], spool: IO[bytes], fields: Dict[str, float]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            job["result"] = await loop.run_in_executor(self._pool, self._process, job, spool, fields)
+            job["status"] = "done"
+            self.completed += 1
+        except asyncio.CancelledError:
+            # Queued when the pool shut down
+            job["status"] = "failed"
+            job["error"] = "cancelled at shutdown"
+            self.failed += 1
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e) or type(e).__name__
+            self.failed += 1
+            logger.error(f"❌ Document job {job['job_id']} failed: {job['error']}")
+        finally:
+            spool.close()
+            job["finished_at"] = time.time()
+            self.pending -= 1
+            self._done[job["job_id"]].set()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["finished_at"] is not None and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+            del self._done[job_id]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """The job once it finishes, or as it stands after ``timeout`` seconds"""
+        event = self._done.get(job_id)
+        if event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "retained": len(self.jobs),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,144 @@
+"""
+Streaming feature-drift monitor
+Every scored row is binned against the training-time reference profile
+(model/drift_reference.json, written by training/pipeline.py) into a fixed
+count matrix, so memory is constant whatever the traffic and an update is a
+single vectorized comparison. Drift per feature is reported as PSI and a
+binned Kolmogorov-Smirnov distance between live and training proportions.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from features import FEATURE_COLUMNS
+from metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+DRIFT_REFERENCE_PATH = Path(os.getenv(
+    "DRIFT_REFERENCE", Path(__file__).resolve().parent / "model" / "drift_reference.json"
+))
+# Below this many rows the scores are reported but no status is given
+DRIFT_MIN_ROWS = int(os.getenv("DRIFT_MIN_ROWS", "200"))
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+DRIFT_PSI_WARN = float(os.getenv("DRIFT_PSI_WARN", "0.1"))
+DRIFT_PSI_ALERT = float(os.getenv("DRIFT_PSI_ALERT", "0.25"))
+
+# Floor for bin proportions so empty bins do not make PSI infinite
+PSI_EPSILON = 1e-4
+
+STATUS_ORDER = ("ok", "warn", "alert")
+
+def reference_stamp(path: Path) -> Optional[tuple]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class DriftMonitor:
+    """Fixed-size per-feature histograms of live traffic, compared to a reference"""
+
+    def __init__(self, reference: Dict[str, Any], columns: Sequence[str] = FEATURE_COLUMNS):
+        missing = [c for c in columns if c not in reference["features"]]
+        if missing:
+            raise RuntimeError(f"Drift reference has no profile for {missing}")
+        self.columns = tuple(columns)
+        self.reference_rows = int(reference["rows"])
+        profiles = [reference["features"][c] for c in self.columns]
+
+        # Edges padded with +inf to a common width: x >= inf is never true, so
+        # padded bins stay empty and one comparison bins every feature at once
+        width = max(len(p["edges"]) for p in profiles)
+        self.n_bins = width + 1
+        self.edges = np.full((len(self.columns), width), np.inf)
+        self.expected = np.zeros((len(self.columns), self.n_bins))
+        for i, p in enumerate(profiles):
+            self.edges[i, :len(p["edges"])] = p["edges"]
+            counts = np.asarray(p["counts"], dtype=np.float64)
+            self.expected[i, :len(counts)] = counts / counts.sum()
+        self._offsets = np.arange(len(self.columns)) * self.n_bins
+        self.counts = np.zeros(len(self.columns) * self.n_bins, dtype=np.int64)
+        self.rows = 0
+        # Reference file and its (mtime_ns, size) when loaded from disk
+        self.path: Optional[Path] = None
+        self.stamp: Optional[tuple] = None
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> Optional["DriftMonitor"]:
+        """Monitor for the reference at ``path`` (DRIFT_REFERENCE_PATH), or None when there is none"""
+        path = path or DRIFT_REFERENCE_PATH
+        if not path.exists():
+            logger.warning(f"⚠️ No drift reference at {path}; run training/pipeline.py --reference-only")
+            return None
+        stamp = reference_stamp(path)
+        monitor = cls(json.loads(path.read_text()))
+        monitor.path, monitor.stamp = path, stamp
+        logger.info(f"✓ Drift monitor: {len(monitor.columns)} features against {monitor.reference_rows} training rows")
+        return monitor
+
+    def reference_changed(self) -> bool:
+        """True when the reference file on disk is not the one this monitor loaded"""
+        return self.path is not None and reference_stamp(self.path) != self.stamp
+
+    def observe(self, X: np.ndarray) -> None:
+        """Count the rows of an (N, 12) feature matrix into the live histograms"""
+        # Bin index = number of edges <= x (NaN lands in the first bin)
+        bins = (X[:, :, None] >= self.edges).sum(axis=2)
+        flat = (bins + self._offsets).ravel()
+        if X.shape[0] == 1:
+            # One row touches each feature once, so fancy indexing cannot collide
+            self.counts[flat] += 1
+        else:
+            self.counts += np.bincount(flat, minlength=self.counts.size)
+        self.rows += X.shape[0]
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+        self.rows = 0
+
+    def scores(self) -> Dict[str, Dict[str, float]]:
+        """PSI and binned KS distance per feature"""
+        if not self.rows:
+            return {c: {"psi": 0.0, "ks": 0.0} for c in self.columns}
+        actual = self.counts.reshape(len(self.columns), self.n_bins) / self.rows
+        a = np.maximum(actual, PSI_EPSILON)
+        e = np.maximum(self.expected, PSI_EPSILON)
+        psi = ((a - e) * np.log(a / e)).sum(axis=1)
+        ks = np.abs(np.cumsum(actual, axis=1) - np.cumsum(self.expected, axis=1)).max(axis=1)
+        return {c: {"psi": round(float(psi[i]), 6), "ks": round(float(ks[i]), 6)}
+                for i, c in enumerate(self.columns)}
+
+    def report(self) -> Dict[str, Any]:
+        scores = self.scores()
+        enough = self.rows >= DRIFT_MIN_ROWS
+        for score in scores.values():
+            score["status"] = (
+                "alert" if score["psi"] >= DRIFT_PSI_ALERT else "warn" if score["psi"] >= DRIFT_PSI_WARN else "ok"
+            ) if enough else "insufficient_data"
+        overall = max((s["status"] for s in scores.values()), key=STATUS_ORDER.index) if enough \
+            else "insufficient_data"
+        return {
+            "status": overall,
+            "rows": self.rows,
+            "reference_rows": self.reference_rows,
+            "min_rows": DRIFT_MIN_ROWS,
+            "thresholds": {"psi_warn": DRIFT_PSI_WARN, "psi_alert": DRIFT_PSI_ALERT},
+            "features": scores,
+        }
+
+    def metric_lines(self) -> List[str]:
+        """Per-feature PSI and KS gauges for /metrics"""
+        psi = Gauge("loan_feature_drift_psi", "Population stability index of live traffic vs training", ("feature",))
+        ks = Gauge("loan_feature_drift_ks", "Binned KS distance of live traffic vs training", ("feature",))
+        for name, score in self.scores().items():
+            psi.set(score["psi"], name)
+            ks.set(score["ks"], name)
+        rows = Gauge("loan_feature_drift_rows", "Rows observed by the drift monitor")
+        rows.set(self.rows)
+        return rows.render() + psi.render() + ks.render()
@@ -0,0 +1,201 @@
+"""
+Bounded executor for CPU-bound model inference
+Keeps sklearn predict calls off the asyncio event loop so health checks and
+request validation stay responsive while heavy scoring is running
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from metrics import record_models
+
+logger = logging.getLogger(__name__)
+
+# "thread" shares the already loaded models, "process" loads them once per worker
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed in flight per worker before callers wait for a slot
+INFERENCE_QUEUE_PER_WORKER = int(os.getenv("INFERENCE_QUEUE_PER_WORKER", "2"))
+
+EXECUTOR_KINDS = ("thread", "process")
+
+def run_models(
+    loaded: Dict[str, Any],
+    X: np.ndarray,
+    requested: Dict[str, np.ndarray],
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Run each requested model once over its rows of X
+
+    Returns model name -> prediction array, or the exception the model raised.
+    Per-model predict seconds go into ``timings`` when given.
+    """
+    outputs: Dict[str, Any] = {}
+    for model_name, rows in requested.items():
+        started = time.perf_counter()
+        try:
+            outputs[model_name] = np.asarray(loaded[model_name].predict(X[rows]), dtype=float)
+        except Exception as e:
+            logger.error(f"❌ Error predicting with {model_name}: {e}")
+            outputs[model_name] = e
+        if timings is not None:
+            timings[model_name] = time.perf_counter() - started
+    return outputs
+
+def _timed_run_models(
+    loaded: Dict[str, Any], X: np.ndarray, requested: Dict[str, np.ndarray]
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    timings: Dict[str, float] = {}
+    return run_models(loaded, X, requested, timings), timings
+
+# --------------------------------------------------
+# Process pool worker state
+# --------------------------------------------------
+_worker_models: Dict[str, Any] = {}
+# Version of each model this worker loaded, returned with its predictions
+_worker_versions: Dict[str, str] = {}
+
+def _init_worker(
+    model_paths: Dict[str, str],
+    engine: str,
+    model_versions: Optional[Dict[str, str]] = None,
+    strict: bool = True,
+) -> None:
+    """Load every model once when a pool process starts
+
+    With ``strict=False`` a model that fails to load is left out (and its
+    requests fail) instead of breaking the whole pool.
+    """
+    from features import check_feature_order
+    from inference import artifact_version, load_artifact, select_engine
+
+    loaded, versions = {}, {}
+    for name, path in model_paths.items():
+        try:
+            loaded[name] = load_artifact(path)
+            check_feature_order(loaded[name], name)
+        except Exception as e:
+            if strict:
+                raise
+            logger.error(f"❌ Inference worker could not load {name} from {path}: {e}")
+            loaded.pop(name, None)
+            continue
+        versions[name] = (model_versions or {}).get(name) or artifact_version(Path(path))
+    _worker_models.clear()
+    _worker_models.update(select_engine(loaded, engine))
+    _worker_versions.clear()
+    _worker_versions.update(versions)
+
+def _worker_run_models(
+    X: np.ndarray, requested: Dict[str, np.ndarray]
+) -> Tuple[Dict[str, Any], Dict[str, float], Dict[str, str]]:
+    outputs, timings = _timed_run_models(_worker_models, X, requested)
+    return outputs, timings, {n: _worker_versions[n] for n in requested if n in _worker_versions}
+
+class InferenceExecutor:
+    """Thread or process pool with a bounded number of in-flight jobs"""
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        versions: Dict[str, str],
+        kind: str = INFERENCE_EXECUTOR,
+        workers: int = INFERENCE_WORKERS,
+        queue_per_worker: int = INFERENCE_QUEUE_PER_WORKER,
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise RuntimeError(f"Unknown INFERENCE_EXECUTOR '{kind}', expected one of {EXECUTOR_KINDS}")
+        self.models = models
+        self.versions = versions
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_in_flight = self.workers * max(1, queue_per_worker)
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+
+    def start(self, model_paths: Optional[Dict[str, str]] = None, engine: str = "sklearn",
+              versions: Optional[Dict[str, str]] = None) -> None:
+        """Create the pool; process pools need the artifact paths (and their versions) to load"""
+        self._pool = self._create_pool(model_paths, engine, versions)
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        logger.info(f"✓ Inference executor: {self.kind} x{self.workers}")
+
+    def _create_pool(self, model_paths: Optional[Dict[str, str]], engine: str,
+                     versions: Optional[Dict[str, str]]) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=({k: str(v) for k, v in (model_paths or {}).items()}, engine, versions, False),
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+
+    def restart(self, model_paths: Dict[str, str], engine: str = "sklearn",
+                versions: Optional[Dict[str, str]] = None) -> None:
+        """Pick up swapped or newly loaded models; process workers are replaced, running jobs finish on the old pool"""
+        if self.kind != "process" or self._pool is None:
+            return
+        old, self._pool = self._pool, self._create_pool(model_paths, engine, versions)
+        old.shutdown(wait=False, cancel_futures=False)
+        logger.info("✓ Inference process pool restarted with new models")
+
+    async def run_models(
+        self, X: np.ndarray, requested: Dict[str, np.ndarray]
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Score X on the pool without blocking the event loop
+
+        Returns the per-model outputs and the model versions that produced them.
+        Process workers report the versions they actually loaded.
+        """
+        pool = self._pool
+        if self.kind == "process" and pool is not None:
+            job = (_worker_run_models, X, requested)
+        else:
+            # Snapshot on the event loop so a concurrent swap cannot mix versions
+            snapshot = {n: self.models[n] for n in requested if n in self.models}
+            versions = {n: self.versions.get(n) for n in snapshot}
+            job = (_timed_run_models, snapshot, X, requested)
+
+        if pool is None:
+            # Not started (e.g. outside lifespan): score inline
+            outputs, timings = job[0](*job[1:])
+        else:
+            loop = asyncio.get_running_loop()
+            async with self._slots:
+                self.in_flight += 1
+                try:
+                    result = await loop.run_in_executor(pool, *job)
+                finally:
+                    self.in_flight -= 1
+            if self.kind == "process":
+                outputs, timings, versions = result
+            else:
+                outputs, timings = result
+
+        # Recorded here so process-pool timings land in this worker's metrics
+        record_models(timings, outputs, {name: len(rows) for name, rows in requested.items()})
+        return outputs, versions
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and wait for running jobs"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=not wait)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+        }
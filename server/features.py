@@ -0,0 +1,92 @@
+"""
+Feature engine for the request hot path
+Builds the 12 model features straight into a float64 NumPy matrix
+"""
+
+import warnings
+from typing import Any, Sequence
+
+import numpy as np
+
+# --------------------------------------------------
+# Column order (MATCHES training/preprocessing.py output)
+# --------------------------------------------------
+RAW_COLUMNS = (
+    "income_annum",
+    "loan_amount",
+    "loan_term",
+    "cibil_score",
+    "residential_assets_value",
+    "commercial_assets_value",
+    "luxury_assets_value",
+    "bank_asset_value",
+)
+
+ENGINEERED_COLUMNS = (
+    "dti_ratio",
+    "total_assets",
+    "asset_coverage",
+    "affordability_index",
+)
+
+FEATURE_COLUMNS = RAW_COLUMNS + ENGINEERED_COLUMNS
+N_FEATURES = len(FEATURE_COLUMNS)
+
+# Models are fitted on DataFrames, so sklearn warns when it sees a bare array.
+# Column order is verified once per model in check_feature_order instead.
+warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+
+def check_feature_order(model: Any, name: str) -> None:
+    """Verify a loaded model expects exactly FEATURE_COLUMNS, in order"""
+    expected = getattr(model, "feature_names_in_", None)
+    if expected is None:
+        return
+    if tuple(expected) != FEATURE_COLUMNS:
+        raise RuntimeError(
+            f"Model '{name}' feature order {list(expected)} does not match {list(FEATURE_COLUMNS)}"
+        )
+
+def fill_engineered(X: np.ndarray) -> np.ndarray:
+    """Compute the engineered columns in place from the raw columns of X"""
+    income_raw, loan_raw, term = X[:, 0], X[:, 1], X[:, 2]
+    income = np.where(income_raw > 0, income_raw, 1.0)
+    loan = np.where(loan_raw > 0, loan_raw, 0.0)
+    has_loan = loan > 0
+
+    np.divide(loan, income, out=X[:, 8])
+    # Summed left to right, same as the scalar expression
+    np.add(X[:, 4], X[:, 5], out=X[:, 9])
+    X[:, 9] += X[:, 6]
+    X[:, 9] += X[:, 7]
+
+    X[:, 10] = 0.0
+    np.divide(X[:, 9], loan, out=X[:, 10], where=has_loan)
+
+    X[:, 11] = 0.0
+    payment = np.zeros_like(loan)
+    np.divide(loan, term, out=payment, where=has_loan & (term > 0))
+    np.divide(income, payment, out=X[:, 11], where=has_loan & (term > 0))
+    return X
+
+def build_features(applications: Sequence[Any]) -> np.ndarray:
+    """Build an (N, 12) float64 feature matrix from LoanApplication-like objects"""
+    X = np.empty((len(applications), N_FEATURES), dtype=np.float64)
+    for i, a in enumerate(applications):
+        X[i, :8] = (
+            a.income_annum,
+            a.loan_amount,
+            a.loan_term,
+            a.cibil_score,
+            a.residential_assets_value,
+            a.commercial_assets_value,
+            a.luxury_assets_value,
+            a.bank_asset_value,
+        )
+    return fill_engineered(X)
+
+def build_features_from_raw(raw: np.ndarray) -> np.ndarray:
+    """Build the feature matrix from an (N, 8) array of raw columns"""
+    raw = np.asarray(raw, dtype=np.float64)
+    X = np.empty((raw.shape[0], N_FEATURES), dtype=np.float64)
+    X[:, :8] = raw
+    return fill_engineered(X)
@@ -0,0 +1,263 @@
+"""
+Compiled flat-array inference engine for tree models
+Packs DecisionTreeClassifier / RandomForestClassifier nodes into flat NumPy
+arrays and evaluates every tree for every row with vectorized traversal
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+# "sklearn" keeps the unpickled estimators, "compiled" swaps trees for CompiledForest
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+ENGINES = ("sklearn", "compiled")
+
+# Directory of uncompressed, mmap-able CompiledForest arrays shared by workers
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR")
+
+# Arrays persisted by CompiledForest.save, one .npy file each
+STORE_ARRAYS = ("feature", "threshold", "left", "right", "value_by_class", "roots", "classes")
+
+# Rows traversed per chunk; bounds the (trees x rows) index matrices
+ROW_CHUNK = 4096
+
+class CompiledForest:
+    """One or more decision trees packed into flat node arrays
+
+    Leaves point to themselves, so every row can take exactly ``max_depth``
+    steps without branching on whether it has already reached a leaf.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        classes: np.ndarray,
+        max_depth: int,
+        feature_names: Optional[np.ndarray] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_trees = len(roots)
+        # No copy when value is already a transposed view of value_by_class
+        self._value_by_class = np.ascontiguousarray(value.T)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """Pack a fitted DecisionTreeClassifier or RandomForestClassifier"""
+        trees = [e.tree_ for e in model.estimators_] if hasattr(model, "estimators_") else [model.tree_]
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output classifiers can be compiled")
+
+        features: List[np.ndarray] = []
+        thresholds: List[np.ndarray] = []
+        lefts: List[np.ndarray] = []
+        rights: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+        roots = np.empty(len(trees), dtype=np.intp)
+        offset = 0
+
+        for i, tree in enumerate(trees):
+            n = tree.node_count
+            left = tree.children_left.astype(np.intp)
+            right = tree.children_right.astype(np.intp)
+            is_leaf = left == -1
+            own = np.arange(n, dtype=np.intp)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, own, left) + offset)
+            rights.append(np.where(is_leaf, own, right) + offset)
+
+            # Same per-leaf normalisation sklearn applies in predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, None]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots[i] = offset
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=roots,
+            classes=np.asarray(model.classes_),
+            max_depth=max(t.max_depth for t in trees),
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """Write the node arrays as uncompressed .npy files plus a JSON header"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value_by_class": self._value_by_class,
+            "roots": self.roots,
+            "classes": self.classes_,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        header = {
+            "max_depth": self.max_depth,
+            "n_trees": self.n_trees,
+            "feature_names": [str(f) for f in getattr(self, "feature_names_in_", [])] or None,
+        }
+        (directory / "header.json").write_text(json.dumps(header, indent=2))
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap_mode: Optional[str] = "r") -> "CompiledForest":
+        """Load arrays written by save; with mmap_mode="r" the pages are shared read-only"""
+        directory = Path(directory)
+        header = json.loads((directory / "header.json").read_text())
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in STORE_ARRAYS}
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            left=arrays["left"],
+            right=arrays["right"],
+            value=arrays["value_by_class"].T,
+            roots=np.asarray(arrays["roots"]),
+            classes=np.asarray(arrays["classes"]),
+            max_depth=header["max_depth"],
+            feature_names=header.get("feature_names"),
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Return the leaf index reached in every tree, shape (trees, rows)"""
+        # sklearn compares float32 inputs against float64 thresholds
+        Xf = np.ascontiguousarray(X, dtype=np.float32)
+        flat = Xf.ravel()
+        row_base = np.arange(Xf.shape[0], dtype=np.intp) * Xf.shape[1]
+        nodes = np.repeat(self.roots[:, None], Xf.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = flat.take(row_base + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Average the per-tree leaf class probabilities"""
+        X = np.asarray(X)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            leaves = self.apply(X[start:start + ROW_CHUNK])
+            for k in range(len(self.classes_)):
+                # Summed over axis 0 tree by tree, the order sklearn accumulates in
+                proba[start:start + ROW_CHUNK, k] = self._value_by_class[k].take(leaves).sum(axis=0)
+        if self.n_trees > 1:
+            proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predict class labels"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+def compile_model(model: Any) -> Any:
+    """Return a CompiledForest for tree classifiers, anything else unchanged"""
+    if hasattr(model, "tree_") or hasattr(model, "estimators_"):
+        return CompiledForest.from_sklearn(model)
+    return model
+
+def load_artifact(path: Union[str, Path]) -> Any:
+    """Load a model from a CompiledForest store directory (mmap), an exported .npz or a joblib pickle"""
+    path = Path(path)
+    if path.is_dir():
+        return CompiledForest.load(path, mmap_mode="r")
+    if path.suffix == ".npz":
+        from model_format import load_model
+        return load_model(path)
+    import joblib
+    return joblib.load(path)
+
+# Modules the joblib pickles unpickle into; sklearn's package imports are circular
+PICKLE_MODULES = ("joblib", "sklearn.base", "sklearn.linear_model", "sklearn.tree", "sklearn.ensemble")
+
+def import_pickle_modules(paths: List[Union[str, Path]]) -> None:
+    """Import what unpickling needs once, before artifacts load on several threads
+
+    Threads that import sklearn at the same time can see a partially
+    initialized sklearn.base and fail ("cannot import name 'clone'").
+    """
+    if any(not Path(p).is_dir() and Path(p).suffix != ".npz" for p in paths):
+        import importlib
+        for module in PICKLE_MODULES:
+            importlib.import_module(module)
+
+def artifact_version(path: Union[str, Path]) -> str:
+    """Short fingerprint of an artifact's identity (name, size, mtime)"""
+    import hashlib
+
+    path = Path(path)
+    stat_path = path / "header.json" if path.is_dir() else path
+    stat = stat_path.stat()
+    raw = f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.blake2b(raw.encode(), digest_size=6).hexdigest()
+
+def store_path(name: str, pickle_path: Union[str, Path], store_dir: Union[str, Path]) -> Path:
+    """Store directory for one pickle; keyed on its fingerprint so retrained models never reuse stale arrays"""
+    return Path(store_dir) / name / artifact_version(pickle_path)
+
+def export_store(name: str, pickle_path: Union[str, Path], store_dir: Union[str, Path],
+                 rebuild: bool = False) -> bool:
+    """Export one tree pickle into the shared store; True when this call wrote it
+
+    Workers that see a newly activated version at the same time serialize on
+    a lock file, so one exports and the others then map its arrays.
+    """
+    import fcntl
+    import shutil
+
+    target = store_path(name, pickle_path, store_dir)
+    if not rebuild and (target / "header.json").exists():
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target.parent / f"{target.name}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not rebuild and (target / "header.json").exists():
+            return False
+        # Built aside and renamed, so a reader never maps a half-written version
+        tmp = target.with_name(f"{target.name}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        import_pickle_modules([pickle_path])
+        compile_model(load_artifact(pickle_path)).save(tmp)
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.rename(target)
+    return True
+
+def artifact_path(name: str, pickle_path: Union[str, Path], store_dir: Optional[str] = MODEL_STORE_DIR) -> Path:
+    """Prefer the shared store copy of a model when one has been exported"""
+    if store_dir and Path(pickle_path).exists():
+        exported = store_path(name, pickle_path, store_dir)
+        if (exported / "header.json").exists():
+            return exported
+    return Path(pickle_path)
+
+def select_engine(loaded: Dict[str, Any], engine: str = INFERENCE_ENGINE) -> Dict[str, Any]:
+    """Apply the configured inference engine to freshly loaded models"""
+    if engine not in ENGINES:
+        raise RuntimeError(f"Unknown INFERENCE_ENGINE '{engine}', expected one of {ENGINES}")
+    if engine == "sklearn":
+        return loaded
+    return {name: compile_model(model) for name, model in loaded.items()}
@@ -0,0 +1,405 @@
+"""
+Concurrent load generator and soak-test harness
+Drives a running (or locally started) API with a mix of ensemble,
+individual-model and document-upload requests at a fixed request rate,
+stepping through rates to find the saturation point. Records latency
+histograms, error rates and server RSS, and writes a JSON report.
+
+Latency is measured from each request's scheduled send time, so a server
+that falls behind shows up as queueing delay instead of being hidden by a
+slower send rate.
+
+Usage:
+  python loadtest.py --rates 50 100 200 400 --step-seconds 30
+  python loadtest.py --rates 100 --step-seconds 3600 --workers 4   # soak
+  python loadtest.py --url http://staging:8000 --rates 0 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from sysinfo import child_pids, memory_usage
+
+BASE_DIR = Path(__file__).resolve().parent
+RAW_PATH = BASE_DIR / "dataset" / "loan_approval_dataset.csv"
+
+DEFAULT_MIX = {"ensemble": 0.7, "individual": 0.2, "document": 0.1}
+INDIVIDUAL_MODELS = ["linear", "decision_tree", "random_forest"]
+
+# A step counts as saturated past any of these
+SATURATION_THROUGHPUT = 0.95   # achieved / target rate
+SATURATION_ERROR_RATE = 0.01
+
+class LatencyHistogram:
+    """Log-spaced latency buckets (20 per decade, 0.1 ms to 100 s)"""
+
+    EDGES_MS = [0.1 * 10 ** (i / 20) for i in range(121)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.EDGES_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper edge of the bucket holding the q-th percentile"""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return round(self.EDGES_MS[i] if i < len(self.EDGES_MS) else self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "p999_ms": self.percentile(99.9),
+            "max_ms": round(self.max_ms, 3),
+            # [bucket upper edge ms, count], non-empty buckets only
+            "buckets": [
+                [round(self.EDGES_MS[i], 3) if i < len(self.EDGES_MS) else None, n]
+                for i, n in enumerate(self.counts) if n
+            ],
+        }
+
+class StepStats:
+    """Totals for one rate step, plus a time series of fixed windows for soak drift"""
+
+    def __init__(self, target_rps: float, window_seconds: float):
+        self.target_rps = target_rps
+        self.latency = LatencyHistogram()
+        self.by_kind: Dict[str, LatencyHistogram] = {}
+        self.status: Dict[str, int] = {}
+        self.errors = 0
+        self.sent = 0
+        self.seconds = 0.0
+        self.window_seconds = window_seconds
+        self.started = time.perf_counter()
+        self.windows: List[Dict[str, Any]] = []
+        self._window = LatencyHistogram()
+        self._window_errors = 0
+        self._window_started = self.started
+
+    def record(self, kind: str, ms: float, status: str, ok: bool) -> None:
+        self.latency.record(ms)
+        self.by_kind.setdefault(kind, LatencyHistogram()).record(ms)
+        self.status[status] = self.status.get(status, 0) + 1
+        self.errors += not ok
+        self._window.record(ms)
+        self._window_errors += not ok
+        if time.perf_counter() - self._window_started >= self.window_seconds:
+            self.close_window()
+
+    def close_window(self) -> None:
+        now = time.perf_counter()
+        if self._window.count:
+            self.windows.append({
+                "t": round(self._window_started - self.started, 1),
+                "rps": round(self._window.count / (now - self._window_started), 1),
+                "p50_ms": self._window.percentile(50),
+                "p99_ms": self._window.percentile(99),
+                "errors": self._window_errors,
+            })
+        self._window = LatencyHistogram()
+        self._window_errors = 0
+        self._window_started = now
+
+    def summary(self) -> Dict[str, Any]:
+        seconds = self.seconds
+        done = self.latency.count
+        return {
+            "target_rps": self.target_rps or None,
+            "seconds": round(seconds, 2),
+            "sent": self.sent,
+            "completed": done,
+            "achieved_rps": round(done / seconds, 1) if seconds else None,
+            "errors": self.errors,
+            "error_rate": round(self.errors / done, 4) if done else None,
+            "status": self.status,
+            "latency": self.latency.to_dict(),
+            "by_kind": {kind: h.to_dict() for kind, h in self.by_kind.items()},
+            "windows": self.windows,
+        }
+
+# -------- Traffic --------
+def load_applications() -> List[Dict[str, Any]]:
+    import pandas as pd
+    from features import RAW_COLUMNS
+
+    raw = pd.read_csv(RAW_PATH, skipinitialspace=True)[list(RAW_COLUMNS)]
+    return raw[(raw >= 0).all(axis=1)].to_dict(orient="records")
+
+class Traffic:
+    """Picks request kinds by weight and builds their payloads"""
+
+    def __init__(self, mix: Dict[str, float], doc_kb: int, seed: int = 0):
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.rng = random.Random(seed)
+        self.applications = load_applications()
+        self.document = os.urandom(doc_kb * 1024)
+        self.counter = 0
+
+    def next(self) -> Dict[str, Any]:
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        row = dict(self.rng.choice(self.applications))
+        # Unique inputs, so the prediction cache does not absorb the load
+        self.counter += 1
+        row["income_annum"] += self.counter
+        if kind == "individual":
+            return {"kind": kind, "url": f"/predict/individual/{self.rng.choice(INDIVIDUAL_MODELS)}", "data": row}
+        if kind == "document":
+            return {"kind": kind, "url": "/predict", "data": row,
+                    "files": {"document": ("statement.pdf", self.document, "application/pdf")}}
+        return {"kind": kind, "url": "/predict", "data": row}
+
+async def send(client: httpx.AsyncClient, request: Dict[str, Any], scheduled: float,
+               slots: asyncio.Semaphore, stats: StepStats, timeout: float) -> None:
+    async with slots:
+        try:
+            response = await client.post(request["url"], data=request["data"],
+                                         files=request.get("files"), timeout=timeout)
+            status, ok = str(response.status_code), response.status_code == 200
+        except httpx.TimeoutException:
+            status, ok = "timeout", False
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+    stats.record(request["kind"], (time.perf_counter() - scheduled) * 1000, status, ok)
+
+async def run_step(client: httpx.AsyncClient, traffic: Traffic, rate: float, seconds: float,
+                   concurrency: int, timeout: float, window_seconds: float) -> StepStats:
+    """Open loop at ``rate`` req/s, or closed loop with ``concurrency`` workers when rate is 0"""
+    stats = StepStats(rate, window_seconds)
+    slots = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    deadline = started + seconds
+
+    if rate > 0:
+        tasks = set()
+        # Send times from an integer count, so float drift cannot add or drop a request
+        for i in range(max(1, round(rate * seconds))):
+            scheduled = started + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(send(client, traffic.next(), scheduled, slots, stats, timeout))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            stats.sent += 1
+        if tasks:
+            await asyncio.wait(tasks)
+    else:
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                stats.sent += 1
+                await send(client, traffic.next(), time.perf_counter(), slots, stats, timeout)
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+    stats.close_window()
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+# -------- Server --------
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    cmd = [sys.executable, "serve.py", "--port", str(port), "--workers", str(workers),
+           "--host", "127.0.0.1", "--report-interval", "0"]
+    return subprocess.Popen(cmd, cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit(f"❌ Server not ready after {timeout}s")
+
+def server_memory(pid: int) -> Dict[str, float]:
+    """RSS / PSS summed over the server process and its workers"""
+    totals = {"rss_mb": 0.0, "pss_mb": 0.0}
+    for p in [pid] + child_pids(pid):
+        usage = memory_usage(p)
+        for key in totals:
+            totals[key] += usage.get(key, 0.0)
+    return {k: round(v, 1) for k, v in totals.items()}
+
+async def sample_memory(pid: int, interval: float, started: float, samples: List[List[float]]) -> None:
+    while True:
+        usage = server_memory(pid)
+        samples.append([round(time.perf_counter() - started, 1), usage["rss_mb"], usage["pss_mb"]])
+        await asyncio.sleep(interval)
+
+def memory_growth(samples: List[List[float]]) -> Optional[float]:
+    """Least-squares RSS slope in MB/hour, ignoring the first 10% as warm-up"""
+    tail = samples[len(samples) // 10:]
+    if len(tail) < 3:
+        return None
+    n = len(tail)
+    mean_t = sum(s[0] for s in tail) / n
+    mean_r = sum(s[1] for s in tail) / n
+    var = sum((s[0] - mean_t) ** 2 for s in tail)
+    if var == 0:
+        return None
+    slope = sum((s[0] - mean_t) * (s[1] - mean_r) for s in tail) / var
+    return round(slope * 3600, 2)
+
+def find_saturation(steps: List[Dict[str, Any]], slo_ms: Optional[float]) -> Optional[Dict[str, Any]]:
+    """First open-loop step that could not keep up, errored, or broke the p99 SLO"""
+    for step in steps:
+        if not step["target_rps"]:
+            continue
+        reasons = []
+        if step["achieved_rps"] < step["target_rps"] * SATURATION_THROUGHPUT:
+            reasons.append("throughput")
+        if (step["error_rate"] or 0) > SATURATION_ERROR_RATE:
+            reasons.append("errors")
+        if slo_ms is not None and (step["latency"]["p99_ms"] or 0) > slo_ms:
+            reasons.append("p99")
+        if reasons:
+            return {"target_rps": step["target_rps"], "achieved_rps": step["achieved_rps"], "reasons": reasons}
+    return None
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown traffic kind '{kind}'")
+        mix[kind] = float(weight)
+    return mix
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    url = args.url
+    if url is None:
+        server = start_server(args.port, args.workers)
+        url = f"http://127.0.0.1:{args.port}"
+    pid = server.pid if server else args.server_pid
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    traffic = Traffic(args.mix, args.doc_kb)
+    memory: List[List[float]] = []
+    steps: List[Dict[str, Any]] = []
+    total = LatencyHistogram()
+    started = time.perf_counter()
+    sampler = None
+    try:
+        async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+            await wait_ready(client)
+            if pid:
+                sampler = asyncio.create_task(sample_memory(pid, args.rss_interval, started, memory))
+            for rate in args.rates:
+                label = f"{rate:g} req/s" if rate else f"closed loop x{args.concurrency}"
+                print(f"▶ {label} for {args.step_seconds:g}s", flush=True)
+                stats = await run_step(client, traffic, rate, args.step_seconds, args.concurrency, args.timeout,
+                                      args.window_seconds)
+                total.merge(stats.latency)
+                step = stats.summary()
+                steps.append(step)
+                lat = step["latency"]
+                print(f"  {step['achieved_rps']} req/s  p50={lat['p50_ms']}ms  p99={lat['p99_ms']}ms  "
+                      f"errors={step['errors']}/{step['completed']}", flush=True)
+    finally:
+        if sampler:
+            sampler.cancel()
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "url": url,
+        "config": {
+            "rates": args.rates,
+            "step_seconds": args.step_seconds,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "doc_kb": args.doc_kb,
+            "server_workers": args.workers if server else None,
+        },
+        "duration_seconds": round(time.perf_counter() - started, 1),
+        "steps": steps,
+        "saturation": find_saturation(steps, args.slo_ms),
+        "memory": {
+            "samples": memory,  # [seconds, rss_mb, pss_mb]
+            "rss_start_mb": memory[0][1] if memory else None,
+            "rss_end_mb": memory[-1][1] if memory else None,
+            "rss_growth_mb_per_hour": memory_growth(memory),
+        },
+        "overall": total.to_dict(),
+    }
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Load / soak test the Loan Prediction API")
+    parser.add_argument("--url", help="Target an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID to sample RSS from when using --url")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the locally started server")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for the locally started server")
+    parser.add_argument("--rates", nargs="+", type=float, default=[50, 100, 200, 400],
+                        help="Request rates to step through; 0 means closed loop")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=64, help="Max requests in flight")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Traffic weights, e.g. ensemble=0.7,individual=0.2,document=0.1")
+    parser.add_argument("--doc-kb", type=int, default=64, help="Size of uploaded documents")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--slo-ms", type=float, help="p99 latency above which a step counts as saturated")
+    parser.add_argument("--rss-interval", type=float, default=5.0, help="Seconds between RSS samples")
+    parser.add_argument("--window-seconds", type=float, default=60.0,
+                        help="Length of the per-step latency/throughput time-series windows")
+    parser.add_argument("--report", type=Path, default=Path("loadtest_report.json"))
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    args.report.write_text(json.dumps(report, indent=2) + "\n")
+
+    saturation = report["saturation"]
+    if saturation:
+        print(f"⚠ Saturated at {saturation['target_rps']:g} req/s "
+              f"(achieved {saturation['achieved_rps']}, {', '.join(saturation['reasons'])})")
+    else:
+        print("✅ No saturation within the tested rates")
+    growth = report["memory"]["rss_growth_mb_per_hour"]
+    if growth is not None:
+        print(f"   RSS {report['memory']['rss_start_mb']}MB -> {report['memory']['rss_end_mb']}MB "
+              f"({growth:+} MB/h)")
+    print(f"✅ Report written to {args.report}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Low-overhead request metrics in Prometheus text format
+Histograms keep fixed bucket counters (one bisect and two additions per
+observation), so timing every stage of every request stays cheap. /metrics
+renders them, plus any registered collectors, on demand.
+"""
+
+import bisect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from profiler import PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS, SamplingProfiler, write_profile
+
+# Seconds; dense below 10 ms where the hot path lives
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(self._values.items())
+        ]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf)..., sum]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        # Called at scrape time; return ready-made exposition lines
+        self.collectors: List[Callable[[], List[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+def sample_lines(name: str, help: str, value: Optional[float], kind: str = "gauge") -> List[str]:
+    """Exposition lines for a single unlabeled value read at scrape time"""
+    if value is None:
+        return []
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "loan_http_request_duration_seconds", "End-to-end HTTP request latency",
+    ("method", "route", "status"),
+))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "loan_http_requests_in_flight", "HTTP requests currently being handled",
+))
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "loan_stage_duration_seconds", "Time spent in each stage of the prediction path", ("route", "stage"),
+))
+MODEL_SECONDS = REGISTRY.register(Histogram(
+    "loan_model_predict_duration_seconds", "Model predict call latency (one call per micro-batch)", ("model",),
+))
+MODEL_ROWS = REGISTRY.register(Counter(
+    "loan_model_rows_total", "Rows scored per model", ("model",),
+))
+MODEL_ERRORS = REGISTRY.register(Counter(
+    "loan_model_errors_total", "Model predict calls that raised", ("model",),
+))
+ADMISSION_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "loan_admission_wait_seconds", "Time spent queued for a scoring slot", ("priority",),
+))
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "loan_admission_rejected_total", "Requests refused with 503 by admission control", ("priority", "reason"),
+))
+PROFILES = REGISTRY.register(Counter(
+    "loan_profiles_captured_total", "Slow-request profiles written to PROFILE_DIR", ("route",),
+))
+
+def record_models(timings: Dict[str, float], outputs: Dict[str, object], rows: Dict[str, int]) -> None:
+    """Record one executor job's per-model timings, row counts and failures"""
+    for name, seconds in timings.items():
+        MODEL_SECONDS.observe(seconds, name)
+    for name, out in outputs.items():
+        if isinstance(out, Exception):
+            MODEL_ERRORS.inc(name)
+        else:
+            MODEL_ROWS.inc(name, amount=rows.get(name, 0))
+
+class MetricsMiddleware:
+    """ASGI middleware: request latency, in-flight count and slow-request profiles
+
+    Stores the arrival time in ``scope["state"]["started"]`` so handlers can
+    attribute the time spent before they run (body / form parsing).
+    """
+
+    def __init__(self, app: Any, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler or (SamplingProfiler() if PROFILE_SLOW_MS is not None else None)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope.setdefault("state", {})["started"] = started
+        status = "500"
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        session = None
+        if self.profiler is not None and random.random() < PROFILE_SAMPLE_RATE:
+            session = self.profiler.begin()
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            elapsed = time.perf_counter() - started
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(elapsed, scope["method"], route, status)
+            if session is not None:
+                samples = self.profiler.end(session)
+                if elapsed * 1000 >= PROFILE_SLOW_MS and samples:
+                    write_profile(samples, route, elapsed * 1000)
+                    PROFILES.inc(route)
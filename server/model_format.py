@@ -0,0 +1,146 @@
+"""
+Compact, pickle-free model format
+Each model is one .npz file: plain numeric arrays plus a JSON header with the
+format version, model kind and feature order. Loading needs only NumPy, never
+unpickles and never imports sklearn.
+
+Usage:
+  python model_format.py                 # export every active manifest model
+  python model_format.py --activate      # ...and make the .npz versions active
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+from inference import CompiledForest, compile_model
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "loan-model"
+FORMAT_VERSION = 1
+
+# Header is stored inside the archive as UTF-8 bytes under this key
+HEADER_KEY = "__header__"
+
+class LinearModel:
+    """Sklearn-free LinearRegression predictor"""
+
+    def __init__(self, coef: np.ndarray, intercept: float, feature_names: Optional[list] = None):
+        self.coef_ = np.asarray(coef, dtype=np.float64)
+        self.intercept_ = float(intercept)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # Same expression as sklearn's LinearModel._decision_function
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+def _feature_names(model: Any) -> Optional[list]:
+    names = getattr(model, "feature_names_in_", None)
+    return [str(n) for n in names] if names is not None else None
+
+def _index_dtype(limit: int) -> np.dtype:
+    return np.int16 if limit < 2**15 else np.int32 if limit < 2**31 else np.int64
+
+def export_model(model: Any, path: Union[str, Path]) -> Path:
+    """Write a fitted LinearRegression, tree or forest (or CompiledForest) to .npz"""
+    path = Path(path).with_suffix(".npz")
+    header: Dict[str, Any] = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "feature_names": _feature_names(model),
+    }
+
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        coef = np.asarray(model.coef_, dtype=np.float64)
+        if coef.ndim != 1:
+            raise ValueError("Only single-target linear models can be exported")
+        header["kind"] = "linear"
+        arrays = {"coef": coef, "intercept": np.asarray([model.intercept_], dtype=np.float64)}
+    else:
+        forest = compile_model(model)
+        if not isinstance(forest, CompiledForest):
+            raise ValueError(f"Cannot export model of type {type(model).__name__}")
+        header.update(kind="trees", max_depth=forest.max_depth, n_trees=forest.n_trees)
+        index = _index_dtype(len(forest.left))
+        # Narrow integer dtypes keep the file small; thresholds/values stay float64 for exact parity
+        arrays = {
+            "feature": forest.feature.astype(_index_dtype(int(forest.feature.max()) + 1)),
+            "threshold": forest.threshold,
+            "left": forest.left.astype(index),
+            "right": forest.right.astype(index),
+            "value_by_class": np.ascontiguousarray(forest.value.T),
+            "roots": forest.roots.astype(index),
+            "classes": np.asarray(forest.classes_),
+        }
+        if arrays["classes"].dtype == object:
+            raise ValueError("Class labels must be numeric to export")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays[HEADER_KEY] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+    np.savez_compressed(path, **arrays)
+    return path
+
+def load_model(path: Union[str, Path]) -> Any:
+    """Load an exported .npz model; returns LinearModel or CompiledForest"""
+    with np.load(path, allow_pickle=False) as archive:
+        header = json.loads(archive[HEADER_KEY].tobytes().decode())
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} archive")
+        if header.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} uses format version {header['format_version']}, newer than {FORMAT_VERSION}")
+        arrays = {key: archive[key] for key in archive.files if key != HEADER_KEY}
+
+    if header["kind"] == "linear":
+        return LinearModel(arrays["coef"], arrays["intercept"][0], header.get("feature_names"))
+    if header["kind"] == "trees":
+        value_by_class = np.ascontiguousarray(arrays["value_by_class"], dtype=np.float64)
+        return CompiledForest(
+            feature=arrays["feature"].astype(np.intp),
+            threshold=arrays["threshold"].astype(np.float64),
+            left=arrays["left"].astype(np.intp),
+            right=arrays["right"].astype(np.intp),
+            value=value_by_class.T,
+            roots=arrays["roots"].astype(np.intp),
+            classes=arrays["classes"],
+            max_depth=header["max_depth"],
+            feature_names=header.get("feature_names"),
+        )
+    raise ValueError(f"Unknown model kind '{header['kind']}' in {path}")
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    from app import MODEL_MANIFEST_PATH, MODEL_PATHS
+    from inference import load_artifact
+    from registry import read_manifest
+
+    parser = argparse.ArgumentParser(description="Export active models to the compact .npz format")
+    parser.add_argument("--activate", action="store_true",
+                        help="Register the exports as '<version>-npz' in the manifest and make them active")
+    args = parser.parse_args()
+
+    exported = {}
+    for name, (version, path) in read_manifest(MODEL_MANIFEST_PATH, MODEL_PATHS).items():
+        if path.suffix == ".npz" or not path.exists():
+            continue
+        target = export_model(load_artifact(path), path.with_suffix(".npz"))
+        logger.info(f"✓ {name} {version}: {path.name} ({path.stat().st_size} B) -> "
+                    f"{target.name} ({target.stat().st_size} B)")
+        exported[name] = (f"{version}-npz", target)
+
+    if args.activate and exported:
+        manifest = json.loads(MODEL_MANIFEST_PATH.read_text())
+        for name, (version, target) in exported.items():
+            entry = manifest["models"][name]
+            entry["versions"][version] = {"path": target.name}
+            entry["active"] = version
+        MODEL_MANIFEST_PATH.write_text(json.dumps(manifest, indent=2) + "\n")
+        logger.info("✓ Manifest updated; POST /admin/models/reload to swap them in")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Opt-in sampling profiler for slow requests
+While at least one sampled request is in flight, a background thread walks
+every thread's stack at a fixed interval. When a sampled request turns out
+slower than PROFILE_SLOW_MS, its samples are written as folded stacks
+(``frame;frame;frame count``), the input format of flamegraph.pl and
+speedscope.
+
+Disabled unless PROFILE_SLOW_MS is set. Stacks cover the whole process, so
+requests running concurrently with a profiled one show up in its profile too.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this get their profile written; unset disables profiling
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS")) if os.getenv("PROFILE_SLOW_MS") else None
+# Fraction of requests sampled (sampling costs ~1 stack walk per interval)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.05"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path(__file__).resolve().parent / "profiles"))
+
+def _fold(frame) -> str:
+    parts: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._sessions: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._next_id = 0
+
+    def begin(self) -> int:
+        """Start collecting samples for one request; returns its session id"""
+        with self._lock:
+            self._next_id += 1
+            session = self._next_id
+            self._sessions[session] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def end(self, session: int) -> Counter:
+        with self._lock:
+            return self._sessions.pop(session, Counter())
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                sessions = list(self._sessions.values())
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = [
+                f"{names.get(ident, ident)};{_fold(frame)}"
+                for ident, frame in sys._current_frames().items() if ident != me
+            ]
+            for samples in sessions:
+                samples.update(stacks)
+            time.sleep(self.interval)
+
+def write_profile(samples: Counter, route: str, duration_ms: float, directory: Path = PROFILE_DIR) -> Path:
+    """Write folded stacks for one slow request"""
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{int(duration_ms)}ms-{os.getpid()}.folded"
+    path.write_text("".join(f"{stack} {n}\n" for stack, n in samples.most_common()))
+    logger.info(f"🔥 Slow request {route} ({duration_ms:.0f}ms) profiled to {path.name}")
+    return path
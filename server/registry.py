@@ -0,0 +1,241 @@
+"""
+Versioned model registry with concurrent loading and hot reload
+Active versions come from model/manifest.json; each artifact loads on its own
+thread so startup takes as long as the slowest model rather than the sum of
+all of them. Reloads warm the new version before swapping it in.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from features import check_feature_order
+from inference import (artifact_path, artifact_version, export_store, import_pickle_modules, load_artifact,
+                       select_engine)
+
+logger = logging.getLogger(__name__)
+
+# Load states reported by /health/ready
+PENDING, LOADING, READY, FAILED, MISSING = "pending", "loading", "ready", "failed", "missing"
+
+# Probe predictions run on a freshly loaded version before it goes live
+WARMUP_ROUNDS = 3
+
+# Tree models exported to the shared store; the linear model is a few floats
+STORE_MODELS = ("decision_tree", "random_forest")
+
+def read_manifest(manifest_path: Path, defaults: Dict[str, Path]) -> Dict[str, Tuple[str, Path]]:
+    """Return model name -> (active version, artifact path)
+
+    Without a manifest the default paths are used, versioned by fingerprint.
+    """
+    if not manifest_path.exists():
+        return {
+            name: (artifact_version(path) if path.exists() else "missing", path)
+            for name, path in defaults.items()
+        }
+
+    manifest = json.loads(manifest_path.read_text())
+    active = {}
+    for name, entry in manifest.get("models", {}).items():
+        version = str(entry["active"])
+        if version not in entry.get("versions", {}):
+            raise RuntimeError(f"Manifest: active version '{version}' of '{name}' is not listed")
+        active[name] = (version, manifest_path.parent / entry["versions"][version]["path"])
+    return active
+
+def build_store(manifest_path: Path, defaults: Dict[str, Path], store_dir: Path, rebuild: bool = False) -> None:
+    """Export the active tree pickles to CompiledForest arrays unless already exported"""
+    for name, (version, pickle_path) in read_manifest(manifest_path, defaults).items():
+        if name not in STORE_MODELS or pickle_path.suffix == ".npz":
+            continue
+        if not pickle_path.exists():
+            logger.warning(f"⚠ Skipping {name} {version}: {pickle_path} not found")
+            continue
+        started = time.perf_counter()
+        if export_store(name, pickle_path, store_dir, rebuild):
+            logger.info(f"✓ Exported {name} {version} to {store_dir} in {time.perf_counter() - started:.2f}s")
+        else:
+            logger.info(f"✓ {name} {version} store is up to date")
+
+def list_versions(manifest_path: Path) -> Dict[str, Any]:
+    """Every version the manifest knows about"""
+    if not manifest_path.exists():
+        return {}
+    manifest = json.loads(manifest_path.read_text())
+    return {name: sorted(entry.get("versions", {})) for name, entry in manifest.get("models", {}).items()}
+
+class ModelRegistry:
+    """Loads artifacts into the shared ``models`` / ``versions`` dicts
+
+    Swaps replace a single dict entry on the event loop, so a request that
+    already picked up a model keeps using it until its batch completes.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        versions: Dict[str, str],
+        engine: str,
+        manifest_path: Path,
+        default_paths: Dict[str, Path],
+        probe: Optional[np.ndarray] = None,
+    ):
+        self.models = models
+        self.versions = versions
+        self.engine = engine
+        self.manifest_path = manifest_path
+        self.default_paths = default_paths
+        self.probe = probe
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.paths: Dict[str, Path] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._reload_lock = asyncio.Lock()
+
+    def _load(self, name: str, path: Path) -> Any:
+        model = load_artifact(path)
+        check_feature_order(model, name)
+        model = select_engine({name: model}, self.engine)[name]
+        if self.probe is not None:
+            for _ in range(WARMUP_ROUNDS):
+                model.predict(self.probe)
+        return model
+
+    async def _load_one(self, name: str, version: str, path: Path) -> None:
+        state = self.states[name]
+        state["status"] = LOADING
+        started = time.perf_counter()
+        try:
+            model = await asyncio.to_thread(self._load, name, path)
+        except Exception as e:
+            state.update(status=FAILED, error=str(e), load_seconds=round(time.perf_counter() - started, 4))
+            logger.error(f"❌ Failed to load {name} {version} from {path}: {e}")
+            return
+        self._activate(name, version, path, model)
+        state.update(status=READY, load_seconds=round(time.perf_counter() - started, 4))
+        logger.info(f"✓ {name} {version} loaded from {path.name} in {state['load_seconds']}s")
+
+    def _activate(self, name: str, version: str, path: Path, model: Any) -> None:
+        # No await between these lines: readers see the old or the new pair
+        self.models[name] = model
+        self.versions[name] = version
+        self.paths[name] = path
+        self.states.setdefault(name, {}).update(version=version, path=str(path), error=None)
+
+    def _resolve(self) -> Dict[str, Tuple[str, Path]]:
+        return {
+            name: (version, artifact_path(name, path))
+            for name, (version, path) in read_manifest(self.manifest_path, self.default_paths).items()
+        }
+
+    async def start(self, wait_for_all: bool = True) -> None:
+        """Begin loading every active artifact concurrently
+
+        With ``wait_for_all=False`` this returns as soon as one model is
+        ready; the rest keep loading in the background.
+        """
+        resolved = self._resolve()
+        # On this thread, before the loader threads race to import sklearn
+        import_pickle_modules([path for _, path in resolved.values() if path.exists()])
+        for name, (version, path) in resolved.items():
+            self.states[name] = {"status": PENDING, "path": str(path), "version": version, "load_seconds": None}
+            if not path.exists():
+                self.states[name]["status"] = MISSING
+                logger.warning(f"⚠ {name} model not found: {path}")
+                continue
+            self._tasks[name] = asyncio.create_task(self._load_one(name, version, path))
+
+        pending = set(self._tasks.values())
+        while pending:
+            if not wait_for_all and self.models:
+                break
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+    async def reload(self, names: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, Any]:
+        """Re-read the manifest and hot-swap models whose active version changed
+
+        The new version is loaded and warmed on a worker thread while the old
+        one keeps serving; a failed load leaves the old version active.
+        """
+        async with self._reload_lock:
+            resolved = self._resolve()
+            wanted = set(names) if names is not None else set(resolved)
+            unknown = wanted - set(resolved)
+            if unknown:
+                raise KeyError(f"Unknown models: {sorted(unknown)}")
+
+            import_pickle_modules([resolved[name][1] for name in wanted if resolved[name][1].exists()])
+            results: Dict[str, Any] = {}
+            for name in sorted(wanted):
+                version, path = resolved[name]
+                if not force and self.versions.get(name) == version and self.paths.get(name) == path:
+                    results[name] = {"status": "unchanged", "version": version}
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    model = await asyncio.to_thread(self._load, name, path)
+                except Exception as e:
+                    logger.error(f"❌ Reload of {name} {version} failed, keeping {self.versions.get(name)}: {e}")
+                    results[name] = {"status": FAILED, "version": self.versions.get(name), "error": str(e)}
+                    continue
+
+                previous = self.versions.get(name)
+                self._activate(name, version, path, model)
+                self.states[name].update(status=READY, load_seconds=round(time.perf_counter() - started, 4))
+                logger.info(f"✓ Swapped {name} {previous} -> {version}")
+                results[name] = {"status": "swapped", "version": version, "previous": previous}
+            return results
+
+    @property
+    def loading(self) -> bool:
+        return any(not t.done() for t in self._tasks.values())
+
+    async def close(self) -> None:
+        """Wait for background loads so their threads do not outlive shutdown"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        self.states.clear()
+        self.paths.clear()
+
+    def artifact_paths(self) -> Dict[str, Path]:
+        """Artifact of every model that is loaded or still loading"""
+        return {
+            name: Path(state["path"])
+            for name, state in self.states.items()
+            if state["status"] not in (MISSING, FAILED)
+        }
+
+    def artifact_versions(self) -> Dict[str, str]:
+        """Version of every model in artifact_paths()"""
+        return {
+            name: state["version"]
+            for name, state in self.states.items()
+            if state["status"] not in (MISSING, FAILED)
+        }
+
+    async def wait_loaded(self) -> None:
+        """Wait for the background loads started by start()"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def readiness(self) -> Dict[str, Any]:
+        return {
+            "ready": bool(self.models),
+            "loading": self.loading,
+            "models": {name: dict(state) for name, state in self.states.items()},
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "manifest": str(self.manifest_path) if self.manifest_path.exists() else None,
+            "active": dict(self.versions),
+            "available": list_versions(self.manifest_path),
+            "models": {name: dict(state) for name, state in self.states.items()},
+        }
@@ -0,0 +1,269 @@
+"""
+Offline bulk scoring for large CSV / Parquet files
+Streams the input in chunks, scores each chunk on a process pool with the
+same models, features and weighted_ensemble as the API, and appends the
+results to a CSV. A checkpoint next to the output records the last completed
+chunk so an interrupted run resumes where it stopped.
+
+Usage:
+  python score.py portfolio.csv
+  python score.py portfolio.parquet -o scored.csv --workers 8 --keep loan_id
+  python score.py portfolio.csv --restart
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from executor import _init_worker, _worker_models, run_models
+from features import RAW_COLUMNS, build_features_from_raw
+from inference import INFERENCE_ENGINE, artifact_path
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("score")
+
+CHUNK_ROWS = 50_000
+
+# -------- Input --------
+def iter_chunks(path: Path, chunk_rows: int, columns: List[str], skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks of the needed columns, skipping already scored rows"""
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Parquet input needs pyarrow (pip install pyarrow)")
+        skipped = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            if skipped + batch.num_rows <= skip_rows:
+                skipped += batch.num_rows
+                continue
+            chunk = batch.to_pandas()
+            if skipped < skip_rows:
+                chunk = chunk.iloc[skip_rows - skipped:]
+                skipped = skip_rows
+            yield chunk
+        return
+
+    # skiprows keeps the header line and drops the rows already written. A callable,
+    # because pandas turns a range into a set of every skipped row number
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows,
+                           skiprows=(lambda i: 0 < i <= skip_rows) if skip_rows else None)
+
+def field_bounds() -> Dict[str, Dict[str, float]]:
+    """gt / ge / lt / le constraints declared on LoanApplication, per raw column
+
+    Integer fields also get ``"int": 1.0`` so fractional values are rejected.
+    """
+    from app import LoanApplication
+
+    bounds: Dict[str, Dict[str, float]] = {}
+    for name in RAW_COLUMNS:
+        field = LoanApplication.model_fields[name]
+        limits = {"int": 1.0} if field.annotation is int else {}
+        for constraint in field.metadata:
+            for op in ("gt", "ge", "lt", "le"):
+                if getattr(constraint, op, None) is not None:
+                    limits[op] = float(getattr(constraint, op))
+        bounds[name] = limits
+    return bounds
+
+def validate(raw: np.ndarray, bounds: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """Per-row error message ('' when valid), mirroring the API's request validation"""
+    errors = np.full(raw.shape[0], "", dtype=object)
+    with np.errstate(invalid="ignore"):
+        for j, name in enumerate(RAW_COLUMNS):
+            col = raw[:, j]
+            bad = np.isnan(col)
+            checks = {
+                "gt": col <= bounds[name].get("gt", -np.inf),
+                "ge": col < bounds[name].get("ge", -np.inf),
+                "lt": col >= bounds[name].get("lt", np.inf),
+                "le": col > bounds[name].get("le", np.inf),
+            }
+            for op, failed in checks.items():
+                if op in bounds[name]:
+                    bad |= failed
+            if "int" in bounds[name]:
+                bad |= col != np.floor(col)
+            errors[bad & (errors == "")] = f"invalid {name}"
+    return errors
+
+# -------- Pool worker --------
+def score_chunk(raw: np.ndarray, bounds: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Validate, featurize and score one chunk inside a pool process"""
+    from app import recommend, weighted_ensemble
+
+    errors = validate(raw, bounds)
+    valid = np.flatnonzero(errors == "")
+    X = build_features_from_raw(raw[valid])
+    rows = np.arange(len(valid), dtype=np.intp)
+    outputs = run_models(_worker_models, X, {name: rows for name in _worker_models})
+
+    n = raw.shape[0]
+    preds = {name: np.full(n, np.nan) for name in _worker_models}
+    # Like the API, a failing model is left out of the ensemble
+    for name, p in outputs.items():
+        if not isinstance(p, Exception):
+            preds[name][valid] = p
+
+    decision = np.full(n, -1, dtype=np.int8)
+    confidence = np.full(n, np.nan)
+    recommendation = np.full(n, "", dtype=object)
+    working = [name for name, p in outputs.items() if not isinstance(p, Exception)]
+    if working:
+        for i in valid:
+            final_pred, conf = weighted_ensemble({name: float(preds[name][i]) for name in working})
+            decision[i] = final_pred
+            confidence[i] = round(conf, 2)
+            recommendation[i] = recommend(final_pred, conf)
+    else:
+        errors[valid] = "all models failed"
+
+    return {"decision": decision, "confidence": confidence, "recommendation": recommendation,
+            "preds": preds, "error": errors}
+
+def to_frame(chunk: pd.DataFrame, result: Dict[str, Any], keep: List[str], model_names: List[str]) -> pd.DataFrame:
+    scored = result["decision"] >= 0
+    out = chunk[keep].reset_index(drop=True).copy()
+    out["approved"] = pd.array(np.where(scored, result["decision"] == 1, None), dtype="boolean")
+    out["loan_status"] = pd.array(np.where(scored, result["decision"], None), dtype="Int8")
+    out["confidence"] = result["confidence"]
+    out["recommendation"] = result["recommendation"]
+    for name in model_names:
+        out[f"pred_{name}"] = result["preds"][name]
+    out["error"] = result["error"]
+    return out
+
+# -------- Checkpoint --------
+def load_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    return json.loads(path.read_text()) if path.exists() else None
+
+def save_checkpoint(path: Path, state: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2) + "\n")
+    os.replace(tmp, path)
+
+def input_identity(path: Path) -> Dict[str, Any]:
+    stat = path.stat()
+    return {"input": str(path.resolve()), "input_size": stat.st_size, "input_mtime_ns": stat.st_mtime_ns}
+
+# -------- Driver --------
+def resolve_models(names: Optional[List[str]]) -> Dict[str, Tuple[str, Path]]:
+    """Active manifest version and artifact of each model, as the API would load them"""
+    from app import MODEL_MANIFEST_PATH, MODEL_NAMES, MODEL_PATHS
+    from registry import read_manifest
+
+    active = read_manifest(MODEL_MANIFEST_PATH, MODEL_PATHS)
+    resolved = {}
+    for name in names or MODEL_NAMES:
+        if name not in active:
+            raise SystemExit(f"❌ Unknown model '{name}'")
+        version, path = active[name]
+        path = artifact_path(name, path)
+        if not path.exists():
+            logger.warning(f"⚠ Skipping {name}: {path} not found")
+            continue
+        resolved[name] = (version, path)
+    if not resolved:
+        raise SystemExit("❌ No models available")
+    return resolved
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Score a large CSV/Parquet file offline")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("-o", "--output", type=Path, help="Output CSV (default: <input>.scored.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", default=INFERENCE_ENGINE, help="sklearn or compiled")
+    parser.add_argument("--models", nargs="+", help="Subset of models (default: all)")
+    parser.add_argument("--keep", nargs="*", default=[], help="Input columns copied to the output, e.g. loan_id")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start over")
+    args = parser.parse_args(argv)
+
+    output = args.output or args.input.with_suffix(".scored.csv")
+    checkpoint_path = output.with_name(output.name + ".checkpoint.json")
+    active = resolve_models(args.models)
+    model_names = list(active)
+    versions = {name: version for name, (version, _) in active.items()}
+
+    run = {**input_identity(args.input), "chunk_rows": args.chunk_rows, "keep": args.keep,
+           "engine": args.engine, "model_versions": versions}
+    state = None if args.restart else load_checkpoint(checkpoint_path)
+    if state is not None:
+        if {k: state.get(k) for k in run} != run:
+            raise SystemExit(f"❌ {checkpoint_path} belongs to a different input/model set; use --restart")
+        # Drop anything written after the last completed chunk
+        with open(output, "r+b") as f:
+            f.truncate(state["output_bytes"])
+        logger.info(f"↻ Resuming after chunk {state['chunks_done']} ({state['rows_done']} rows)")
+    else:
+        state = {**run, "chunks_done": 0, "rows_done": 0, "output_bytes": 0, "finished": False}
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_bytes(b"")
+
+    if state.get("finished"):
+        logger.info(f"✅ {output} is already complete ({state['rows_done']} rows)")
+        return
+
+    bounds = field_bounds()
+    columns = list(dict.fromkeys(args.keep + list(RAW_COLUMNS)))
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=({name: str(path) for name, (_, path) in active.items()}, args.engine),
+    )
+    # Bounded window of chunks in flight keeps memory flat regardless of input size
+    window: Deque[Tuple[pd.DataFrame, Future]] = deque()
+    max_in_flight = args.workers + 1
+    started = time.perf_counter()
+    rows_this_run = 0
+
+    def drain_one() -> None:
+        nonlocal rows_this_run
+        chunk, future = window.popleft()
+        frame = to_frame(chunk, future.result(), args.keep, model_names)
+        with open(output, "a", newline="") as f:
+            frame.to_csv(f, header=state["output_bytes"] == 0, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+            state["output_bytes"] = f.tell()
+        state["chunks_done"] += 1
+        state["rows_done"] += len(frame)
+        save_checkpoint(checkpoint_path, state)
+
+        rows_this_run += len(frame)
+        elapsed = time.perf_counter() - started
+        failed = int((frame["error"] != "").sum())
+        logger.info(f"chunk {state['chunks_done']}: {state['rows_done']} rows total, "
+                    f"{rows_this_run / elapsed:,.0f} rows/s" + (f", {failed} rejected" if failed else ""))
+
+    try:
+        for chunk in iter_chunks(args.input, args.chunk_rows, columns, skip_rows=state["rows_done"]):
+            raw = chunk[list(RAW_COLUMNS)].to_numpy(dtype=np.float64, na_value=np.nan)
+            window.append((chunk, pool.submit(score_chunk, raw, bounds)))
+            if len(window) >= max_in_flight:
+                drain_one()
+        while window:
+            drain_one()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    state["finished"] = True
+    save_checkpoint(checkpoint_path, state)
+    elapsed = time.perf_counter() - started
+    logger.info(f"✅ Scored {rows_this_run} rows in {elapsed:.1f}s "
+                f"({rows_this_run / max(elapsed, 1e-9):,.0f} rows/s) -> {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Multi-worker launcher for the Loan Prediction API
+Exports the tree models once into an uncompressed array store, then starts N
+uvicorn workers that memory-map the same read-only pages
+
+Usage:
+  python serve.py --workers 4
+  python serve.py --workers 4 --rebuild-store --report-interval 30
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+
+from sysinfo import child_pids, memory_usage
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("serve")
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_STORE_DIR = BASE_DIR / "model" / "store"
+
+def build_store(store_dir: Path, rebuild: bool = False) -> None:
+    """Export the active tree pickles to the store; workers export later activations themselves"""
+    from app import MODEL_MANIFEST_PATH, MODEL_PATHS
+    from registry import build_store as export_active
+
+    export_active(MODEL_MANIFEST_PATH, MODEL_PATHS, store_dir, rebuild)
+
+def report_workers(interval: float) -> None:
+    """Periodically log RSS / PSS of every worker process"""
+    parent = os.getpid()
+    while True:
+        time.sleep(interval)
+        workers = child_pids(parent)
+        total_rss = total_pss = 0.0
+        for pid in workers:
+            usage = memory_usage(pid)
+            if not usage:
+                continue
+            total_rss += usage.get("rss_mb", 0.0)
+            total_pss += usage.get("pss_mb", 0.0)
+            logger.info(
+                f"worker {pid}: RSS={usage.get('rss_mb')}MB PSS={usage.get('pss_mb')}MB "
+                f"anon={usage.get('rss_anon_mb')}MB file={usage.get('rss_file_mb')}MB"
+            )
+        if workers:
+            logger.info(f"{len(workers)} workers: RSS total={total_rss:.1f}MB PSS total={total_pss:.1f}MB")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Loan Prediction API with shared model arrays")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--store", type=Path, default=Path(os.getenv("MODEL_STORE_DIR", DEFAULT_STORE_DIR)))
+    parser.add_argument("--rebuild-store", action="store_true", help="Re-export even if already exported")
+    parser.add_argument("--report-interval", type=float, default=60.0,
+                        help="Seconds between worker memory reports (0 disables)")
+    args = parser.parse_args()
+
+    # Workers inherit these and map the store instead of unpickling trees
+    os.environ["MODEL_STORE_DIR"] = str(args.store)
+    os.environ.setdefault("INFERENCE_ENGINE", "compiled")
+    # Each worker watches the manifest itself; an admin reload would reach only one of them
+    os.environ["SERVE_WORKERS"] = str(args.workers)
+    os.environ.setdefault("MODEL_WATCH_SECONDS", "2")
+
+    build_store(args.store, rebuild=args.rebuild_store)
+
+    if args.report_interval > 0:
+        threading.Thread(target=report_workers, args=(args.report_interval,), daemon=True).start()
+
+    uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
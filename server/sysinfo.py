@@ -0,0 +1,52 @@
+"""
+Process memory helpers (Linux /proc, with a getrusage fallback)
+"""
+
+import os
+import resource
+from typing import Dict, Union
+
+def _read_kb(path: str, keys: tuple) -> Dict[str, int]:
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in keys:
+                values[key] = int(rest.split()[0])
+    return values
+
+def memory_usage(pid: Union[int, str] = "self") -> Dict[str, float]:
+    """Resident memory of a process in MB
+
+    ``pss_mb`` divides shared pages between the processes mapping them, so it
+    is the number that shows savings from memory-mapped model arrays.
+    """
+    try:
+        status = _read_kb(f"/proc/{pid}/status", ("VmRSS", "RssAnon", "RssFile", "RssShmem"))
+        usage = {
+            "rss_mb": round(status.get("VmRSS", 0) / 1024, 1),
+            "rss_anon_mb": round(status.get("RssAnon", 0) / 1024, 1),
+            "rss_file_mb": round(status.get("RssFile", 0) / 1024, 1),
+        }
+        try:
+            rollup = _read_kb(f"/proc/{pid}/smaps_rollup", ("Pss",))
+            usage["pss_mb"] = round(rollup.get("Pss", 0) / 1024, 1)
+        except OSError:
+            pass
+        return usage
+    except OSError:
+        if pid != "self" and pid != os.getpid():
+            return {}
+        # ru_maxrss is the peak, in KB on Linux
+        return {"rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+def child_pids(pid: int) -> list:
+    """Direct children of a process"""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
@@ -0,0 +1,110 @@
+"""
+Tests for admission control and its 503 backpressure
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from admission import (PRIORITY_BATCH, PRIORITY_ENSEMBLE, PRIORITY_INDIVIDUAL, AdmissionController,
+                       AdmissionRejected)
+from app import app
+from test_app import application_approved
+
+async def _priority_order():
+    admission = AdmissionController(max_concurrent=1, max_queue=10, queue_timeout_ms=1000)
+    await admission.acquire(PRIORITY_ENSEMBLE)
+    served = []
+
+    async def request(priority, label):
+        async with admission.slot(priority):
+            served.append(label)
+
+    tasks = [asyncio.create_task(request(p, label)) for p, label in
+             [(PRIORITY_BATCH, "batch"), (PRIORITY_ENSEMBLE, "ensemble"), (PRIORITY_INDIVIDUAL, "individual")]]
+    await asyncio.sleep(0.01)
+    assert admission.stats()["queued"] == {"individual": 1, "ensemble": 1, "batch": 1}
+    admission.release()
+    await asyncio.gather(*tasks)
+    return served, admission
+
+def test_waiters_are_served_by_priority():
+    served, admission = asyncio.run(_priority_order())
+    assert served == ["individual", "ensemble", "batch"]
+    assert admission.active == 0
+
+async def _overload():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout_ms=50)
+    await admission.acquire(PRIORITY_ENSEMBLE)
+
+    waiting = asyncio.create_task(admission.acquire(PRIORITY_ENSEMBLE))
+    await asyncio.sleep(0)
+    # Queue is full for ensemble traffic but not for the higher-priority individual calls
+    with pytest.raises(AdmissionRejected) as full:
+        await admission.acquire(PRIORITY_ENSEMBLE)
+    individual = asyncio.create_task(admission.acquire(PRIORITY_INDIVIDUAL))
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await waiting
+    with pytest.raises(AdmissionRejected):
+        await individual
+
+    # A cancelled waiter does not leak its slot
+    cancelled = asyncio.create_task(admission.acquire(PRIORITY_BATCH))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    admission.release()
+    return full.value, timed_out.value, admission
+
+def test_full_queue_and_timeouts_are_rejected():
+    full, timed_out, admission = asyncio.run(_overload())
+    assert full.reason == "queue_full"
+    assert timed_out.reason == "timeout"
+    assert admission.active == 0
+    assert admission.rejected == {"individual": 1, "ensemble": 2, "batch": 0}
+
+def test_overloaded_routes_return_503_but_health_is_served(monkeypatch):
+    from app import admission, prediction_cache
+
+    with TestClient(app) as client:
+        prediction_cache.clear()
+        monkeypatch.setattr(admission, "max_queue", 0)
+        monkeypatch.setattr(admission, "active", admission.max_concurrent)
+
+        response = client.post("/predict", json=application_approved)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert client.post("/predict/individual/linear", json=application_approved).status_code == 503
+        assert client.post("/predict/batch", json=[application_approved]).status_code == 503
+        assert client.get("/health").status_code == 200
+
+        stats = client.get("/stats").json()["admission"]
+        assert stats["rejected"] == {"individual": 1, "ensemble": 1, "batch": 1}
+        assert 'loan_admission_rejected_total{priority="ensemble",reason="queue_full"}' in client.get("/metrics").text
+
+        monkeypatch.setattr(admission, "active", 0)
+        assert client.post("/predict", json=application_approved).status_code == 200
+
+def test_queue_wait_is_its_own_stage(monkeypatch):
+    from app import admission, prediction_cache
+    from metrics import STAGE_SECONDS
+
+    def stage_seconds(stage):
+        series = STAGE_SECONDS._series.get(("/predict", stage))
+        return series[-1] if series else 0.0
+
+    acquire = admission.acquire
+
+    async def queued_acquire(priority):
+        await asyncio.sleep(0.2)
+        await acquire(priority)
+
+    with TestClient(app) as client:
+        prediction_cache.clear()
+        monkeypatch.setattr(admission, "acquire", queued_acquire)
+        waited, parsed = stage_seconds("admission_wait"), stage_seconds("body_parse")
+        assert client.post("/predict", json=application_approved).status_code == 200
+        assert stage_seconds("admission_wait") - waited >= 0.2
+        assert stage_seconds("body_parse") - parsed < 0.1
@@ -0,0 +1,470 @@
+"""
+In-process tests for the Loan Prediction API
+Runs against the FastAPI app directly, no live server required
+"""
+
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+
+application_approved = {
+    "income_annum": 9600000,
+    "loan_amount": 2990000,
+    "loan_term": 12,
+    "cibil_score": 778,
+    "residential_assets_value": 2400000,
+    "commercial_assets_value": 17600000,
+    "luxury_assets_value": 22700000,
+    "bank_asset_value": 3800000
+}
+
+application_rejected = {
+    "income_annum": 1200000,
+    "loan_amount": 29900000,
+    "loan_term": 12,
+    "cibil_score": 450,
+    "residential_assets_value": 100000,
+    "commercial_assets_value": 0,
+    "luxury_assets_value": 0,
+    "bank_asset_value": 50000
+}
+
+@pytest.fixture
+def client():
+    # Function scoped: lifespan owns module-level model state
+    with TestClient(app) as c:
+        yield c
+
+def to_csv(rows):
+    header = ",".join(rows[0].keys())
+    lines = [",".join(str(v) for v in row.values()) for row in rows]
+    return "\n".join([header] + lines) + "\n"
+
+def test_batch_json_matches_single(client):
+    rows = [application_approved, application_rejected]
+    response = client.post("/predict/batch", json=rows)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+
+    for row, result in zip(rows, body["results"]):
+        single = client.post("/predict", data=row).json()
+        # Batched linear scores can differ from single-row ones in the last ulp
+        assert result.pop("predictions") == pytest.approx(single.pop("predictions"), abs=1e-12)
+        assert result == single
+
+def test_batch_csv_upload_matches_json(client):
+    rows = [application_approved, application_rejected] * 3
+    csv_body = to_csv(rows)
+    from_json = client.post("/predict/batch", json=rows).json()
+
+    uploaded = client.post("/predict/batch", files={"file": ("apps.csv", csv_body, "text/csv")})
+    assert uploaded.status_code == 200
+    assert uploaded.json() == from_json
+
+    raw = client.post("/predict/batch", content=csv_body, headers={"content-type": "text/csv"})
+    assert raw.status_code == 200
+    assert raw.json() == from_json
+
+def test_batch_rejects_invalid_rows(client):
+    bad = dict(application_approved, cibil_score=100)
+    response = client.post("/predict/batch", json=[application_approved, bad])
+    assert response.status_code == 422
+
+    missing = client.post(
+        "/predict/batch",
+        content="income_annum,loan_amount\n1,2\n",
+        headers={"content-type": "text/csv"}
+    )
+    assert missing.status_code == 422
+
+    assert client.post("/predict/batch", json=[]).status_code == 422
+    assert client.post("/predict/batch", json={"rows": []}).status_code == 422
+
+async def _concurrent_run(rows):
+    import asyncio
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            ensemble = await asyncio.gather(*[ac.post("/predict", data=row) for row in rows])
+            individual = await asyncio.gather(*[
+                ac.post("/predict/individual/decision_tree", data=row) for row in rows
+            ])
+            stats = (await ac.get("/stats")).json()
+    return ensemble, individual, stats
+
+def test_concurrent_predictions_are_coalesced():
+    import asyncio
+
+    rows = [application_approved, application_rejected] * 8
+    ensemble, individual, stats = asyncio.run(_concurrent_run(rows))
+
+    with TestClient(app) as c:
+        for row, response, single in zip(rows, ensemble, individual):
+            assert response.status_code == 200
+            assert response.json()["approved"] == c.post("/predict", data=row).json()["approved"]
+            assert single.json() == c.post("/predict/individual/decision_tree", data=row).json()
+
+    assert stats["batching"]["rows"] >= 32
+    assert stats["batching"]["max_observed_batch_size"] > 1
+    assert stats["executor"]["kind"] == "thread"
+
+def test_process_executor_matches_thread(client):
+    import asyncio
+    import numpy as np
+    from app import MODEL_PATHS, models, model_versions, preprocess_batch, LoanApplication
+    from executor import InferenceExecutor
+
+    X = preprocess_batch([LoanApplication(**application_approved), LoanApplication(**application_rejected)])
+    requested = {name: np.arange(2) for name in models}
+
+    async def run():
+        pool = InferenceExecutor(models, model_versions, kind="process", workers=1)
+        pool.start(MODEL_PATHS, versions=dict(model_versions))
+        try:
+            return await pool.run_models(X, requested)
+        finally:
+            pool.shutdown()
+
+    in_process = InferenceExecutor(models, model_versions, kind="thread").run_models
+    expected, expected_versions = asyncio.run(in_process(X, requested))
+    outputs, versions = asyncio.run(run())
+    assert versions == expected_versions
+    for name, preds in outputs.items():
+        assert np.allclose(preds, expected[name], rtol=0, atol=1e-12)
+
+def test_process_executor_with_staged_loading(monkeypatch):
+    import time
+    import app as app_module
+    from app import executor, registry
+
+    # Only linear is ready when the pool starts; the others finish loading later
+    load = registry._load
+    def slow_load(name, path):
+        if name != "linear":
+            time.sleep(0.5)
+        return load(name, path)
+
+    monkeypatch.setattr(app_module, "SERVE_ON_FIRST_MODEL", True)
+    monkeypatch.setattr(registry, "_load", slow_load)
+    monkeypatch.setattr(executor, "kind", "process")
+    monkeypatch.setattr(executor, "workers", 1)
+    with TestClient(app) as c:
+        early = c.post("/predict", data=application_approved)
+        assert early.status_code == 200
+        assert set(early.json()["model_versions"]) == set(early.json()["predictions"])
+
+        deadline = time.monotonic() + 30
+        while registry.loading and time.monotonic() < deadline:
+            time.sleep(0.05)
+        for _ in range(2):
+            single = c.post("/predict", data=application_rejected)
+            assert single.status_code == 200
+            assert single.json()["model_versions"] == {"linear": "v1", "decision_tree": "v1", "random_forest": "v1"}
+            batch = c.post("/predict/batch", json=[application_approved, application_rejected])
+            assert batch.status_code == 200
+            assert batch.json()["model_versions"] == single.json()["model_versions"]
+            time.sleep(0.5)
+
+def test_prediction_cache_hits_and_bypass(client):
+    from app import prediction_cache
+
+    prediction_cache.clear()
+    before = client.get("/stats").json()["cache"]
+
+    first = client.post("/predict", data=application_rejected).json()
+    second = client.post("/predict", data=application_rejected).json()
+    assert first == second
+
+    with_document = client.post(
+        "/predict",
+        data=application_rejected,
+        files={"document": ("statement.pdf", b"%PDF-1.4", "application/pdf")}
+    ).json()
+    # Documents are verified in the background, so the prediction itself still comes from the cache
+    assert with_document.pop("verification_status") == "Document verification pending"
+    assert with_document.pop("document_job")["status_url"].startswith("/documents/")
+    assert {k: v for k, v in with_document.items() if k != "verification_status"} == \
+        {k: v for k, v in first.items() if k != "verification_status"}
+
+    after = client.get("/stats").json()["cache"]
+    assert after["hits"] - before["hits"] == 2
+    assert after["misses"] - before["misses"] == 1
+
+def test_cascade_exits_early_only_when_confident(client, monkeypatch):
+    import app as app_module
+
+    rows = [application_approved, application_rejected]
+    full = client.post("/predict/batch", json=rows).json()["results"]
+    assert not any(r["early_exit"] for r in full)
+
+    monkeypatch.setattr(app_module, "ENSEMBLE_MODE", "cascade")
+    monkeypatch.setattr(app_module, "CASCADE_MARGIN", 0.3)
+    app_module.prediction_cache.clear()
+    cascaded = client.post("/predict/batch", json=rows).json()["results"]
+    for row, result, reference in zip(rows, cascaded, full):
+        single = client.post("/predict", data=row).json()
+        assert single["early_exit"] == result["early_exit"]
+        assert single["models_used"] == result["models_used"]
+        assert result["loan_status"] == reference["loan_status"]
+        if result["early_exit"]:
+            assert result["models_used"] == ["linear", "decision_tree"]
+    assert any(r["early_exit"] for r in cascaded)
+
+    # No first-stage score is more than 0.5 from the threshold, so everything escalates
+    monkeypatch.setattr(app_module, "CASCADE_MARGIN", 0.51)
+    app_module.prediction_cache.clear()
+    single = client.post("/predict", data=application_approved).json()
+    assert single["early_exit"] is False
+    assert single["models_used"] == ["linear", "decision_tree", "random_forest"]
+    app_module.prediction_cache.clear()
+
+def packed(*rows):
+    import numpy as np
+    from features import RAW_COLUMNS
+
+    return np.array([[row[c] for c in RAW_COLUMNS] for row in rows], dtype="<f8").tobytes()
+
+def test_json_and_binary_bodies_match_form(client):
+    binary = {"Content-Type": "application/octet-stream"}
+    for row in (application_approved, application_rejected):
+        form = client.post("/predict", data=row).json()
+        assert client.post("/predict", json=row).json() == form
+        assert client.post("/predict", content=packed(row), headers=binary).json() == form
+
+        individual = client.post("/predict/individual/random_forest", data=row).json()
+        assert client.post("/predict/individual/random_forest", json=row).json() == individual
+
+    rows = [application_approved, application_rejected] * 2
+    from_json = client.post("/predict/batch", json=rows).json()
+    assert client.post("/predict/batch", content=packed(*rows), headers=binary).json() == from_json
+
+def test_unusable_bodies_are_rejected(client):
+    assert client.post("/predict", json={**application_approved, "cibil_score": 100}).status_code == 422
+    assert client.post("/predict", content=b"{not json", headers={"Content-Type": "application/json"}).status_code == 400
+    assert client.post("/predict", content=b"\0" * 10, headers={"Content-Type": "application/octet-stream"}).status_code == 400
+    assert client.post("/predict", content=b"x", headers={"Content-Type": "text/plain"}).status_code == 415
+    # Form values outside the schema are a 422, not a model failure
+    assert client.post("/predict", data={**application_approved, "bank_asset_value": -1}).status_code == 422
+
+def test_whatif_sweep_matches_batch_scoring(client):
+    body = {"application": application_approved, "sweep": [
+        {"field": "loan_amount", "start": 1e6, "stop": 4e7, "steps": 6},
+        {"field": "cibil_score", "start": 300, "stop": 900, "steps": 7},
+    ]}
+    response = client.post("/predict/whatif", json=body)
+    assert response.status_code == 200
+    sweep = response.json()
+    loans, scores = (axis["values"] for axis in sweep["axes"])
+    assert sweep["points"] == len(loans) * len(scores) == 42
+    assert scores == [300.0, 400.0, 500.0, 600.0, 700.0, 800.0, 900.0]
+
+    rows = [{**application_approved, "loan_amount": x, "cibil_score": y} for x in loans for y in scores]
+    batch = client.post("/predict/batch", json=rows).json()["results"]
+    approved = [cell for row in sweep["approved"] for cell in row]
+    confidence = [cell for row in sweep["confidence"] for cell in row]
+    assert approved == [r["approved"] for r in batch]
+    assert confidence == pytest.approx([r["confidence"] for r in batch], abs=0.01)
+
+    # Every boundary point sits between two grid cells with different decisions
+    assert sweep["boundary"]
+    for point in sweep["boundary"]:
+        i = max(j for j, x in enumerate(loans) if x <= point["loan_amount"])
+        k = max(j for j, y in enumerate(scores) if y <= point["cibil_score"])
+        neighbours = {sweep["approved"][i][k]}
+        if point["loan_amount"] not in loans:
+            neighbours.add(sweep["approved"][i + 1][k])
+        if point["cibil_score"] not in scores:
+            neighbours.add(sweep["approved"][i][k + 1])
+        assert neighbours == {True, False}
+
+def test_whatif_rejects_invalid_sweeps(client):
+    def sweep(*axes):
+        return client.post("/predict/whatif", json={"application": application_approved, "sweep": list(axes)})
+
+    assert sweep({"field": "cibil_score", "start": 100, "stop": 900, "steps": 5}).status_code == 422
+    assert sweep({"field": "loan_amount", "start": 5, "stop": 1, "steps": 5}).status_code == 422
+    assert sweep({"field": "loan_amount", "start": 1, "stop": 5, "steps": 10_000}).status_code == 422
+    assert sweep({"field": "dti_ratio", "start": 1, "stop": 5, "steps": 5}).status_code == 422
+    axis = {"field": "loan_term", "start": 2, "stop": 20, "steps": 5}
+    assert sweep(axis, axis).status_code == 422
+    assert sweep().status_code == 422
+
+def test_ensemble_matrix_matches_weighted_ensemble():
+    import numpy as np
+    from app import ensemble_matrix, weighted_ensemble
+
+    preds = {"linear": np.array([0.2, 0.9, -1.5]), "decision_tree": np.array([0.0, 1.0, 1.0]),
+             "random_forest": np.array([0.4, np.nan, 0.7])}
+    score, decision, confidence = ensemble_matrix(preds)
+    for i in range(3):
+        row = {k: float(v[i]) for k, v in preds.items() if not np.isnan(v[i])}
+        expected = weighted_ensemble(row)
+        assert (decision[i], confidence[i]) == pytest.approx(expected)
+
+def test_cache_key_and_eviction():
+    from cache import PredictionCache
+
+    versions = {"linear": "a", "random_forest": "b"}
+    key = PredictionCache.key(application_approved, versions)
+    # Int and float spellings of the same value share a key; versions do not
+    assert key == PredictionCache.key({k: float(v) for k, v in application_approved.items()}, versions)
+    assert key != PredictionCache.key(application_approved, {**versions, "random_forest": "c"})
+
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    for i in range(3):
+        cache.put(str(i), {"i": i})
+    assert cache.get("0") is None
+    assert cache.get("2") == {"i": 2}
+    assert cache.stats()["evictions"] == 1
+
+    expired = PredictionCache(max_entries=2, ttl_seconds=0)
+    expired.put("k", {"v": 1})
+    assert expired.get("k") is None
+    assert expired.stats()["expirations"] == 1
+
+def test_liveness_and_readiness(client):
+    assert client.get("/health/live").json() == {"status": "alive"}
+
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    states = ready.json()["models"]
+    assert {s["status"] for s in states.values()} == {"ready"}
+    assert all(s["load_seconds"] is not None for s in states.values())
+
+def test_registry_can_serve_on_first_model():
+    import asyncio
+    from app import MODEL_MANIFEST_PATH, MODEL_PATHS
+    from registry import ModelRegistry
+
+    async def run():
+        loaded, versions = {}, {}
+        registry = ModelRegistry(loaded, versions, "sklearn", MODEL_MANIFEST_PATH, MODEL_PATHS)
+        await registry.start(wait_for_all=False)
+        early = set(loaded)
+        await registry.close()
+        return early, set(loaded), set(versions)
+
+    early, final, versions = asyncio.run(run())
+    assert early
+    assert final == versions == set(MODEL_PATHS)
+
+COLD_START = """
+import asyncio, json
+from app import MODEL_MANIFEST_PATH, MODEL_PATHS
+from registry import ModelRegistry
+
+loaded, versions = {}, {}
+registry = ModelRegistry(loaded, versions, "sklearn", MODEL_MANIFEST_PATH, MODEL_PATHS)
+asyncio.run(registry.start())
+print(json.dumps({"loaded": sorted(loaded), "errors": [s.get("error") for s in registry.states.values()]}))
+"""
+
+def test_cold_start_loads_every_model():
+    import json
+    import subprocess
+    import sys
+    from pathlib import Path
+    from app import MODEL_PATHS
+
+    # A fresh interpreter has not imported sklearn yet, so the loader threads import it together
+    for _ in range(3):
+        run = subprocess.run([sys.executable, "-c", COLD_START], cwd=Path(__file__).resolve().parent,
+                             capture_output=True, text=True, timeout=120, check=True)
+        report = json.loads(run.stdout.strip().splitlines()[-1])
+        assert report["loaded"] == sorted(MODEL_PATHS), report["errors"]
+
+def test_hot_reload_swaps_versions(client, tmp_path, monkeypatch):
+    import json
+    from app import MODEL_DIR, registry
+
+    manifest = {"models": {
+        name: {"active": "v1", "versions": {"v1": {"path": str(MODEL_DIR / f"{file}.pkl")}}}
+        for name, file in [("linear", "linear_model"), ("decision_tree", "decision_tree"),
+                           ("random_forest", "random_forest")]
+    }}
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    monkeypatch.setattr(registry, "manifest_path", manifest_path)
+
+    before = client.post("/predict", data=application_approved).json()
+    assert before["model_versions"] == {"linear": "v1", "decision_tree": "v1", "random_forest": "v1"}
+
+    v2 = shutil.copy(MODEL_DIR / "decision_tree.pkl", tmp_path / "decision_tree-v2.pkl")
+    manifest["models"]["decision_tree"]["versions"]["v2"] = {"path": str(v2)}
+    manifest["models"]["decision_tree"]["active"] = "v2"
+    manifest_path.write_text(json.dumps(manifest))
+
+    reload = client.post("/admin/models/reload").json()
+    assert reload["results"]["decision_tree"] == {"status": "swapped", "version": "v2", "previous": "v1"}
+    assert reload["results"]["linear"]["status"] == "unchanged"
+
+    listing = client.get("/admin/models").json()
+    assert listing["active"]["decision_tree"] == "v2"
+    assert listing["available"]["decision_tree"] == ["v1", "v2"]
+
+    after = client.post("/predict", data=application_approved).json()
+    assert after["model_versions"]["decision_tree"] == "v2"
+    single = client.post("/predict/individual/decision_tree", data=application_approved).json()
+    assert single["model_version"] == "v2"
+
+    # A broken version never replaces the live one
+    manifest["models"]["random_forest"]["versions"]["v9"] = {"path": str(tmp_path / "missing.pkl")}
+    manifest["models"]["random_forest"]["active"] = "v9"
+    manifest_path.write_text(json.dumps(manifest))
+    failed = client.post("/admin/models/reload", json={"models": ["random_forest"]}).json()
+    assert failed["results"]["random_forest"]["status"] == "failed"
+    assert failed["active"]["random_forest"] == "v1"
+
+    assert client.post("/admin/models/reload", json={"models": ["nope"]}).status_code == 404
+
+def test_workers_reload_themselves_when_the_manifest_changes(tmp_path, monkeypatch):
+    import json
+    import functools
+    import time
+    import app as app_module
+    import registry as registry_module
+    from app import MODEL_DIR, registry
+    from inference import CompiledForest, artifact_path, store_path
+
+    manifest = {"models": {
+        name: {"active": "v1", "versions": {"v1": {"path": str(MODEL_DIR / f"{file}.pkl")}}}
+        for name, file in [("linear", "linear_model"), ("decision_tree", "decision_tree"),
+                           ("random_forest", "random_forest")]
+    }}
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    monkeypatch.setattr(registry, "manifest_path", manifest_path)
+    monkeypatch.setattr(app_module, "MODEL_WATCH_SECONDS", 0.05)
+    monkeypatch.setattr(app_module, "SERVE_WORKERS", 2)
+    # As under serve.py: the version activated later is exported and mapped, not unpickled
+    store = tmp_path / "store"
+    monkeypatch.setattr(app_module, "MODEL_STORE_DIR", str(store))
+    monkeypatch.setattr(registry_module, "artifact_path", functools.partial(artifact_path, store_dir=str(store)))
+
+    with TestClient(app) as client:
+        # Only one worker would see the admin call, so it is refused
+        refused = client.post("/admin/models/reload")
+        assert refused.status_code == 409
+        assert "manifest.json" in refused.json()["detail"]
+
+        v2 = shutil.copy(MODEL_DIR / "decision_tree.pkl", tmp_path / "decision_tree-v2.pkl")
+        manifest["models"]["decision_tree"]["versions"]["v2"] = {"path": str(v2)}
+        manifest["models"]["decision_tree"]["active"] = "v2"
+        manifest_path.write_text(json.dumps(manifest))
+        deadline = time.monotonic() + 5
+        while client.get("/admin/models").json()["active"]["decision_tree"] != "v2":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        single = client.post("/predict/individual/decision_tree", data=application_approved).json()
+        assert single["model_version"] == "v2"
+
+        exported = store_path("decision_tree", v2, store)
+        assert (exported / "header.json").exists()
+        assert registry.artifact_paths()["decision_tree"] == exported
+        assert isinstance(registry.models["decision_tree"], CompiledForest)
@@ -0,0 +1,176 @@
+"""
+Tests for the batched audit log and its backends
+"""
+
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from audit import AuditOverflow, AuditSink, JsonlBackend, SqliteBackend
+from test_app import application_approved, application_rejected
+
+def read_jsonl(directory):
+    return [json.loads(line) for path in sorted(directory.glob("*.jsonl")) for line in path.read_text().splitlines()]
+
+async def _jsonl_run(directory):
+    sink = AuditSink(JsonlBackend(directory, rotate_bytes=50), batch_size=2, flush_interval_ms=60_000)
+    await sink.start()
+    for i in range(5):
+        sink.record({"route": "/predict", "i": i})
+    # Two full batches are written by the flusher, the odd record waits for close()
+    await asyncio.sleep(0.05)
+    written_before_close = sink.written
+    await sink.close()
+    return sink, written_before_close
+
+def test_jsonl_backend_batches_rotates_and_flushes_on_close(tmp_path):
+    sink, written_before_close = asyncio.run(_jsonl_run(tmp_path))
+    assert written_before_close == 4
+    assert sink.written == 5
+    assert [r["i"] for r in read_jsonl(tmp_path)] == [0, 1, 2, 3, 4]
+    assert len(list(tmp_path.glob("*.jsonl"))) > 1
+
+async def _sqlite_run(path):
+    sink = AuditSink(SqliteBackend(path), batch_size=100, flush_interval_ms=10)
+    await sink.start()
+    sink.record_many([{"ts": 1.0, "route": "/predict/batch", "decision": i % 2, "score": 0.5, "confidence": 90.0}
+                      for i in range(3)])
+    await asyncio.sleep(0.1)
+    buffered = sink.stats()["buffered"]
+    await sink.close()
+    return buffered
+
+def test_sqlite_backend_writes_on_interval(tmp_path):
+    path = tmp_path / "audit.db"
+    assert asyncio.run(_sqlite_run(path)) == 0
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT route, decision, record FROM audit ORDER BY id").fetchall()
+    assert [r[1] for r in rows] == [0, 1, 0]
+    assert json.loads(rows[2][2])["route"] == "/predict/batch"
+
+@pytest.mark.parametrize("policy, kept", [("drop_oldest", [1, 2]), ("drop_newest", [0, 1])])
+def test_full_buffer_drops_by_policy(tmp_path, policy, kept):
+    sink = AuditSink(JsonlBackend(tmp_path), buffer_size=2, overflow=policy)
+    for i in range(3):
+        sink.record({"i": i})
+    assert [r["i"] for r in sink._buffer] == kept
+    assert sink.dropped == 1
+
+def test_full_buffer_rejects_when_configured(tmp_path):
+    sink = AuditSink(JsonlBackend(tmp_path), buffer_size=2, overflow="reject")
+    sink.record({"i": 0})
+    with pytest.raises(AuditOverflow):
+        sink.record_many([{"i": 1}, {"i": 2}])
+    assert len(sink._buffer) == 1
+    assert sink.rejected == 2
+
+class FlakyBackend:
+    name = "flaky"
+
+    def __init__(self):
+        self.calls = 0
+        self.records = []
+
+    async def open(self):
+        pass
+
+    async def write(self, records):
+        self.calls += 1
+        if self.calls == 1:
+            raise OSError("disk unavailable")
+        self.records.extend(records)
+
+    async def close(self):
+        pass
+
+def test_failed_batch_is_kept_and_retried():
+    async def run():
+        backend = FlakyBackend()
+        sink = AuditSink(backend, batch_size=10, flush_interval_ms=60_000)
+        sink.record_many([{"i": i} for i in range(3)])
+        assert not await sink.flush_batch()
+        assert sink.stats()["buffered"] == 3
+        assert await sink.flush_batch()
+        return backend, sink
+
+    backend, sink = asyncio.run(run())
+    assert [r["i"] for r in backend.records] == [0, 1, 2]
+    assert sink.failed_writes == 1
+    assert sink.last_error == "disk unavailable"
+
+class SlowBackend:
+    name = "slow"
+
+    def __init__(self):
+        self.records = []
+        self.writing = False
+        self.closed_during_write = False
+
+    async def open(self):
+        pass
+
+    async def write(self, records):
+        self.writing = True
+        await asyncio.sleep(0.05)
+        self.records.extend(records)
+        self.writing = False
+
+    async def close(self):
+        self.closed_during_write = self.writing
+
+def test_close_waits_for_the_write_in_progress():
+    async def run():
+        backend = SlowBackend()
+        sink = AuditSink(backend, batch_size=2, flush_interval_ms=60_000)
+        await sink.start()
+        sink.record_many([{"i": i} for i in range(5)])
+        await asyncio.sleep(0.01)
+        # The flusher is mid-write on the first batch when close() is called
+        assert backend.writing
+        await sink.close()
+        return backend, sink
+
+    backend, sink = asyncio.run(run())
+    assert [r["i"] for r in backend.records] == [0, 1, 2, 3, 4]
+    assert sink.written == 5
+    assert not backend.closed_during_write
+
+def test_predictions_are_audited(monkeypatch, tmp_path):
+    from app import audit, prediction_cache
+
+    monkeypatch.setattr(audit, "backend", JsonlBackend(tmp_path))
+    with TestClient(app) as client:
+        prediction_cache.clear()
+        first = client.post("/predict", json=application_approved).json()
+        assert client.post("/predict", json=application_approved).status_code == 200
+        assert client.post("/predict/batch", json=[application_approved, application_rejected]).status_code == 200
+        assert client.post("/predict/individual/linear", json=application_approved).status_code == 200
+        assert client.get("/stats").json()["audit"]["backend"] == "jsonl"
+
+    records = read_jsonl(tmp_path)
+    assert [r["route"] for r in records] == ["/predict", "/predict", "/predict/batch", "/predict/batch",
+                                             "/predict/individual/{model_name}"]
+    assert [r["cached"] for r in records[:2]] == [False, True]
+    assert records[0]["inputs"]["cibil_score"] == application_approved["cibil_score"]
+    assert records[0]["predictions"] == first["predictions"]
+    assert records[0]["model_versions"] == first["model_versions"]
+    assert records[0]["decision"] == first["loan_status"]
+    assert records[0]["decision"] == int(records[0]["score"] >= 0.5)
+
+def test_overflow_reject_returns_503(monkeypatch, tmp_path):
+    from app import audit, prediction_cache
+
+    monkeypatch.setattr(audit, "backend", JsonlBackend(tmp_path))
+    with TestClient(app) as client:
+        prediction_cache.clear()
+        monkeypatch.setattr(audit, "overflow", "reject")
+        monkeypatch.setattr(audit, "buffer_size", 0)
+        response = client.post("/predict", json=application_approved)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert client.post("/predict/individual/linear", json=application_approved).status_code == 503
+        assert client.post("/predict/batch", json=[application_approved]).status_code == 503
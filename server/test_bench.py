@@ -0,0 +1,34 @@
+"""
+Smoke tests for the in-process benchmark suite
+"""
+
+import json
+
+from bench import compare, main
+
+def result(p50):
+    return {"p50_ms": p50, "p99_ms": p50 * 2}
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"results": {"slow": result(10.0), "noise": result(0.01), "fine": result(5.0), "gone": result(1.0)}}
+    current = {"slow": result(14.0), "noise": result(0.05), "fine": result(5.5), "new": result(1.0)}
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+
+def test_run_and_compare_against_saved_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--sizes", "1", "--only", "predict:", "route:/predict@", "--min-seconds", "0"]
+    assert main(args + ["--save-baseline", str(baseline)]) == 0
+
+    saved = json.loads(baseline.read_text())
+    assert {"predict:random_forest@1", "route:/predict@1"} <= set(saved["results"])
+    for case in saved["results"].values():
+        assert case["p50_ms"] <= case["p99_ms"]
+        assert case["rows_per_s"] > 0
+
+    # An impossibly fast baseline must fail the gate
+    for case in saved["results"].values():
+        case["p50_ms"] = 1e-6
+    baseline.write_text(json.dumps(saved))
+    assert main(args + ["--baseline", str(baseline)]) == 1
@@ -0,0 +1,31 @@
+"""
+Tests for the offline cascade evaluation
+"""
+
+import numpy as np
+import pytest
+
+from cascade_eval import evaluate
+
+def test_evaluate_counts_exits_and_disagreements():
+    preds = {
+        # Row 0: confident approve; row 1: confident reject; row 2: borderline, forest decides
+        # Row 3: borderline and the forest disagrees with the first stage
+        "linear": np.array([1.0, 0.0, 0.0, 0.6]),
+        "decision_tree": np.array([1.0, 0.0, 1.0, 0.0]),
+        "random_forest": np.array([1.0, 0.0, 1.0, 1.0]),
+    }
+    labels = np.array([1, 0, 1, 1])
+    latency = {"linear": 0.1, "decision_tree": 0.1, "random_forest": 1.0}
+
+    tight, loose = evaluate(preds, labels, [0.3, 0.0], latency)
+    assert tight["early_exit_rate"] == 0.5
+    assert tight["disagreement_rate"] == 0.0
+    assert tight["accuracy"] == tight["full_accuracy"] == 1.0
+    assert tight["expected_model_ms"] == pytest.approx(0.2 + 0.5 * 1.0)
+
+    # A zero margin never calls the forest, so row 3 follows the first stage
+    assert loose["early_exit_rate"] == 1.0
+    assert loose["disagreement_rate"] == 0.25
+    assert loose["accuracy"] == 0.75
+    assert loose["speedup"] == pytest.approx(1.2 / 0.2)
@@ -0,0 +1,96 @@
+"""
+Tests for background document verification
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from documents import DocumentFormParser, cross_check, extract_text
+from test_app import application_approved
+
+def statement(income, loan):
+    return f"Annual income: {income:,.0f}\nSanctioned loan: Rs. {loan:,.2f}\n"
+
+def pdf_with_text(text):
+    # Uncompressed content stream, readable without pypdf
+    return b"%PDF-1.4\n1 0 obj << /Length 44 >> stream\nBT /F1 12 Tf (" + text.encode() + b") Tj ET\nendstream endobj\n%%EOF"
+
+@pytest.fixture
+def client():
+    with TestClient(app) as c:
+        yield c
+
+def test_extract_and_cross_check():
+    text = extract_text(pdf_with_text("Income 9,600,000 Loan 2,990,000"), "s.pdf", "application/pdf")
+    assert "9,600,000" in text
+    assert extract_text(b"\x89PNG...", "scan.png", "image/png") == ""
+
+    checks = cross_check(text, {"income_annum": 9_600_000, "loan_amount": 2_990_000, "cibil_score": 778})
+    assert checks == {"income_annum": True, "loan_amount": True, "cibil_score": False}
+    # Rounded statements still match within 0.5%
+    assert cross_check("income 9.62 crore 96,20,000", {"income_annum": 9_600_000})["income_annum"]
+
+def test_document_job_is_polled_to_completion(client):
+    income, loan = application_approved["income_annum"], application_approved["loan_amount"]
+    uploads = {
+        "statement.txt": (statement(income, loan).encode(), "text/plain", "verified"),
+        "statement.pdf": (pdf_with_text(f"Income {income} Loan {loan}"), "application/pdf", "verified"),
+        "other.txt": (statement(1, 2).encode(), "text/plain", "mismatch"),
+        "scan.png": (b"\x89PNG\r\n", "image/png", "unreadable"),
+    }
+    for name, (content, content_type, expected) in uploads.items():
+        response = client.post("/predict", data=application_approved, files={"document": (name, content, content_type)})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["verification_status"] == "Document verification pending"
+
+        job = client.get(body["document_job"]["status_url"], params={"wait": 5}).json()
+        assert job["status"] == "done", job
+        assert job["size_bytes"] == len(content)
+        assert job["result"]["verification"] == expected
+        assert job["result"]["confidence_adjustment"] == (2.0 if expected == "verified" else 0.0)
+
+    assert client.get("/documents/unknown").status_code == 404
+
+def test_document_events_stream_the_result(client):
+    content = statement(application_approved["income_annum"], application_approved["loan_amount"]).encode()
+    body = client.post("/predict", data=application_approved,
+                       files={"document": ("statement.txt", content, "text/plain")}).json()
+
+    with client.stream("GET", body["document_job"]["events_url"]) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.read().decode().split("\n\n") if block.startswith("event:")]
+    assert events[0].startswith("event: status")
+    name, data = events[-1].split("\n", 1)
+    assert name == "event: result"
+    assert json.loads(data.removeprefix("data: "))["result"]["verification"] == "verified"
+
+def test_oversized_and_overflowing_uploads_are_refused(client, monkeypatch):
+    from app import documents
+
+    monkeypatch.setattr(documents, "max_bytes", 1024)
+    response = client.post("/predict", data=application_approved,
+                           files={"document": ("big.txt", b"x" * 4096, "text/plain")})
+    assert response.status_code == 413
+
+    # A declared length far over the limit is refused before the form is parsed
+    parse = DocumentFormParser.parse
+
+    async def unread(self):
+        raise AssertionError("body was parsed")
+
+    monkeypatch.setattr(DocumentFormParser, "parse", unread)
+    response = client.post("/predict", data=application_approved,
+                           files={"document": ("huge.txt", b"x" * 200_000, "text/plain")})
+    assert response.status_code == 413
+    monkeypatch.setattr(DocumentFormParser, "parse", parse)
+
+    monkeypatch.setattr(documents, "max_pending", 0)
+    response = client.post("/predict", data=application_approved,
+                           files={"document": ("a.txt", b"x", "text/plain")})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert client.get("/stats").json()["documents"]["rejected"] == 3
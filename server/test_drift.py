@@ -0,0 +1,107 @@
+"""
+Tests for the streaming feature-drift monitor
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from drift import DRIFT_REFERENCE_PATH, DriftMonitor
+from features import FEATURE_COLUMNS
+from test_app import application_approved
+
+DATA_PATH = Path(__file__).resolve().parent / "dataset" / "prepro.csv"
+
+@pytest.fixture(scope="module")
+def features():
+    return pd.read_csv(DATA_PATH)[list(FEATURE_COLUMNS)].to_numpy(dtype=np.float64)
+
+def test_single_rows_and_batches_count_the_same(features):
+    one_by_one, batched = DriftMonitor.load(), DriftMonitor.load()
+    for row in features[:300]:
+        one_by_one.observe(row[None, :])
+    batched.observe(features[:300])
+    assert np.array_equal(one_by_one.counts, batched.counts)
+    assert one_by_one.rows == batched.rows == 300
+    assert one_by_one.counts.size == len(FEATURE_COLUMNS) * one_by_one.n_bins
+
+def test_training_like_traffic_is_stable_and_shifts_alert(features, monkeypatch):
+    monitor = DriftMonitor.load()
+    monitor.observe(features)
+    report = monitor.report()
+    assert report["status"] == "ok"
+    assert all(s["psi"] < 0.01 and s["ks"] < 0.05 for s in report["features"].values())
+
+    monitor.reset()
+    shifted = features.copy()
+    shifted[:, FEATURE_COLUMNS.index("cibil_score")] -= 150
+    monitor.observe(shifted)
+    report = monitor.report()
+    assert report["status"] == "alert"
+    assert report["features"]["cibil_score"]["status"] == "alert"
+    assert report["features"]["income_annum"]["status"] == "ok"
+
+    monitor.reset()
+    monitor.observe(shifted[:10])
+    assert monitor.report()["status"] == "insufficient_data"
+
+def test_reference_without_a_feature_is_refused():
+    with pytest.raises(RuntimeError):
+        DriftMonitor({"rows": 1, "features": {"income_annum": {"edges": [1.0], "counts": [0, 1]}}})
+
+def test_drift_endpoint_counts_scored_rows():
+    from app import drift_monitor
+
+    assert DRIFT_REFERENCE_PATH.exists()
+    with TestClient(app) as client:
+        assert client.post("/admin/drift/reset").status_code == 200
+        assert client.post("/predict/batch", json=[application_approved] * 3).status_code == 200
+        assert client.post("/predict/individual/linear", json=application_approved).status_code == 200
+
+        report = client.get("/drift").json()
+        assert report["rows"] == drift_monitor.rows == 4
+        assert set(report["features"]) == set(FEATURE_COLUMNS)
+        assert report["status"] == "insufficient_data"
+        assert 'loan_feature_drift_psi{feature="cibil_score"}' in client.get("/metrics").text
+
+def test_activating_a_version_switches_the_reference(tmp_path, monkeypatch):
+    import json
+    import shutil
+    import app as app_module
+    from app import MODEL_DIR, registry
+
+    reference_path = tmp_path / "drift_reference.json"
+    shutil.copy(DRIFT_REFERENCE_PATH, reference_path)
+    monkeypatch.setattr(app_module, "drift_monitor", DriftMonitor.load(reference_path))
+    manifest = {"models": {
+        name: {"active": "v1", "versions": {"v1": {"path": str(MODEL_DIR / f"{file}.pkl")}}}
+        for name, file in [("linear", "linear_model"), ("decision_tree", "decision_tree"),
+                           ("random_forest", "random_forest")]
+    }}
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest))
+    monkeypatch.setattr(registry, "manifest_path", manifest_path)
+
+    with TestClient(app) as client:
+        assert client.post("/predict/batch", json=[application_approved] * 2).status_code == 200
+        before = client.get("/drift").json()
+        assert before["rows"] == 2
+
+        # What pipeline.py --version v2 --activate leaves behind: a new profile and manifest entry
+        reference = json.loads(reference_path.read_text())
+        reference["rows"] = 1234
+        reference_path.write_text(json.dumps(reference))
+        shutil.copy(MODEL_DIR / "decision_tree.pkl", tmp_path / "decision_tree-v2.pkl")
+        manifest["models"]["decision_tree"]["versions"]["v2"] = {"path": str(tmp_path / "decision_tree-v2.pkl")}
+        manifest["models"]["decision_tree"]["active"] = "v2"
+        manifest_path.write_text(json.dumps(manifest))
+
+        assert client.post("/admin/models/reload").json()["results"]["decision_tree"]["status"] == "swapped"
+        after = client.get("/drift").json()
+        assert after["reference_rows"] == 1234 != before["reference_rows"]
+        assert after["rows"] == 0
+        assert 'loan_feature_drift_rows 0' in client.get("/metrics").text
@@ -0,0 +1,87 @@
+"""
+Parity tests for the NumPy feature engine
+The array path must match the original per-request DataFrame path bit for bit
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import LoanApplication, preprocess_input
+from features import FEATURE_COLUMNS, RAW_COLUMNS, build_features, build_features_from_raw, check_feature_order
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_PATH = BASE_DIR / "dataset" / "prepro.csv"
+MODEL_DIR = BASE_DIR / "model"
+
+def reference_frame(data: LoanApplication) -> pd.DataFrame:
+    """The original DataFrame-based preprocess_input"""
+    income = data.income_annum if data.income_annum > 0 else 1.0
+    loan = data.loan_amount if data.loan_amount > 0 else 0.0
+    total_assets = (
+        data.residential_assets_value
+        + data.commercial_assets_value
+        + data.luxury_assets_value
+        + data.bank_asset_value
+    )
+    return pd.DataFrame([{
+        "income_annum": data.income_annum,
+        "loan_amount": data.loan_amount,
+        "loan_term": data.loan_term,
+        "cibil_score": data.cibil_score,
+        "residential_assets_value": data.residential_assets_value,
+        "commercial_assets_value": data.commercial_assets_value,
+        "luxury_assets_value": data.luxury_assets_value,
+        "bank_asset_value": data.bank_asset_value,
+        "dti_ratio": loan / income,
+        "total_assets": total_assets,
+        "asset_coverage": total_assets / loan if loan > 0 else 0.0,
+        "affordability_index": income / (loan / data.loan_term) if data.loan_term > 0 and loan > 0 else 0.0,
+    }])
+
+@pytest.fixture(scope="module")
+def applications():
+    data = pd.read_csv(DATA_PATH, nrows=500)
+    # A few training rows carry negative asset values the API schema rejects
+    data = data[(data[list(RAW_COLUMNS)] >= 0).all(axis=1)]
+    return [LoanApplication(**row) for row in data[list(RAW_COLUMNS)].to_dict(orient="records")]
+
+def test_features_bit_identical(applications):
+    X = build_features(applications)
+    assert X.dtype == np.float64
+    assert X.shape == (len(applications), len(FEATURE_COLUMNS))
+
+    reference = pd.concat([reference_frame(a) for a in applications], ignore_index=True)
+    assert np.array_equal(X, reference.to_numpy(dtype=np.float64))
+
+    # Single rows go through the same code path
+    assert np.array_equal(preprocess_input(applications[0]), X[:1])
+    assert np.array_equal(build_features_from_raw(X[:, :8]), X)
+
+@pytest.mark.parametrize("name", ["linear_model", "decision_tree", "random_forest"])
+def test_predictions_bit_identical(applications, name):
+    model = joblib.load(MODEL_DIR / f"{name}.pkl")
+    check_feature_order(model, name)
+
+    # Single-row requests are the production path and must match exactly
+    single = [model.predict(reference_frame(a))[0] for a in applications[:25]]
+    assert [model.predict(preprocess_input(a))[0] for a in applications[:25]] == single
+
+    X = build_features(applications)
+    reference = pd.concat([reference_frame(a) for a in applications[:50]], ignore_index=True)
+    batch = model.predict(X[:50])
+    if name == "linear_model":
+        # Multi-row matmul may sum in a different order inside BLAS
+        assert np.allclose(batch, model.predict(reference), rtol=0, atol=1e-12)
+    else:
+        assert np.array_equal(batch, model.predict(reference))
+
+def test_check_feature_order_rejects_mismatch():
+    class Stub:
+        feature_names_in_ = np.array(list(reversed(FEATURE_COLUMNS)))
+
+    with pytest.raises(RuntimeError):
+        check_feature_order(Stub(), "stub")
@@ -0,0 +1,111 @@
+"""
+Tests for incremental retraining (training/incremental.py)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import joblib as jb
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+SERVER_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SERVER_DIR / "training"))
+
+import incremental  # noqa: E402
+import pipeline  # noqa: E402
+from preprocessing import SCHEMA, append_rows, build_cache, load_cache  # noqa: E402
+from training_samples import write_raw_sample  # noqa: E402
+
+@pytest.fixture
+def store(tmp_path):
+    cache = tmp_path / "cache"
+    build_cache(write_raw_sample(tmp_path / "raw.csv", 400), cache)
+    return cache
+
+def test_append_rows_extends_every_column(store, tmp_path):
+    before = load_cache(store, mmap=False)
+    (store / incremental.STATS_FILE).write_bytes(b"kept")
+    labels = incremental.load_labels(write_raw_sample(tmp_path / "labels.csv", 30, skip=400))
+
+    assert append_rows(labels, store) == 430
+    after = load_cache(store, mmap=False)
+    meta = json.loads((store / "meta.json").read_text())
+    assert (meta["rows"], meta["base_rows"], meta["appended_rows"]) == (430, 400, 30)
+    assert list(after.dtypes.astype(str)) == list(SCHEMA.values())
+    pd.testing.assert_frame_equal(after.iloc[:400], before)
+    pd.testing.assert_frame_equal(after.iloc[400:].reset_index(drop=True), labels.reset_index(drop=True))
+    assert (store / incremental.STATS_FILE).read_bytes() == b"kept"
+
+    # A second append keeps counting from the original build
+    append_rows(labels.iloc[:5], store)
+    meta = json.loads((store / "meta.json").read_text())
+    assert (meta["rows"], meta["base_rows"], meta["appended_rows"]) == (435, 400, 35)
+
+def test_sufficient_stats_solve_matches_a_full_fit(store, monkeypatch):
+    monkeypatch.setattr(incremental, "STATS_CHUNK_ROWS", 64)
+    data = load_cache(store, mmap=False)
+    X, y = data[incremental.FEATURES].to_numpy(dtype=np.float64), data[pipeline.TARGET].to_numpy()
+    keep = ~pipeline.holdout_mask(y, len(y))
+
+    # Two updates (as two incremental runs would make) give the same sums as one
+    stats = incremental.empty_stats(X[:50].mean(axis=0))
+    incremental.update_stats(stats, X, y, keep, 250)
+    incremental.update_stats(stats, X, y, keep, len(y))
+    assert stats["rows"] == len(y) and stats["n"] == keep.sum()
+
+    model = incremental.solve_linear(stats)
+    reference = LinearRegression().fit(data[incremental.FEATURES][keep], y[keep])
+    test = data[incremental.FEATURES][~keep]
+    np.testing.assert_allclose(model.predict(test), reference.predict(test), atol=1e-6)
+
+def test_holdout_mask_is_pipelines_test_split(store):
+    X_train, X_test, _, _ = pipeline.load_dataset(store)
+    y = load_cache(store)[pipeline.TARGET].to_numpy()
+    mask = pipeline.holdout_mask(y, len(y))
+    assert np.array_equal(np.flatnonzero(mask), X_test.index.to_numpy())
+    assert not set(X_train.index) & set(X_test.index)
+    # Appending rows never moves a base row across the split
+    grown = np.concatenate([y, y[:100]])
+    assert np.array_equal(pipeline.holdout_mask(grown, len(y))[:len(y)], mask)
+
+@pytest.mark.parametrize("name, candidate, accepted", [
+    ("linear", {"rmse": 0.30}, True),
+    ("linear", {"rmse": 0.31}, False),
+    ("random_forest", {"accuracy": 0.95}, True),
+    ("random_forest", {"accuracy": 0.94}, False),
+])
+def test_gate_publishes_only_no_worse_candidates(name, candidate, accepted):
+    current = {"rmse": 0.30, "accuracy": 0.95}
+    assert incremental.passes_gate(name, candidate, current, 0.0) is accepted
+    assert incremental.passes_gate(name, candidate, current, 0.02)
+
+def test_gate_refuses_models_trained_on_another_split(store, tmp_path):
+    models = tmp_path / "models"
+    params = tmp_path / "params.json"
+    params.write_text(json.dumps({"random_forest": {"n_estimators": 10, "max_depth": 4}}))
+    pipeline.main(["--data", str(store), "--output", str(models), "--models", "linear", "random_forest",
+                   "--version", "v1", "--activate", "--params", str(params)])
+    # An artifact trained outside the pipeline split, like the shipped v1 models
+    untagged = models / "random_forest-v1.pkl"
+    forest = jb.load(untagged)
+    del forest.holdout_split_
+    jb.dump(forest, untagged)
+
+    labels = write_raw_sample(tmp_path / "labels.csv", 60, skip=400)
+    report = incremental.main(["--labels", str(labels), "--cache", str(store), "--output", str(models),
+                               "--version", "inc1", "--tolerance", "1.0", "--add-trees", "5"])
+    assert report["models"]["random_forest"] == {"base_version": "v1", "published": False,
+                                                 "skipped": "untagged_split"}
+    linear = report["models"]["linear"]
+    assert linear["published"] and linear["training_rows"] == 460 - report["holdout_rows"]
+
+    published = jb.load(models / "linear_model-inc1.pkl")
+    assert published.holdout_split_ == pipeline.split_tag(400)
+    manifest = json.loads((models / "manifest.json").read_text())
+    assert manifest["models"]["linear"]["active"] == "v1"
+    assert set(manifest["models"]["linear"]["versions"]) == {"v1", "inc1"}
+    assert "inc1" not in manifest["models"]["random_forest"]["versions"]
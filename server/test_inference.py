@@ -0,0 +1,100 @@
+"""
+Parity tests for the compiled flat-array inference engine
+CompiledForest must reproduce sklearn predict / predict_proba on prepro.csv
+"""
+
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS
+import inference
+from inference import (CompiledForest, artifact_path, compile_model, export_store, load_artifact, select_engine,
+                       store_path)
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_PATH = BASE_DIR / "dataset" / "prepro.csv"
+MODEL_DIR = BASE_DIR / "model"
+
+@pytest.fixture(scope="module")
+def X():
+    data = pd.read_csv(DATA_PATH)
+    return data[list(FEATURE_COLUMNS)].to_numpy(dtype=np.float64)
+
+@pytest.mark.parametrize("name", ["decision_tree", "random_forest"])
+def test_compiled_matches_sklearn(X, name):
+    model = joblib.load(MODEL_DIR / f"{name}.pkl")
+    # Single-threaded so sklearn sums trees in a fixed order
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    compiled = CompiledForest.from_sklearn(model)
+
+    assert np.array_equal(compiled.predict(X), model.predict(X))
+    assert np.array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+    # Single rows take the same path as the full matrix
+    for i in range(0, len(X), 997):
+        assert compiled.predict(X[i:i + 1])[0] == model.predict(X[i:i + 1])[0]
+
+def test_select_engine_only_compiles_trees():
+    loaded = {name: joblib.load(MODEL_DIR / f"{file}.pkl") for name, file in [
+        ("linear", "linear_model"),
+        ("decision_tree", "decision_tree"),
+        ("random_forest", "random_forest"),
+    ]}
+
+    assert select_engine(loaded, "sklearn") is loaded
+
+    compiled = select_engine(loaded, "compiled")
+    assert compiled["linear"] is loaded["linear"]
+    assert isinstance(compiled["decision_tree"], CompiledForest)
+    assert isinstance(compiled["random_forest"], CompiledForest)
+    assert compile_model(loaded["linear"]) is loaded["linear"]
+
+    with pytest.raises(RuntimeError):
+        select_engine(loaded, "onnx")
+
+def test_store_roundtrip_is_memory_mapped(X, tmp_path):
+    model = joblib.load(MODEL_DIR / "random_forest.pkl")
+    compiled = CompiledForest.from_sklearn(model)
+    pickle_path = MODEL_DIR / "random_forest.pkl"
+    exported = store_path("random_forest", pickle_path, tmp_path)
+    compiled.save(exported)
+
+    mapped = load_artifact(artifact_path("random_forest", pickle_path, str(tmp_path)))
+    assert isinstance(mapped.threshold, np.memmap)
+    assert not mapped.threshold.flags.writeable
+    # value is a view over the mapped file, not a private copy
+    assert np.shares_memory(mapped._value_by_class, mapped.value)
+    assert list(mapped.feature_names_in_) == list(FEATURE_COLUMNS)
+
+    assert np.array_equal(mapped.predict_proba(X), compiled.predict_proba(X))
+    assert artifact_path("random_forest", pickle_path, str(tmp_path)) == exported
+    assert artifact_path("linear", MODEL_DIR / "linear_model.pkl", str(tmp_path)) == MODEL_DIR / "linear_model.pkl"
+
+def test_workers_racing_on_a_new_version_export_it_once(tmp_path, monkeypatch):
+    import threading
+
+    calls = []
+    def slow_compile(model):
+        calls.append(model)
+        threading.Event().wait(0.2)
+        return compile_model(model)
+    monkeypatch.setattr(inference, "compile_model", slow_compile)
+
+    pickle_path = MODEL_DIR / "decision_tree.pkl"
+    wrote = []
+    workers = [threading.Thread(target=lambda: wrote.append(export_store("decision_tree", pickle_path, tmp_path)))
+               for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(wrote) == [False, False, True] and len(calls) == 1
+    exported = store_path("decision_tree", pickle_path, tmp_path)
+    assert artifact_path("decision_tree", pickle_path, str(tmp_path)) == exported
+    assert not exported.with_name(f"{exported.name}.tmp").exists()
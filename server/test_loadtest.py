@@ -0,0 +1,57 @@
+"""
+Tests for the load-generation harness helpers
+The traffic step runs in-process over the ASGI transport
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app import app
+from loadtest import DEFAULT_MIX, LatencyHistogram, Traffic, find_saturation, memory_growth, run_step
+
+def test_histogram_percentiles_bound_the_samples():
+    h = LatencyHistogram()
+    for ms in range(1, 1001):
+        h.record(float(ms))
+    # Bucket upper edges are within one bucket (~12%) of the exact value
+    assert 500 <= h.percentile(50) <= 500 * 1.13
+    assert 990 <= h.percentile(99) <= 990 * 1.13
+    assert h.percentile(100) >= 1000
+
+    other = LatencyHistogram()
+    other.record(5000.0)
+    h.merge(other)
+    assert h.count == 1001
+    assert h.max_ms == 5000.0
+
+def test_saturation_and_memory_growth():
+    def step(target, achieved, error_rate=0.0, p99=10.0):
+        return {"target_rps": target, "achieved_rps": achieved, "error_rate": error_rate,
+                "latency": {"p99_ms": p99}}
+
+    steps = [step(None, 300), step(50, 50), step(100, 99, p99=80), step(200, 150), step(400, 160)]
+    assert find_saturation(steps, slo_ms=None)["target_rps"] == 200
+    assert find_saturation(steps, slo_ms=50) == {"target_rps": 100, "achieved_rps": 99, "reasons": ["p99"]}
+    assert find_saturation(steps[:2], slo_ms=None) is None
+
+    # 1 MB per minute after warm-up -> 60 MB/h
+    samples = [[t * 60.0, 100.0 + t, 0.0] for t in range(20)]
+    assert memory_growth(samples) == pytest.approx(60.0)
+    assert memory_growth(samples[:2]) is None
+
+async def _step():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_step(client, Traffic(DEFAULT_MIX, doc_kb=4), rate=40, seconds=1.0,
+                                  concurrency=8, timeout=10, window_seconds=0.5)
+
+def test_open_loop_step_mixes_traffic():
+    summary = asyncio.run(_step()).summary()
+    assert summary["sent"] == summary["completed"] == 40
+    assert summary["errors"] == 0
+    assert summary["status"] == {"200": 40}
+    assert set(summary["by_kind"]) <= set(DEFAULT_MIX)
+    assert summary["windows"]
@@ -0,0 +1,64 @@
+"""
+Tests for request metrics, the /metrics endpoint and the sampling profiler
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app import app
+from metrics import Counter, Histogram, MetricsRegistry, sample_lines
+from profiler import SamplingProfiler, write_profile
+from test_app import application_approved
+
+def test_histogram_and_counter_rendering():
+    registry = MetricsRegistry()
+    h = registry.register(Histogram("t_seconds", "test", ("stage",), buckets=(0.01, 0.1)))
+    c = registry.register(Counter("t_total", "test", ("model",)))
+    h.observe(0.005, "a")
+    h.observe(0.05, "a")
+    h.observe(5.0, "a")
+    c.inc("rf", amount=3)
+    registry.collectors.append(lambda: sample_lines("t_entries", "test", 7))
+
+    text = registry.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert 't_seconds_bucket{stage="a",le="0.01"} 1' in text
+    assert 't_seconds_bucket{stage="a",le="0.1"} 2' in text
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 't_seconds_count{stage="a"} 3' in text
+    assert 't_total{model="rf"} 3.0' in text
+    assert "t_entries 7" in text
+    assert h.count("a") == 3
+
+def test_metrics_endpoint_exposes_stage_and_model_series():
+    with TestClient(app) as client:
+        assert client.post("/predict", data=application_approved).status_code == 200
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    for stage in ("admission_wait", "body_parse", "validation", "preprocess", "inference", "ensemble"):
+        assert f'loan_stage_duration_seconds_count{{route="/predict",stage="{stage}"}}' in text
+    for name in ("linear", "decision_tree", "random_forest"):
+        assert f'loan_model_predict_duration_seconds_count{{model="{name}"}}' in text
+    assert 'loan_http_request_duration_seconds_count{method="POST",route="/predict",status="200"}' in text
+    assert "loan_http_requests_in_flight" in text
+    assert "loan_cache_entries" in text
+
+def test_profiler_writes_folded_stacks(tmp_path):
+    profiler = SamplingProfiler(interval_ms=1)
+    session = profiler.begin()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    samples = profiler.end(session)
+    assert samples
+
+    path = write_profile(samples, "/predict/individual/{model_name}", 50.0, directory=tmp_path)
+    assert path.suffix == ".folded"
+    assert "predict_individual_model_name" in path.name
+    lines = path.read_text().splitlines()
+    assert any("test_profiler_writes_folded_stacks" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,64 @@
+"""
+Conformance tests for the compact .npz model format
+Exported models must predict exactly like the pickled originals
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from features import FEATURE_COLUMNS
+from inference import load_artifact
+from model_format import export_model, load_model
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_PATH = BASE_DIR / "dataset" / "prepro.csv"
+MODEL_DIR = BASE_DIR / "model"
+
+@pytest.fixture(scope="module")
+def X():
+    data = pd.read_csv(DATA_PATH)
+    return data[list(FEATURE_COLUMNS)].to_numpy(dtype=np.float64)
+
+@pytest.mark.parametrize("name", ["linear_model", "decision_tree", "random_forest"])
+def test_exported_predictions_identical(X, tmp_path, name):
+    original = joblib.load(MODEL_DIR / f"{name}.pkl")
+    if hasattr(original, "n_jobs"):
+        original.n_jobs = 1
+    path = export_model(original, tmp_path / name)
+
+    loaded = load_artifact(path)
+    assert list(loaded.feature_names_in_) == list(FEATURE_COLUMNS)
+
+    assert np.array_equal(loaded.predict(X), original.predict(X))
+    # Single rows are the serving path
+    for i in range(0, len(X), 401):
+        assert loaded.predict(X[i:i + 1])[0] == original.predict(X[i:i + 1])[0]
+    if hasattr(original, "predict_proba"):
+        assert np.array_equal(loaded.predict_proba(X), original.predict_proba(X))
+
+    assert path.stat().st_size < (MODEL_DIR / f"{name}.pkl").stat().st_size
+
+def test_loading_does_not_import_sklearn(tmp_path):
+    for name in ["linear_model", "random_forest"]:
+        export_model(joblib.load(MODEL_DIR / f"{name}.pkl"), tmp_path / name)
+
+    script = (
+        "import sys, numpy as np\n"
+        "from model_format import load_model\n"
+        f"for name in ['linear_model', 'random_forest']:\n"
+        f"    load_model(r'{tmp_path}/' + name + '.npz').predict(np.ones((2, 12)))\n"
+        "assert 'sklearn' not in sys.modules and 'joblib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, check=True)
+
+def test_rejects_foreign_archives(tmp_path):
+    path = tmp_path / "other.npz"
+    np.savez(path, __header__=np.frombuffer(b'{"format": "other"}', dtype=np.uint8))
+    with pytest.raises(ValueError):
+        load_model(path)
@@ -0,0 +1,86 @@
+"""
+End-to-end test of the training pipeline (training/pipeline.py) on a small fixture
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import joblib as jb
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "training"))
+
+import pipeline  # noqa: E402
+from preprocessing import build_cache  # noqa: E402
+from registry import read_manifest  # noqa: E402
+from training_samples import write_raw_sample  # noqa: E402
+
+SMALL_PARAMS = {"random_forest": {"n_estimators": 10, "max_depth": 4}}
+
+@pytest.fixture
+def stores(tmp_path):
+    """Two stores built from different raw rows"""
+    paths = []
+    for i in range(2):
+        cache = tmp_path / f"cache{i}"
+        build_cache(write_raw_sample(tmp_path / f"raw{i}.csv", 400, skip=400 * i), cache)
+        paths.append(cache)
+    return paths
+
+def train(data, output, params, *extra):
+    return pipeline.main(["--data", str(data), "--output", str(output), "--params", str(params), *extra])
+
+def test_versions_are_registered_and_only_active_ones_move_the_drift_reference(stores, tmp_path):
+    output = tmp_path / "model"
+    params = tmp_path / "params.json"
+    params.write_text(json.dumps(SMALL_PARAMS))
+
+    first = train(stores[0], output, params, "--version", "v1", "--activate")
+    assert (first["train_rows"], first["test_rows"]) == (320, 80)
+    assert first["split"] == pipeline.split_tag(400)
+    assert set(first["models"]) == set(pipeline.ARTIFACTS)
+    assert first["models"]["random_forest"]["params"]["n_estimators"] == 10
+    assert json.loads((output / "metrics.json").read_text())["version"] == "v1"
+
+    live = output / pipeline.DRIFT_REFERENCE
+    v1_reference = live.read_text()
+    assert (output / "drift_reference-v1.json").read_text() == v1_reference
+    assert json.loads(v1_reference)["rows"] == 320
+
+    # A candidate trained on other data leaves the served version and profile alone
+    train(stores[1], output, params, "--version", "v2")
+    assert (output / "drift_reference-v2.json").read_text() != v1_reference
+    assert live.read_text() == v1_reference
+    manifest = json.loads((output / "manifest.json").read_text())
+    for name, artifact in pipeline.ARTIFACTS.items():
+        assert manifest["models"][name]["active"] == "v1"
+        assert set(manifest["models"][name]["versions"]) == {"v1", "v2"}
+        assert (output / f"{Path(artifact).stem}-v2.pkl").exists()
+
+    # Activating it promotes its profile together with its models
+    train(stores[1], output, params, "--version", "v3", "--activate")
+    assert live.read_text() == (output / "drift_reference-v3.json").read_text()
+
+    active = read_manifest(output / "manifest.json", {})
+    X_test = pipeline.load_dataset(stores[1])[1]
+    for name, (version, path) in active.items():
+        assert version == "v3"
+        model = jb.load(path)
+        assert model.holdout_split_ == pipeline.split_tag(400)
+        assert len(model.predict(X_test)) == len(X_test)
+
+def test_unversioned_runs_replace_the_live_artifacts(stores, tmp_path):
+    output = tmp_path / "model"
+    params = tmp_path / "params.json"
+    params.write_text(json.dumps(SMALL_PARAMS))
+
+    report = train(stores[0], output, params, "--models", "linear", "decision_tree")
+    assert sorted(p.name for p in output.iterdir()) == [
+        "decision_tree.pkl", "drift_reference.json", "linear_model.pkl", "metrics.json"
+    ]
+    assert "r2" in report["models"]["linear"] and "accuracy" in report["models"]["decision_tree"]
+
+    only = pipeline.main(["--data", str(stores[1]), "--output", str(output), "--reference-only"])
+    assert only == {"drift_reference": [str(output / pipeline.DRIFT_REFERENCE)]}
+    assert json.loads((output / "metrics.json").read_text())["data"] == str(stores[0])
@@ -0,0 +1,87 @@
+"""
+Tests for the streaming preprocessing and its columnar cache (training/preprocessing.py)
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "training"))
+
+import preprocessing  # noqa: E402
+from preprocessing import SCHEMA, build_cache, is_fresh, load_cache, transform_chunk  # noqa: E402
+from training_samples import RAW_PATH, write_raw_sample  # noqa: E402
+
+def test_chunked_build_matches_a_single_pass(tmp_path):
+    raw = write_raw_sample(tmp_path / "raw.csv", 1000)
+    csv_path = tmp_path / "prepro.csv"
+    assert build_cache(raw, tmp_path / "chunked", chunk_rows=128, csv_path=csv_path) == 1000
+    build_cache(raw, tmp_path / "whole", chunk_rows=10_000)
+
+    chunked = load_cache(tmp_path / "chunked", mmap=False)
+    whole = transform_chunk(pd.read_csv(raw, skipinitialspace=True)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(chunked, whole)
+    pd.testing.assert_frame_equal(load_cache(tmp_path / "whole", mmap=False), whole)
+    assert dict(chunked.dtypes.astype(str)) == SCHEMA
+
+    # The CSV written alongside matches the committed prepro.csv layout
+    written = pd.read_csv(csv_path)
+    assert list(written.columns) == list(SCHEMA)
+    np.testing.assert_allclose(written.to_numpy(dtype=float), whole.to_numpy(dtype=float))
+
+def test_engineered_features_match_the_committed_dataset():
+    raw = transform_chunk(pd.read_csv(RAW_PATH, nrows=200, skipinitialspace=True))
+    committed = pd.read_csv(RAW_PATH.parent / "prepro.csv", nrows=200)
+    np.testing.assert_allclose(raw.to_numpy(dtype=float), committed[list(SCHEMA)].to_numpy(dtype=float))
+
+def test_cache_is_reused_until_the_input_changes(tmp_path, monkeypatch):
+    raw = write_raw_sample(tmp_path / "raw.csv", 50)
+    cache = tmp_path / "cache"
+    assert not is_fresh(raw, cache)
+    build_cache(raw, cache)
+    assert is_fresh(raw, cache)
+
+    # Touched but unchanged: the content hash keeps it fresh
+    stat = raw.stat()
+    os.utime(raw, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert is_fresh(raw, cache)
+
+    write_raw_sample(raw, 50, skip=50)
+    assert not is_fresh(raw, cache)
+    build_cache(raw, cache)
+    assert json.loads((cache / "meta.json").read_text())["rows"] == 50
+    assert not cache.with_name("cache.tmp").exists()
+
+    monkeypatch.setattr(preprocessing, "CACHE_SCHEMA", preprocessing.CACHE_SCHEMA + 1)
+    assert not is_fresh(raw, cache)
+
+@pytest.mark.parametrize("column, value, shown", [
+    ("income_annum", 3_000_000_000, "row 3 = 3000000000"),
+    ("cibil_score", np.nan, "row 3 = nan"),
+    ("loan_term", 12.5, "row 3 = 12.5"),
+])
+def test_values_the_dtypes_cannot_hold_are_refused(column, value, shown):
+    raw = pd.read_csv(RAW_PATH, nrows=10, skipinitialspace=True)
+    raw[column] = raw[column].astype(float)
+    raw.loc[3, column] = value
+    with pytest.raises(ValueError) as error:
+        transform_chunk(raw)
+    assert f"{column} ({SCHEMA[column]}" in str(error.value)
+    assert shown in str(error.value)
+
+def test_bad_rows_leave_the_previous_cache_intact(tmp_path):
+    raw = write_raw_sample(tmp_path / "raw.csv", 300)
+    cache = tmp_path / "cache"
+    build_cache(raw, cache)
+
+    broken = pd.read_csv(raw)
+    broken.loc[250, "income_annum"] = 3_000_000_000
+    broken.to_csv(raw, index=False)
+    with pytest.raises(ValueError, match="row 250"):
+        build_cache(raw, cache, chunk_rows=100)
+    assert len(load_cache(cache)) == 300
@@ -0,0 +1,97 @@
+"""
+Tests for the offline bulk scorer
+Scored rows must match /predict/batch, and a resumed run must produce the
+same file as an uninterrupted one
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+from features import RAW_COLUMNS
+from score import field_bounds, main, validate
+
+BASE_DIR = Path(__file__).resolve().parent
+RAW_PATH = BASE_DIR / "dataset" / "loan_approval_dataset.csv"
+
+@pytest.fixture(scope="module")
+def portfolio(tmp_path_factory):
+    raw = pd.read_csv(RAW_PATH, skipinitialspace=True).head(120)
+    raw.loc[3, "cibil_score"] = np.nan
+    raw.loc[7, "loan_term"] = 0
+    path = tmp_path_factory.mktemp("score") / "portfolio.csv"
+    raw.to_csv(path, index=False)
+    return path
+
+def test_validate_mirrors_request_model():
+    good = [9600000, 2990000, 12, 778, 2400000, 17600000, 22700000, 3800000]
+    rows = np.array([
+        good,
+        good[:3] + [250] + good[4:],       # cibil below 300
+        good[:4] + [-1] + good[5:],        # negative assets
+        good[:2] + [12.5] + good[3:],      # fractional loan term
+        good[:1] + [np.nan] + good[2:],    # missing loan amount
+    ], dtype=np.float64)
+    errors = validate(rows, field_bounds())
+    assert list(errors) == ["", "invalid cibil_score", "invalid residential_assets_value",
+                            "invalid loan_term", "invalid loan_amount"]
+
+def test_scores_match_batch_endpoint(portfolio, tmp_path):
+    output = tmp_path / "scored.csv"
+    main([str(portfolio), "-o", str(output), "--keep", "loan_id", "--chunk-rows", "50", "--workers", "1"])
+    scored = pd.read_csv(output, keep_default_na=False)
+    assert len(scored) == 120
+    rejected = scored.loc[scored["error"] != "", "loan_id"]
+    # The raw data also has a few negative asset values, which the API rejects too
+    assert {4, 8} <= set(rejected)
+
+    valid = scored[scored["error"] == ""]
+    raw = pd.read_csv(portfolio)
+    records = raw.loc[valid.index, list(RAW_COLUMNS)].to_dict(orient="records")
+    with TestClient(app) as client:
+        results = client.post("/predict/batch", json=records).json()["results"]
+
+    for (_, row), result in zip(valid.iterrows(), results):
+        assert row["loan_status"] == str(result["loan_status"])
+        assert float(row["confidence"]) == result["confidence"]
+        assert row["recommendation"] == result["recommendation"]
+        for name, value in result["predictions"].items():
+            assert float(row[f"pred_{name}"]) == pytest.approx(value, abs=1e-12)
+
+def test_resume_after_interruption(portfolio, tmp_path):
+    output = tmp_path / "scored.csv"
+    args = [str(portfolio), "-o", str(output), "--chunk-rows", "50", "--workers", "1"]
+    main(args)
+    complete = output.read_bytes()
+
+    # Pretend the run died after chunk 1 with a partial chunk 2 on disk
+    checkpoint = output.with_name(output.name + ".checkpoint.json")
+    state = json.loads(checkpoint.read_text())
+    lines = complete.splitlines(keepends=True)
+    state.update(chunks_done=1, rows_done=50, finished=False, output_bytes=sum(len(l) for l in lines[:51]))
+    checkpoint.write_text(json.dumps(state))
+    output.write_bytes(b"".join(lines[:70]))
+
+    main(args)
+    assert output.read_bytes() == complete
+
+def test_resume_skip_does_not_grow_with_rows_done(portfolio):
+    import tracemalloc
+    from score import iter_chunks
+
+    # Skip offsets far past the file: memory must not depend on how many rows are skipped
+    tracemalloc.start()
+    for skip in (60, 5_000_000):
+        tracemalloc.reset_peak()
+        chunks = list(iter_chunks(portfolio, 50, list(RAW_COLUMNS), skip_rows=skip))
+        assert sum(len(c) for c in chunks) == max(0, 120 - skip)
+        assert tracemalloc.get_traced_memory()[1] < 20 * 1024 * 1024
+    tracemalloc.stop()
+    first = next(iter_chunks(portfolio, 50, list(RAW_COLUMNS), skip_rows=60))
+    expected = pd.read_csv(portfolio, usecols=list(RAW_COLUMNS)).iloc[60:110].reset_index(drop=True)
+    pd.testing.assert_frame_equal(first.reset_index(drop=True), expected)
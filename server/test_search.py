@@ -0,0 +1,102 @@
+"""
+Tests for the hyperparameter search (training/search.py)
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "training"))
+
+import search  # noqa: E402
+from pipeline import build_model  # noqa: E402
+from preprocessing import build_cache  # noqa: E402
+from training_samples import write_raw_sample  # noqa: E402
+
+def test_trials_cover_the_whole_grid():
+    todo = search.trials(list(search.SEARCH_SPACE))
+    assert len(todo) == 5 * 3 + 4 * 2
+    assert len({(name, json.dumps(params, sort_keys=True)) for name, params in todo}) == len(todo)
+    for name, params in todo:
+        assert set(params) == set(search.SEARCH_SPACE[name])
+        build_model(name, **params)
+    assert search.FOREST_SIZES == sorted(search.FOREST_SIZES)
+
+def result(model, accuracy, single_ms, **params):
+    return {"model": model, "params": params, "cv_accuracy": accuracy, "cv_std": 0.0, "fit_seconds": 1.0,
+            "engine": "sklearn", "single_ms": single_ms, "batch_ms": 10 * single_ms}
+
+def test_winner_is_the_most_accurate_within_the_latency_budget(tmp_path):
+    results = [
+        result("random_forest", 0.97, 2.0, max_depth=14),
+        result("random_forest", 0.96, 0.5, max_depth=6),
+        result("random_forest", 0.96, 0.4, max_depth=10),
+        result("decision_tree", 0.95, 0.1, max_depth=4),
+        result("decision_tree", 0.98, 0.2, max_depth=8),
+    ]
+    ranked = search.rank(results, budget_ms=1.0)
+    assert [(r["model"], r["params"]["max_depth"]) for r in ranked] == [
+        ("decision_tree", 8), ("decision_tree", 4),
+        # Equal accuracy goes to the faster one; over-budget configurations come last
+        ("random_forest", 10), ("random_forest", 6), ("random_forest", 14),
+    ]
+    assert [r["within_budget"] for r in ranked] == [True, True, True, True, False]
+
+    search.write_leaderboard(ranked, tmp_path)
+    assert json.loads((tmp_path / "best.json").read_text()) == {
+        "decision_tree": {"max_depth": 8}, "random_forest": {"max_depth": 10}
+    }
+    assert json.loads((tmp_path / "leaderboard.json").read_text()) == ranked
+    with open(tmp_path / "leaderboard.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [json.loads(r["params"]) for r in rows] == [r["params"] for r in ranked]
+
+    # Without a budget the slow forest wins on accuracy
+    assert search.rank(results, budget_ms=None)[2]["params"] == {"max_depth": 14}
+
+@pytest.fixture
+def small_search(tmp_path, monkeypatch):
+    data = tmp_path / "cache"
+    build_cache(write_raw_sample(tmp_path / "raw.csv", 300), data)
+    monkeypatch.setattr(search, "SEARCH_SPACE", {
+        "decision_tree": {"max_depth": [2, 6]},
+        "random_forest": {"max_depth": [4]},
+    })
+    monkeypatch.setattr(search, "FOREST_SIZES", [3, 6])
+    monkeypatch.setattr(search, "LATENCY_REPEATS", 3)
+    monkeypatch.setattr(search, "BATCH_ROWS", 16)
+    return data
+
+def test_search_persists_folds_leaderboard_and_winners(small_search, tmp_path, monkeypatch):
+    output = tmp_path / "search"
+    argv = ["--data", str(small_search), "--output", str(output), "--folds", "3", "--workers", "1",
+            "--engine", "sklearn"]
+    results = search.main(argv)
+
+    # Every grid point, and every forest size of each forest configuration
+    assert sorted((r["model"], json.dumps(r["params"], sort_keys=True)) for r in results) == [
+        ("decision_tree", '{"max_depth": 2}'), ("decision_tree", '{"max_depth": 6}'),
+        ("random_forest", '{"max_depth": 4, "n_estimators": 3}'),
+        ("random_forest", '{"max_depth": 4, "n_estimators": 6}'),
+    ]
+    assert all(0.5 < r["cv_accuracy"] <= 1.0 and r["single_ms"] > 0 for r in results)
+
+    folds = list(output.glob("folds-*-k3.npz"))
+    assert len(folds) == 1
+    best = json.loads((output / "best.json").read_text())
+    for name in ("decision_tree", "random_forest"):
+        top = max(r["cv_accuracy"] for r in results if r["model"] == name)
+        winner = next(r for r in results if r["model"] == name)
+        assert winner["cv_accuracy"] == top and best[name] == winner["params"]
+    assert len(json.loads((output / "leaderboard.json").read_text())) == len(results)
+
+    # Cached folds are reused and the scores repeat exactly
+    monkeypatch.setattr(search, "load_dataset", lambda path: pytest.fail("folds were recomputed"))
+    again = search.main(argv)
+
+    def scores(runs):
+        return {json.dumps([r["model"], r["params"]], sort_keys=True): r["cv_accuracy"] for r in runs}
+    assert scores(again) == scores(results)
@@ -0,0 +1,226 @@
+"""
+Incremental retraining from newly labeled decisions
+Appends labeled rows to the columnar training store, then updates the active
+models instead of refitting them on everything:
+  random_forest  warm_start adds trees fitted on the most recent rows; the
+                 oldest trees are retired beyond --max-trees
+  linear         refit from running sufficient statistics (sums of x, y, xxᵀ
+                 and xy) kept next to the store, so only new rows are read
+Each candidate is scored against the active version on pipeline.py's
+held-out rows, which neither model was trained on, and only published to
+server/model/ (as a new manifest version) when it is at least as good. An
+active model without a matching ``holdout_split_`` tag (trained before the
+split was shared, or on a rebuilt store) cannot be gated fairly: retrain it
+with pipeline.py first. The decision tree is left to pipeline.py.
+
+Usage:
+  python incremental.py --labels labeled_decisions.csv
+  python incremental.py --labels labeled_decisions.csv --add-trees 50 --max-trees 300 --activate
+  python incremental.py --models linear     # update from rows already in the store
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib as jb
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from pipeline import ARTIFACTS, MODEL_DIR, TARGET, evaluate, holdout_mask, register, split_tag
+from preprocessing import CACHE_DIR, RAW_PATH, SCHEMA, append_rows, build_cache, load_cache, transform_chunk
+
+# Serving code (manifest resolution) lives one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from registry import read_manifest  # noqa: E402
+
+FEATURES = [col for col in SCHEMA if col != TARGET]
+INCREMENTAL_MODELS = ("random_forest", "linear")
+
+# Running sums for the linear model, stored alongside the columns
+STATS_FILE = "linear_stats.npz"
+STATS_CHUNK_ROWS = 100_000
+
+DEFAULT_WINDOW = 2000
+DEFAULT_ADD_TREES = 50
+DEFAULT_MAX_TREES = 300
+# Largest accuracy drop / RMSE rise on the held-out set still published
+DEFAULT_TOLERANCE = 0.0
+
+# -------- Linear model from sufficient statistics --------
+def empty_stats(shift: np.ndarray) -> Dict[str, Any]:
+    k = len(shift)
+    # Sums are taken around `shift` (the first rows' means) to keep xxᵀ well scaled
+    return {"rows": 0, "n": 0, "shift": shift, "sx": np.zeros(k), "sy": 0.0,
+            "sxx": np.zeros((k, k)), "sxy": np.zeros(k)}
+
+def load_stats(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with np.load(path) as f:
+        return {key: (f[key].item() if f[key].ndim == 0 else f[key]) for key in f.files}
+
+def update_stats(stats: Dict[str, Any], X: np.ndarray, y: np.ndarray, keep: np.ndarray, end: int) -> None:
+    """Add the training rows of store rows [stats['rows'], end) to the sums"""
+    for start in range(stats["rows"], end, STATS_CHUNK_ROWS):
+        stop = min(start + STATS_CHUNK_ROWS, end)
+        rows = keep[start:stop]
+        Xs = np.asarray(X[start:stop][rows], dtype=np.float64) - stats["shift"]
+        ys = np.asarray(y[start:stop][rows], dtype=np.float64)
+        stats["n"] += len(ys)
+        stats["sx"] += Xs.sum(axis=0)
+        stats["sy"] += ys.sum()
+        stats["sxx"] += Xs.T @ Xs
+        stats["sxy"] += Xs.T @ ys
+    stats["rows"] = end
+
+def solve_linear(stats: Dict[str, Any]) -> LinearRegression:
+    """Ordinary least squares with intercept, as LinearRegression.fit would give"""
+    n = stats["n"]
+    mean_x, mean_y = stats["sx"] / n, stats["sy"] / n
+    cov = stats["sxx"] / n - np.outer(mean_x, mean_x)
+    cross = stats["sxy"] / n - mean_x * mean_y
+    # Solve on the correlation scale; the raw features span ~10 orders of magnitude
+    scale = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    scale[scale == 0] = 1.0
+    coef = np.linalg.lstsq(cov / np.outer(scale, scale), cross / scale, rcond=None)[0] / scale
+
+    model = LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = float(mean_y - (stats["shift"] + mean_x) @ coef)
+    model.n_features_in_ = len(coef)
+    model.feature_names_in_ = np.asarray(FEATURES, dtype=object)
+    return model
+
+# -------- Random forest growth --------
+def grow_forest(forest: Any, X: pd.DataFrame, y: pd.Series, add_trees: int, max_trees: int) -> Tuple[Any, int]:
+    """Fit ``add_trees`` more trees on (X, y), then drop the oldest beyond ``max_trees``"""
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + add_trees)
+    forest.fit(X, y)
+    retired = max(0, len(forest.estimators_) - max_trees)
+    if retired:
+        forest.estimators_ = forest.estimators_[retired:]
+    forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+    return forest, retired
+
+# -------- Gate --------
+def passes_gate(name: str, candidate: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> bool:
+    if name == "linear":
+        return candidate["rmse"] <= current["rmse"] + tolerance
+    return candidate["accuracy"] >= current["accuracy"] - tolerance
+
+def summary(name: str, metrics: Dict[str, Any]) -> Dict[str, float]:
+    keys = ("rmse", "r2") if name == "linear" else ("accuracy",)
+    return {key: round(metrics[key], 6) for key in keys}
+
+def load_labels(path: Path) -> pd.DataFrame:
+    """Labeled decisions: the 8 raw application columns plus loan_status (label or code)"""
+    return transform_chunk(pd.read_csv(path, skipinitialspace=True))
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Incrementally update the loan models from labeled decisions")
+    parser.add_argument("--labels", type=Path, nargs="*", default=[],
+                        help="CSV files of labeled decisions to append to the store first")
+    parser.add_argument("--models", nargs="+", choices=INCREMENTAL_MODELS, default=list(INCREMENTAL_MODELS))
+    parser.add_argument("--cache", type=Path, default=CACHE_DIR)
+    parser.add_argument("--output", type=Path, default=MODEL_DIR)
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                        help="Most recent training rows the new trees are fitted on")
+    parser.add_argument("--add-trees", type=int, default=DEFAULT_ADD_TREES)
+    parser.add_argument("--max-trees", type=int, default=DEFAULT_MAX_TREES,
+                        help="Retire the oldest trees beyond this many")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed held-out accuracy drop (forest) or RMSE rise (linear)")
+    parser.add_argument("--version", default=time.strftime("inc-%Y%m%d-%H%M%S"))
+    parser.add_argument("--activate", action="store_true", help="Make published versions active")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if not (args.cache / "meta.json").exists():
+        print(f"⏳ Building the training store from {RAW_PATH}")
+        build_cache(RAW_PATH, args.cache)
+    for path in args.labels:
+        labeled = load_labels(path)
+        rows = append_rows(labeled, args.cache)
+        print(f"✅ Appended {len(labeled)} labeled rows from {path} ({rows} rows in the store)")
+
+    meta = json.loads((args.cache / "meta.json").read_text())
+    data = load_cache(args.cache)
+    X, y = data[FEATURES], data[TARGET]
+    y_values = y.to_numpy()
+    base_rows = meta.get("base_rows", meta["rows"])
+    held_out = holdout_mask(y_values, base_rows)
+    tag = split_tag(base_rows)
+    X_test, y_test = X[held_out], y[held_out]
+    train_idx = np.flatnonzero(~held_out)
+
+    active = read_manifest(args.output / "manifest.json", {name: args.output / ARTIFACTS[name] for name in ARTIFACTS})
+    report: Dict[str, Any] = {"rows": meta["rows"], "appended_rows": meta.get("appended_rows", 0),
+                              "holdout_rows": int(held_out.sum()), "version": args.version, "models": {}}
+    published = {}
+    for name in args.models:
+        current_version, current_path = active[name]
+        if current_path.suffix == ".npz":
+            raise SystemExit(f"❌ Active {name} ({current_path.name}) is a .npz export; "
+                             f"incremental training needs the joblib artifact")
+        current = jb.load(current_path)
+        if getattr(current, "holdout_split_", None) != tag:
+            # Its training rows may overlap the held-out set, which would bias the gate
+            print(f"❌ {name}: active version {current_version} was not trained on the split {tag}; "
+                  f"retrain it with pipeline.py before updating it incrementally")
+            report["models"][name] = {"base_version": current_version, "published": False,
+                                      "skipped": "untagged_split"}
+            continue
+        fit_started = time.perf_counter()
+
+        if name == "random_forest":
+            recent = train_idx[-args.window:]
+            if y_values[recent].min() == y_values[recent].max():
+                print(f"⚠️ {name}: the last {len(recent)} training rows have a single class, skipped")
+                continue
+            # Grow a fresh copy; `current` stays the baseline for the gate
+            candidate, retired = grow_forest(jb.load(current_path), X.iloc[recent], y.iloc[recent],
+                                             args.add_trees, args.max_trees)
+            details = {"window_rows": len(recent), "trees": len(candidate.estimators_), "retired": retired}
+        else:
+            stats_path = args.cache / STATS_FILE
+            stats = load_stats(stats_path)
+            if stats is None:
+                stats = empty_stats(X.iloc[train_idx[:STATS_CHUNK_ROWS]].mean().to_numpy())
+            new_rows = meta["rows"] - stats["rows"]
+            update_stats(stats, X.to_numpy(dtype=np.float64), y_values, ~held_out, meta["rows"])
+            np.savez(stats_path, **stats)
+            candidate = solve_linear(stats)
+            candidate.holdout_split_ = tag
+            details = {"rows_read": new_rows, "training_rows": stats["n"]}
+
+        fit_seconds = time.perf_counter() - fit_started
+        before = summary(name, evaluate(name, current, X_test, y_test))
+        after = summary(name, evaluate(name, candidate, X_test, y_test))
+        accepted = passes_gate(name, after, before, args.tolerance)
+        result = {"base_version": current_version, "fit_seconds": round(fit_seconds, 3),
+                  "current": before, "candidate": after, "published": accepted, **details}
+
+        if accepted:
+            output = args.output / f"{Path(ARTIFACTS[name]).stem}-{args.version}.pkl"
+            jb.dump(candidate, output)
+            published[name] = output
+            result["artifact"] = str(output)
+            print(f"✅ {name}: {before} -> {after} ({fit_seconds:.3f}s), published {output.name}")
+        else:
+            print(f"❌ {name}: {before} -> {after} on the held-out set, not published")
+        report["models"][name] = result
+
+    if published:
+        register(args.output / "manifest.json", args.version, published, args.activate)
+    report["wall_seconds"] = round(time.perf_counter() - started, 3)
+    (args.output / "incremental.json").write_text(json.dumps(report, indent=2) + "\n")
+    print(f"✅ Incremental update finished in {report['wall_seconds']}s, report at {args.output / 'incremental.json'}")
+    return report
+
+if __name__ == "__main__":
+    main()
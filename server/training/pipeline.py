@@ -0,0 +1,259 @@
+"""
+Unified training pipeline for the loan ensemble
+Loads and splits the dataset once, trains all models concurrently in a
+process pool and writes every artifact plus a metrics report to server/model/
+
+Usage:
+  python pipeline.py
+  python pipeline.py --models random_forest decision_tree
+  python pipeline.py --version v2 --activate
+  python pipeline.py --params ../model/search/best.json
+  python pipeline.py --reference-only      # just rewrite the drift reference profile
+
+With --version the drift reference is written as drift_reference-<version>.json
+next to the artifacts; it replaces the served drift_reference.json only with
+--activate (unversioned runs overwrite the live artifacts and reference).
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import joblib as jb
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import (
+    accuracy_score, classification_report, confusion_matrix, mean_squared_error, r2_score
+)
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from preprocessing import CACHE_DIR, load_cache
+
+# -------- Paths --------
+load_dotenv()
+SERVER_DIR = Path(__file__).resolve().parent.parent
+# Prefer the columnar cache written by preprocessing.py, fall back to the CSV
+DEFAULT_DATA = CACHE_DIR if (CACHE_DIR / "meta.json").exists() else SERVER_DIR / "dataset" / "prepro.csv"
+DATA_PATH = Path(os.getenv("DATA_PATH", DEFAULT_DATA))
+MODEL_DIR = SERVER_DIR / "model"
+
+TARGET = "loan_status"
+
+# Training-time feature distribution the server's drift monitor compares live traffic against
+DRIFT_REFERENCE = "drift_reference.json"
+DRIFT_BINS = int(os.getenv("DRIFT_BINS", "10"))
+
+# Artifact file names, matching model/manifest.json v1
+ARTIFACTS = {
+    "linear": "linear_model.pkl",
+    "decision_tree": "decision_tree.pkl",
+    "random_forest": "random_forest.pkl",
+}
+
+# Held-out share and seed of the split every model is trained, scored and gated on
+HOLDOUT_FRACTION = 0.2
+SPLIT_SEED = 42
+
+# -------- Data --------
+def holdout_mask(y: np.ndarray, base_rows: int) -> np.ndarray:
+    """True for the held-out rows
+
+    The first ``base_rows`` (built from the raw CSV) use a stratified split.
+    Rows appended later by incremental.py are held out by a fixed hash of
+    their position, so the set never changes as the store grows.
+    """
+    mask = np.zeros(len(y), dtype=bool)
+    _, test_idx = train_test_split(np.arange(base_rows), test_size=HOLDOUT_FRACTION,
+                                   random_state=SPLIT_SEED, stratify=y[:base_rows])
+    mask[test_idx] = True
+    appended = np.arange(base_rows, len(y), dtype=np.uint64)
+    mask[base_rows:] = (appended * np.uint64(2654435761) % np.uint64(2**32)) < HOLDOUT_FRACTION * 2**32
+    return mask
+
+def split_tag(base_rows: int) -> str:
+    """Name of the split, stored on each fitted model as ``holdout_split_``"""
+    return f"stratified-{HOLDOUT_FRACTION}-seed{SPLIT_SEED}-base{base_rows}"
+
+def dataset_base_rows(path: Path, rows: int) -> int:
+    """Rows built from the raw CSV, i.e. without rows appended to a cache later"""
+    meta_path = Path(path) / "meta.json"
+    return json.loads(meta_path.read_text()).get("base_rows", rows) if meta_path.exists() else rows
+
+def load_dataset(path: Path = DATA_PATH):
+    """Read the processed dataset (cache directory or CSV) and make the shared held-out split"""
+    data = load_cache(path) if Path(path).is_dir() else pd.read_csv(path)
+    X = data.drop(columns=[TARGET])
+    y = data[TARGET]
+    held_out = holdout_mask(y.to_numpy(), dataset_base_rows(path, len(data)))
+    return X[~held_out], X[held_out], y[~held_out], y[held_out]
+
+# -------- Trainers --------
+# Production hyperparameters; search.py explores around these
+DEFAULT_PARAMS: Dict[str, Dict[str, Any]] = {
+    "linear": {},
+    "decision_tree": {"criterion": "gini", "max_depth": 6},
+    "random_forest": {"n_estimators": 200, "max_depth": 10},
+}
+
+def build_model(name: str, n_jobs: int = 1, **params: Any) -> Any:
+    if name not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown model '{name}'")
+    params = {**DEFAULT_PARAMS[name], **params}
+    if name == "linear":
+        return LinearRegression(**params)
+    if name == "decision_tree":
+        return DecisionTreeClassifier(random_state=42, **params)
+    return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
+
+def evaluate(name: str, model: Any, X_test: pd.DataFrame, y_test: pd.Series) -> Dict[str, Any]:
+    y_pred = model.predict(X_test)
+    if name == "linear":
+        mse = mean_squared_error(y_test, y_pred)
+        return {"mse": float(mse), "rmse": float(np.sqrt(mse)), "r2": float(r2_score(y_test, y_pred))}
+    return {
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "confusion_matrix": confusion_matrix(y_test, y_pred).tolist(),
+        "classification_report": classification_report(y_test, y_pred, output_dict=True),
+    }
+
+def train_one(name: str, split: tuple, output: str, n_jobs: int,
+              params: Optional[Dict[str, Any]] = None, tag: Optional[str] = None) -> Dict[str, Any]:
+    """Fit, evaluate and save one model; runs inside a pool worker"""
+    X_train, X_test, y_train, y_test = split
+    started = time.perf_counter()
+    model = build_model(name, n_jobs, **(params or {}))
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    # incremental.py only gates against models whose held-out rows it knows
+    model.holdout_split_ = tag
+
+    metrics = evaluate(name, model, X_test, y_test)
+    jb.dump(model, output)
+    return {
+        "model": name,
+        "artifact": str(output),
+        "n_jobs": n_jobs,
+        "params": {**DEFAULT_PARAMS[name], **(params or {})},
+        "fit_seconds": round(fit_seconds, 3),
+        **metrics,
+    }
+
+def drift_reference(X: pd.DataFrame, bins: int = DRIFT_BINS) -> Dict[str, Any]:
+    """Per-feature quantile bin edges and training counts
+
+    Bin k holds edges[k-1] <= x < edges[k], with open-ended first and last
+    bins, so there are len(edges) + 1 counts per feature.
+    """
+    features = {}
+    for column in X.columns:
+        values = X[column].to_numpy(dtype=np.float64)
+        # Interior quantiles; repeated values (discrete columns) collapse to fewer bins
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        features[column] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    return {"rows": len(X), "bins": bins, "features": features}
+
+def write_reference(output: Path, reference: Dict[str, Any], version: Optional[str], live: bool) -> List[Path]:
+    """Save the profile for a version; the served copy changes only when that version goes live"""
+    text = json.dumps(reference, indent=2) + "\n"
+    paths = []
+    if version:
+        paths.append(output / f"{Path(DRIFT_REFERENCE).stem}-{version}.json")
+    if not version or live:
+        paths.append(output / DRIFT_REFERENCE)
+    for path in paths:
+        path.write_text(text)
+    return paths
+
+def allocate_cores(names: List[str], cpus: int) -> Dict[str, int]:
+    """Single-threaded models get one core each, the forest gets the rest"""
+    jobs = {name: 1 for name in names}
+    if "random_forest" in jobs:
+        jobs["random_forest"] = max(1, cpus - (len(names) - 1))
+    return jobs
+
+def register(manifest_path: Path, version: str, artifacts: Dict[str, Path], activate: bool) -> bool:
+    """Add freshly trained artifacts to the model manifest; True when the version is now active"""
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {"models": {}}
+    for name, artifact in artifacts.items():
+        entry = manifest["models"].setdefault(name, {"active": version, "versions": {}})
+        entry["versions"][version] = {"path": artifact.name}
+        if activate:
+            entry["active"] = version
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
+    # A model's first version becomes active even without --activate
+    return any(manifest["models"][name]["active"] == version for name in artifacts)
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Train the loan ensemble")
+    parser.add_argument("--models", nargs="+", choices=list(ARTIFACTS), default=list(ARTIFACTS))
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=MODEL_DIR)
+    parser.add_argument("--version", help="Write '<name>-<version>.pkl' and register it in manifest.json")
+    parser.add_argument("--activate", action="store_true", help="Make the registered version active")
+    parser.add_argument("--params", type=Path,
+                        help="JSON of model name -> hyperparameter overrides (e.g. search.py's best.json)")
+    parser.add_argument("--reference-only", action="store_true",
+                        help=f"Only write {DRIFT_REFERENCE} (or the --version copy) for existing artifacts, train nothing")
+    args = parser.parse_args(argv)
+    overrides = json.loads(args.params.read_text()) if args.params else {}
+
+    started = time.perf_counter()
+    split = load_dataset(args.data)
+    tag = split_tag(dataset_base_rows(args.data, len(split[0]) + len(split[1])))
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    # Same split the models see, so the profile describes their training data
+    reference = drift_reference(split[0])
+    if args.reference_only:
+        paths = write_reference(args.output, reference, args.version, args.activate)
+        print(f"✅ Drift reference profile at {', '.join(map(str, paths))}")
+        return {"drift_reference": [str(path) for path in paths]}
+
+    outputs = {
+        name: args.output / (f"{Path(ARTIFACTS[name]).stem}-{args.version}.pkl" if args.version else ARTIFACTS[name])
+        for name in args.models
+    }
+    cores = allocate_cores(args.models, os.cpu_count() or 1)
+
+    # Wall clock is bounded by the slowest model rather than the sum
+    with ProcessPoolExecutor(max_workers=len(args.models)) as pool:
+        futures = {
+            name: pool.submit(train_one, name, split, str(outputs[name]), cores[name], overrides.get(name), tag)
+            for name in args.models
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+    live = register(args.output / "manifest.json", args.version, outputs, args.activate) if args.version else True
+    # Written once training succeeded, so a failed run never replaces the live profile
+    reference_paths = write_reference(args.output, reference, args.version, live)
+
+    report = {
+        "data": str(args.data),
+        "train_rows": len(split[0]),
+        "test_rows": len(split[1]),
+        "split": tag,
+        "drift_reference": [str(path) for path in reference_paths],
+        "version": args.version,
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "models": results,
+    }
+    (args.output / "metrics.json").write_text(json.dumps(report, indent=2) + "\n")
+
+    for name, result in results.items():
+        score = f"Accuracy: {result['accuracy']:.4f}" if "accuracy" in result else f"R²: {result['r2']:.4f}"
+        print(f"✅ {name}: {score} ({result['fit_seconds']}s, n_jobs={result['n_jobs']}) -> {result['artifact']}")
+    print(f"✅ Drift reference profile at {', '.join(map(str, reference_paths))}")
+    print(f"✅ Training finished in {report['wall_seconds']}s, report at {args.output / 'metrics.json'}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,277 @@
-import os
+"""
+Streaming preprocessing for the loan dataset
+Reads the raw CSV in chunks, downcasts dtypes, adds the four engineered
+features and writes a columnar cache (one .npy per column) that training
+loads directly. Reruns are skipped when the raw input has not changed.
+
+Usage:
+  python preprocessing.py
+  python preprocessing.py --csv            # also write prepro.csv
+  python preprocessing.py --eda --plot     # summary stats + saved heatmap
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
 import numpy as np
 import pandas as pd
-import joblib as jb
-import seaborn as sns
-import matplotlib.pyplot as plt
-from sklearn.preprocessing import LabelEncoder
-
-os.system('cls')
-data = pd.read_csv("../dataset/loan_approval_dataset.csv")
-
-print('This is the information about the dataset: ')
-print(data.info())
-print('This is the description of the dataset: ')
-print(data.describe())
-print('This is the number of null values in the dataset: ')
-print(data.isnull().sum())
-print('These are the columns in the dataset: ')
-print(data.columns)
-print('This is the shape of the dataset: ')
-print(data.shape)
-print('This is the size of the dataset: ')
-print(data.size)
-print('These are the first 5 rows of the dataset: ')
-print(data.head())
-print()
-
-
-
-
-
-
-data = data.drop(columns=['loan_id', 'no_of_dependents', 'education', 'self_employed'])
-
-for col in data.select_dtypes(include="object"):
-    data[col] = LabelEncoder().fit_transform(data[col])
-correlation_matrix = data.corr()
-plt.figure(figsize=(10,8))
-sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0)
-plt.title('Correlation Heatmap')
-plt.tight_layout()
-plt.show()
-data['dti_ratio'] = data['loan_amount'] / data['income_annum']
-data['total_assets'] = data['residential_assets_value'] + data['commercial_assets_value'] + data['luxury_assets_value'] + data['bank_asset_value']
-data['asset_coverage'] = data['total_assets'] / data['loan_amount']
-data['affordability_index'] = data['income_annum'] / (data['loan_amount']/data['loan_term'])
-data.to_csv("../dataset/prepro.csv", index=False)
\ No newline at end of file
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+RAW_PATH = SERVER_DIR / "dataset" / "loan_approval_dataset.csv"
+CACHE_DIR = SERVER_DIR / "dataset" / "prepro_cache"
+CSV_PATH = SERVER_DIR / "dataset" / "prepro.csv"
+
+CHUNK_ROWS = 100_000
+
+# Bump when the output layout or feature logic changes to force a rebuild
+CACHE_SCHEMA = 1
+
+DROP_COLUMNS = ["loan_id", "no_of_dependents", "education", "self_employed"]
+
+# Same codes LabelEncoder assigned (sorted labels)
+LOAN_STATUS_CODES = {"Approved": 0, "Rejected": 1}
+
+# Output columns in prepro.csv order, with their downcast dtypes
+SCHEMA: Dict[str, str] = {
+    "income_annum": "int32",
+    "loan_amount": "int32",
+    "loan_term": "int16",
+    "cibil_score": "int16",
+    "residential_assets_value": "int32",
+    "commercial_assets_value": "int32",
+    "luxury_assets_value": "int32",
+    "bank_asset_value": "int32",
+    "loan_status": "int8",
+    "dti_ratio": "float64",
+    "total_assets": "int64",
+    "asset_coverage": "float64",
+    "affordability_index": "float64",
+}
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def is_fresh(raw_path: Path, cache_dir: Path) -> bool:
+    """True when the cache was built from this exact input and schema"""
+    meta_path = cache_dir / "meta.json"
+    if not meta_path.exists():
+        return False
+    meta = json.loads(meta_path.read_text())
+    if meta.get("schema") != CACHE_SCHEMA:
+        return False
+    stat = raw_path.stat()
+    if meta.get("source_size") == stat.st_size and meta.get("source_mtime_ns") == stat.st_mtime_ns:
+        return True
+    # Touched but possibly identical: fall back to the content hash
+    return meta.get("source_sha256") == file_digest(raw_path)
+
+def check_ranges(chunk: pd.DataFrame) -> None:
+    """Refuse values an integer column's dtype cannot hold
+
+    astype() would wrap out-of-range values silently (3_000_000_000 becomes
+    -1294967296 in int32) and fails on NaN without naming the row.
+    """
+    problems = []
+    for col, dtype in SCHEMA.items():
+        if not np.issubdtype(np.dtype(dtype), np.integer):
+            continue
+        info = np.iinfo(dtype)
+        values = pd.to_numeric(chunk[col], errors="coerce")
+        bad = values.isna() | (values < info.min) | (values > info.max) | (values % 1 != 0)
+        if bad.any():
+            rows = chunk.index[bad]
+            shown = ", ".join(f"row {row} = {chunk.at[row, col]}" for row in rows[:5])
+            more = f" and {len(rows) - 5} more rows" if len(rows) > 5 else ""
+            problems.append(f"{col} ({dtype}, {info.min}..{info.max}): {shown}{more}")
+    if problems:
+        raise ValueError("Values missing, non-integer or out of range: " + "; ".join(problems))
+
+def transform_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Clean one raw chunk and add the engineered features
+
+    loan_status may be the raw labels or their integer codes (labeled
+    decisions fed back for incremental training). Rows that do not fit the
+    SCHEMA dtypes raise ValueError naming their row index.
+    """
+    chunk = chunk.drop(columns=DROP_COLUMNS, errors="ignore")
+    if pd.api.types.is_numeric_dtype(chunk["loan_status"]):
+        unknown = set(chunk["loan_status"].unique()) - set(LOAN_STATUS_CODES.values())
+        if unknown:
+            raise ValueError(f"Unknown loan_status codes: {sorted(unknown)}")
+    else:
+        status = chunk["loan_status"].str.strip()
+        unknown = set(status.unique()) - set(LOAN_STATUS_CODES)
+        if unknown:
+            raise ValueError(f"Unknown loan_status labels: {sorted(unknown)}")
+        chunk["loan_status"] = status.map(LOAN_STATUS_CODES)
+
+    chunk["dti_ratio"] = chunk["loan_amount"] / chunk["income_annum"]
+    chunk["total_assets"] = (
+        chunk["residential_assets_value"]
+        + chunk["commercial_assets_value"]
+        + chunk["luxury_assets_value"]
+        + chunk["bank_asset_value"]
+    )
+    chunk["asset_coverage"] = chunk["total_assets"] / chunk["loan_amount"]
+    chunk["affordability_index"] = chunk["income_annum"] / (chunk["loan_amount"] / chunk["loan_term"])
+    check_ranges(chunk)
+    return chunk[list(SCHEMA)].astype(SCHEMA)
+
+def build_cache(raw_path: Path = RAW_PATH, cache_dir: Path = CACHE_DIR,
+                chunk_rows: int = CHUNK_ROWS, csv_path: Optional[Path] = None) -> int:
+    """Stream raw_path into cache_dir; returns the number of rows written"""
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    # Append raw column bytes chunk by chunk, wrap them as .npy at the end
+    sinks = {col: open(tmp_dir / f"{col}.bin", "wb") for col in SCHEMA}
+    rows = 0
+    try:
+        reader = pd.read_csv(raw_path, chunksize=chunk_rows, skipinitialspace=True)
+        for i, chunk in enumerate(reader):
+            chunk = transform_chunk(chunk)
+            for col, sink in sinks.items():
+                sink.write(np.ascontiguousarray(chunk[col].to_numpy()).tobytes())
+            if csv_path is not None:
+                chunk.to_csv(csv_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(chunk)
+    finally:
+        for sink in sinks.values():
+            sink.close()
+
+    for col, dtype in SCHEMA.items():
+        raw = tmp_dir / f"{col}.bin"
+        out = np.lib.format.open_memmap(tmp_dir / f"{col}.npy", mode="w+", dtype=dtype, shape=(rows,))
+        if rows:
+            out[:] = np.memmap(raw, dtype=dtype, mode="r", shape=(rows,))
+        out.flush()
+        del out
+        raw.unlink()
+
+    stat = raw_path.stat()
+    meta = {
+        "schema": CACHE_SCHEMA,
+        "rows": rows,
+        "columns": list(SCHEMA),
+        "dtypes": SCHEMA,
+        "source": str(raw_path),
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_sha256": file_digest(raw_path),
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    tmp_dir.rename(cache_dir)
+    return rows
+
+def append_rows(rows: pd.DataFrame, cache_dir: Path = CACHE_DIR) -> int:
+    """Append transformed rows to the cache; returns the new row count
+
+    Columns are rewritten into a temporary directory and swapped in, so an
+    interrupted append leaves the previous cache intact. meta.json keeps
+    ``base_rows`` (rows built from the raw CSV) and ``appended_rows``.
+    Other files in the cache directory are carried over.
+    """
+    rows = rows[list(SCHEMA)].astype(SCHEMA)
+    meta = json.loads((cache_dir / "meta.json").read_text())
+    old_rows = meta["rows"]
+    new_rows = old_rows + len(rows)
+
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for col, dtype in SCHEMA.items():
+        out = np.lib.format.open_memmap(tmp_dir / f"{col}.npy", mode="w+", dtype=dtype, shape=(new_rows,))
+        if old_rows:
+            out[:old_rows] = np.load(cache_dir / f"{col}.npy", mmap_mode="r")
+        out[old_rows:] = rows[col].to_numpy()
+        out.flush()
+        del out
+    for path in cache_dir.iterdir():
+        if path.name != "meta.json" and path.stem not in SCHEMA:
+            shutil.copy2(path, tmp_dir / path.name)
+
+    meta.setdefault("base_rows", old_rows)
+    meta["rows"] = new_rows
+    meta["appended_rows"] = new_rows - meta["base_rows"]
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    shutil.rmtree(cache_dir)
+    tmp_dir.rename(cache_dir)
+    return new_rows
+
+def load_cache(cache_dir: Path = CACHE_DIR, mmap: bool = True) -> pd.DataFrame:
+    """Load the columnar cache as a DataFrame (columns memory-mapped by default)"""
+    meta = json.loads((cache_dir / "meta.json").read_text())
+    mode = "r" if mmap else None
+    return pd.DataFrame(
+        {col: np.load(cache_dir / f"{col}.npy", mmap_mode=mode) for col in meta["columns"]},
+        copy=False,
+    )
+
+def run_eda(data: pd.DataFrame, plot_path: Optional[Path], show: bool) -> None:
+    print('This is the information about the dataset: ')
+    data.info()
+    print('This is the description of the dataset: ')
+    print(data.describe())
+    print('This is the number of null values in the dataset: ')
+    print(data.isnull().sum())
+    print('This is the shape of the dataset: ')
+    print(data.shape)
+
+    if plot_path is None and not show:
+        return
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(data.corr(), annot=True, cmap='coolwarm', center=0)
+    plt.title('Correlation Heatmap')
+    plt.tight_layout()
+    if plot_path is not None:
+        plt.savefig(plot_path)
+        print(f"Heatmap saved to {plot_path}")
+    if show:
+        plt.show()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preprocess the raw loan dataset into a columnar cache")
+    parser.add_argument("--input", type=Path, default=RAW_PATH)
+    parser.add_argument("--cache", type=Path, default=CACHE_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--csv", nargs="?", type=Path, const=CSV_PATH, help="Also write prepro.csv")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the input is unchanged")
+    parser.add_argument("--eda", action="store_true", help="Print summary statistics")
+    parser.add_argument("--plot", nargs="?", type=Path, const=SERVER_DIR / "dataset" / "correlation.png",
+                        help="Save the correlation heatmap (implies --eda)")
+    parser.add_argument("--show", action="store_true", help="Display the heatmap window (implies --eda)")
+    args = parser.parse_args()
+
+    if not args.force and args.csv is None and is_fresh(args.input, args.cache):
+        print(f"✅ {args.cache} is up to date, skipping")
+    else:
+        meta_path = args.cache / "meta.json"
+        appended = json.loads(meta_path.read_text()).get("appended_rows", 0) if meta_path.exists() else 0
+        if appended:
+            print(f"⚠️ Rebuilding drops {appended} rows appended by incremental.py")
+        rows = build_cache(args.input, args.cache, args.chunk_rows, args.csv)
+        print(f"✅ Wrote {rows} rows to {args.cache}" + (f" and {args.csv}" if args.csv else ""))
+
+    if args.eda or args.plot or args.show:
+        run_eda(load_cache(args.cache, mmap=False), args.plot, args.show)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Parallel hyperparameter search for the tree models
+Runs cross-validated trials across a process pool over fold splits that are
+computed once and cached on disk. Forests grow through FOREST_SIZES with
+warm_start, so every size is scored for the cost of fitting the largest.
+Each configuration is also timed for single-row and batch inference, and the
+results are written as a leaderboard of accuracy against latency.
+
+Usage:
+  python search.py
+  python search.py --models random_forest --latency-budget-ms 1.0
+  python search.py --engine compiled --folds 3
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import StratifiedKFold
+
+from pipeline import DATA_PATH, MODEL_DIR, build_model, load_dataset
+
+# Serving code (feature order, compiled engine) lives one level up
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import features  # noqa: E402,F401  (silences the feature-name warning for array input)
+from inference import ENGINES, INFERENCE_ENGINE, compile_model  # noqa: E402
+
+SEARCH_DIR = MODEL_DIR / "search"
+
+# Grids of overrides on top of pipeline.DEFAULT_PARAMS
+SEARCH_SPACE: Dict[str, Dict[str, List[Any]]] = {
+    "decision_tree": {
+        "max_depth": [4, 6, 8, 12, None],
+        "min_samples_leaf": [1, 5, 20],
+    },
+    "random_forest": {
+        "max_depth": [6, 10, 14, None],
+        "max_features": ["sqrt", 0.5],
+    },
+}
+
+# Tree counts visited by warm_start growth, ascending
+FOREST_SIZES = [25, 50, 100, 200, 400]
+
+# Latency probes: single-row calls and one batch of this many rows
+LATENCY_REPEATS = 200
+BATCH_ROWS = 1024
+
+# -------- Fold cache --------
+def data_fingerprint(path: Path) -> str:
+    """Cheap identity of the dataset: cache metadata, or CSV size and mtime"""
+    path = Path(path)
+    if path.is_dir():
+        ident = (path / "meta.json").read_bytes()
+    else:
+        stat = path.stat()
+        ident = f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+    return hashlib.blake2b(ident, digest_size=8).hexdigest()
+
+def prepare_folds(data_path: Path, n_folds: int, cache_dir: Path = SEARCH_DIR) -> Path:
+    """Write the training split and its fold assignment once per dataset/fold count"""
+    target = cache_dir / f"folds-{data_fingerprint(data_path)}-k{n_folds}.npz"
+    if target.exists():
+        return target
+
+    X_train, _, y_train, _ = load_dataset(data_path)
+    fold = np.empty(len(y_train), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    for i, (_, test_index) in enumerate(splitter.split(X_train, y_train)):
+        fold[test_index] = i
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(".tmp.npz")
+    np.savez(tmp, X=X_train.to_numpy(dtype=np.float64), y=y_train.to_numpy(),
+             fold=fold, columns=np.asarray(X_train.columns, dtype=str))
+    tmp.rename(target)
+    return target
+
+# -------- Pool worker state --------
+_X: Optional[pd.DataFrame] = None
+_y: Optional[np.ndarray] = None
+_fold: Optional[np.ndarray] = None
+
+def _init_worker(folds_path: str) -> None:
+    """Load the cached split once per pool process"""
+    global _X, _y, _fold
+    with np.load(folds_path, allow_pickle=False) as archive:
+        _X = pd.DataFrame(archive["X"], columns=list(archive["columns"]))
+        _y = archive["y"]
+        _fold = archive["fold"]
+
+def measure_latency(model: Any, X: np.ndarray, engine: str) -> Dict[str, float]:
+    """Median single-row and batch predict time, in milliseconds"""
+    predictor = compile_model(model) if engine == "compiled" else model
+    row = X[:1]
+    batch = np.resize(X, (BATCH_ROWS, X.shape[1]))
+
+    def median_ms(x: np.ndarray, repeats: int) -> float:
+        predictor.predict(x)
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            predictor.predict(x)
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples) * 1000
+
+    return {
+        "single_ms": round(median_ms(row, LATENCY_REPEATS), 4),
+        "batch_ms": round(median_ms(batch, max(5, LATENCY_REPEATS // 20)), 4),
+    }
+
+def run_trial(name: str, params: Dict[str, Any], engine: str) -> List[Dict[str, Any]]:
+    """Cross-validate one configuration; forests yield one result per size"""
+    sizes = FOREST_SIZES if name == "random_forest" else [None]
+    scores: Dict[Any, List[float]] = {size: [] for size in sizes}
+    fit_seconds: Dict[Any, float] = {size: 0.0 for size in sizes}
+    latency: Dict[Any, Dict[str, float]] = {}
+
+    for k in range(int(_fold.max()) + 1):
+        train, test = _fold != k, _fold == k
+        X_test = _X[test].to_numpy()
+        if name == "random_forest":
+            model = build_model(name, n_jobs=1, warm_start=True, **params)
+        else:
+            model = build_model(name, **params)
+
+        elapsed = 0.0
+        for size in sizes:
+            if size is not None:
+                # warm_start keeps the fitted trees and only adds the new ones
+                model.set_params(n_estimators=size)
+            started = time.perf_counter()
+            model.fit(_X[train], _y[train])
+            elapsed += time.perf_counter() - started
+            # Cumulative, i.e. what a from-scratch fit of this size would cost
+            fit_seconds[size] += elapsed
+            scores[size].append(float(np.mean(model.predict(X_test) == _y[test])))
+            if k == 0:
+                latency[size] = measure_latency(model, X_test, engine)
+
+    results = []
+    for size in sizes:
+        trial_params = dict(params) if size is None else {**params, "n_estimators": size}
+        results.append({
+            "model": name,
+            "params": trial_params,
+            "cv_accuracy": round(statistics.mean(scores[size]), 5),
+            "cv_std": round(statistics.pstdev(scores[size]), 5),
+            "fit_seconds": round(fit_seconds[size], 3),
+            "engine": engine,
+            **latency[size],
+        })
+    return results
+
+# -------- Driver --------
+def trials(names: List[str]) -> List[tuple]:
+    out = []
+    for name in names:
+        grid = SEARCH_SPACE[name]
+        for values in itertools.product(*grid.values()):
+            out.append((name, dict(zip(grid, values))))
+    return out
+
+def rank(results: List[Dict[str, Any]], budget_ms: Optional[float]) -> List[Dict[str, Any]]:
+    """Best accuracy first, faster single-row latency breaking ties"""
+    for r in results:
+        r["within_budget"] = budget_ms is None or r["single_ms"] <= budget_ms
+    return sorted(results, key=lambda r: (r["model"], not r["within_budget"], -r["cv_accuracy"], r["single_ms"]))
+
+def write_leaderboard(results: List[Dict[str, Any]], output: Path) -> None:
+    output.mkdir(parents=True, exist_ok=True)
+    (output / "leaderboard.json").write_text(json.dumps(results, indent=2) + "\n")
+    columns = ["model", "params", "cv_accuracy", "cv_std", "single_ms", "batch_ms",
+               "fit_seconds", "engine", "within_budget"]
+    with open(output / "leaderboard.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for r in results:
+            writer.writerow({**r, "params": json.dumps(r["params"], sort_keys=True)})
+
+    # Winner per model, in the format pipeline.py --params accepts
+    best = {}
+    for r in results:
+        if r["within_budget"] and r["model"] not in best:
+            best[r["model"]] = r["params"]
+    (output / "best.json").write_text(json.dumps(best, indent=2) + "\n")
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search with latency profiling")
+    parser.add_argument("--models", nargs="+", choices=list(SEARCH_SPACE), default=list(SEARCH_SPACE))
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=SEARCH_DIR)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", choices=ENGINES, default=INFERENCE_ENGINE,
+                        help="Inference engine to time (defaults to INFERENCE_ENGINE)")
+    parser.add_argument("--latency-budget-ms", type=float,
+                        help="Rank configurations over this single-row latency last")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    folds_path = prepare_folds(args.data, args.folds, args.output)
+    todo = trials(args.models)
+    print(f"🔎 {len(todo)} configurations x {args.folds} folds on {args.workers} workers")
+
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(str(folds_path),)) as pool:
+        futures = [pool.submit(run_trial, name, params, args.engine) for name, params in todo]
+        for i, future in enumerate(as_completed(futures), 1):
+            results.extend(future.result())
+            print(f"  {i}/{len(todo)} done", end="\r", flush=True)
+
+    results = rank(results, args.latency_budget_ms)
+    write_leaderboard(results, args.output)
+
+    print(f"\n✅ Search finished in {time.perf_counter() - started:.1f}s, leaderboard at {args.output}")
+    for name in args.models:
+        top = next((r for r in results if r["model"] == name and r["within_budget"]), None)
+        if top is None:
+            print(f"⚠ {name}: no configuration within {args.latency_budget_ms}ms")
+            continue
+        print(f"✅ {name}: {json.dumps(top['params'])} accuracy={top['cv_accuracy']:.4f} "
+              f"single={top['single_ms']}ms batch[{BATCH_ROWS}]={top['batch_ms']}ms")
+    return results
+
+if __name__ == "__main__":
+    main()
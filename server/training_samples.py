@@ -0,0 +1,14 @@
+"""
+Raw application samples shared by the training tests
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+RAW_PATH = Path(__file__).resolve().parent / "dataset" / "loan_approval_dataset.csv"
+
+def write_raw_sample(path: Path, rows: int, skip: int = 0) -> Path:
+    """First ``rows`` raw applications after ``skip``, in the original CSV layout"""
+    pd.read_csv(RAW_PATH, skiprows=range(1, skip + 1), nrows=rows).to_csv(path, index=False)
+    return path